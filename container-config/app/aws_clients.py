@@ -4,10 +4,17 @@ from __future__ import annotations
 
 import json
 import os
+import threading
+import time
+from collections import OrderedDict
 from configparser import ConfigParser
-from typing import TYPE_CHECKING, Any
+from typing import TYPE_CHECKING, Any, Callable, Iterator
 
 import boto3
+from botocore.config import Config
+
+from .config_store import write_json_atomic
+from .policy_eval import ActionIndex, CompiledPolicy, wildcard_match
 
 if TYPE_CHECKING:
     from mypy_boto3_ecr import ECRClient
@@ -33,20 +40,81 @@ ECR_CHECK_ACTIONS = [
     "ecr:GetDownloadUrlForLayer",
 ]
 
+# Sized for the shared worker pool plus the farm scan's thread pool.
+CLIENT_MAX_POOL_CONNECTIONS = 32
+
+CLIENT_CONFIG = Config(
+    max_pool_connections=CLIENT_MAX_POOL_CONNECTIONS,
+    tcp_keepalive=True,
+    connect_timeout=5,
+    read_timeout=30,
+    retries={"max_attempts": 5, "mode": "adaptive"},
+)
+
+POLICY_CACHE_TTL_SECONDS = 900
+POLICY_CACHE_MAX_ENTRIES = 256
+
+# IAM size quotas, counted without whitespace. The inline limit applies to
+# all inline policies of a role together; a managed policy has its own limit.
+INLINE_POLICY_MAX_CHARS = 10240
+MANAGED_POLICY_MAX_CHARS = 6144
+# Default quota of managed policies attached to one role (adjustable up to 20).
+MANAGED_POLICIES_PER_ROLE = 10
+# Path of the managed policies that hold repo ARNs which overflow the inline policy.
+MANAGED_POLICY_PATH = "/deadline-ecr/"
+
+
+_session: boto3.session.Session | None = None
+_clients: dict[tuple[str, str | None], Any] = {}
+_clients_lock = threading.Lock()
+
+
+def get_session() -> boto3.session.Session:
+    """Return the process-wide boto3 session, resolving credentials once."""
+    global _session
+    with _clients_lock:
+        if _session is None:
+            _session = boto3.session.Session()
+        return _session
+
+
+def get_client(service: str, region: str | None = None) -> Any:
+    """Return a shared client for ``service`` in ``region``, creating it on first use.
+
+    boto3 clients are thread-safe, so one client per (service, region) is
+    shared by every tab and background worker.
+    """
+    key = (service, region)
+    session = get_session()
+    with _clients_lock:
+        client = _clients.get(key)
+        if client is None:
+            client = session.client(service, region_name=region, config=CLIENT_CONFIG)
+            _clients[key] = client
+        return client
+
+
+def reset_clients() -> None:
+    """Drop the shared session and clients, e.g. after credentials change."""
+    global _session
+    with _clients_lock:
+        _clients.clear()
+        _session = None
+
 
 def get_deadline_client(region: str = "us-west-2") -> Any:
-    """Create a Deadline Cloud boto3 client."""
-    return boto3.client("deadline", region_name=region)
+    """Get the shared Deadline Cloud boto3 client."""
+    return get_client("deadline", region)
 
 
 def get_iam_client() -> "IAMClient":
-    """Create an IAM boto3 client."""
-    return boto3.client("iam")
+    """Get the shared IAM boto3 client."""
+    return get_client("iam")
 
 
 def get_ecr_client(region: str = "us-west-2") -> "ECRClient":
-    """Create an ECR boto3 client."""
-    return boto3.client("ecr", region_name=region)
+    """Get the shared ECR boto3 client."""
+    return get_client("ecr", region)
 
 
 def load_deadline_default_farm() -> str:
@@ -68,27 +136,40 @@ def load_app_config() -> dict[str, str]:
 def save_app_config(data: dict[str, str]) -> None:
     """Save app selections to ~/.deadline/container-config.json."""
     path = os.path.expanduser("~/.deadline/container-config.json")
-    os.makedirs(os.path.dirname(path), exist_ok=True)
-    with open(path, "w") as f:
-        json.dump(data, f, indent=2)
+    write_json_atomic(path, data)
+
+
+def iter_farm_pages(client: Any) -> Iterator[list[dict[str, str]]]:
+    """Yield farms one page at a time as list_farms pages arrive."""
+    for page in client.get_paginator("list_farms").paginate():
+        yield [{"farmId": f["farmId"], "displayName": f["displayName"]} for f in page.get("farms", [])]
+
+
+def iter_queue_pages(client: Any, farm_id: str) -> Iterator[list[dict[str, str]]]:
+    """Yield a farm's queues one page at a time as list_queues pages arrive."""
+    for page in client.get_paginator("list_queues").paginate(farmId=farm_id):
+        yield [{"queueId": q["queueId"], "displayName": q["displayName"]} for q in page.get("queues", [])]
+
+
+def iter_fleet_pages(client: Any, farm_id: str) -> Iterator[list[dict[str, str]]]:
+    """Yield a farm's fleets one page at a time as list_fleets pages arrive."""
+    for page in client.get_paginator("list_fleets").paginate(farmId=farm_id):
+        yield [{"fleetId": f["fleetId"], "displayName": f["displayName"]} for f in page.get("fleets", [])]
 
 
 def list_farms(client: Any) -> list[dict[str, str]]:
-    """List all farms."""
-    resp = client.list_farms()
-    return [{"farmId": f["farmId"], "displayName": f["displayName"]} for f in resp.get("farms", [])]
+    """List all farms across every page."""
+    return [f for page in iter_farm_pages(client) for f in page]
 
 
 def list_queues(client: Any, farm_id: str) -> list[dict[str, str]]:
-    """List queues for a farm."""
-    resp = client.list_queues(farmId=farm_id)
-    return [{"queueId": q["queueId"], "displayName": q["displayName"]} for q in resp.get("queues", [])]
+    """List all queues for a farm across every page."""
+    return [q for page in iter_queue_pages(client, farm_id) for q in page]
 
 
 def list_fleets(client: Any, farm_id: str) -> list[dict[str, str]]:
-    """List fleets for a farm."""
-    resp = client.list_fleets(farmId=farm_id)
-    return [{"fleetId": f["fleetId"], "displayName": f["displayName"]} for f in resp.get("fleets", [])]
+    """List all fleets for a farm across every page."""
+    return [f for page in iter_fleet_pages(client, farm_id) for f in page]
 
 
 def get_queue_role_arn(client: Any, farm_id: str, queue_id: str) -> str:
@@ -98,11 +179,13 @@ def get_queue_role_arn(client: Any, farm_id: str, queue_id: str) -> str:
 
 
 def get_fleet_details(client: Any, farm_id: str, fleet_id: str) -> dict[str, Any]:
-    """Get fleet details including roleArn and hostConfiguration."""
+    """Get fleet details including roleArn, status and hostConfiguration."""
     resp = client.get_fleet(farmId=farm_id, fleetId=fleet_id)
     return {
         "roleArn": resp.get("roleArn", ""),
         "displayName": resp.get("displayName", ""),
+        "status": resp.get("status", ""),
+        "statusMessage": resp.get("statusMessage", ""),
         "hostConfiguration": resp.get("hostConfiguration", {}),
     }
 
@@ -116,76 +199,187 @@ def role_name_from_arn(arn: str) -> str:
     return parts[-1] if parts else ""
 
 
+def aws_error_code(error: Exception) -> str:
+    """The AWS error code of a botocore ClientError, or "" for other exceptions."""
+    response = getattr(error, "response", None)
+    if isinstance(response, dict):
+        return str(response.get("Error", {}).get("Code", ""))
+    return ""
+
+
+class PolicyDocumentCache:
+    """Thread-safe TTL + LRU cache of managed IAM policy documents.
+
+    Documents are keyed by ``(PolicyArn, DefaultVersionId)``. The default
+    version of each ARN is cached with the same TTL, so a warm lookup needs
+    no ``get_policy`` or ``get_policy_version`` calls at all.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = POLICY_CACHE_MAX_ENTRIES,
+        ttl_seconds: float = POLICY_CACHE_TTL_SECONDS,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self._max_entries = max_entries
+        self._ttl = ttl_seconds
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._versions: dict[str, tuple[str, float]] = {}
+        self._docs: OrderedDict[tuple[str, str], tuple[dict[str, Any], float]] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get_document(self, iam_client: "IAMClient", policy_arn: str) -> dict[str, Any]:
+        """Return the default-version document for a managed policy."""
+        now = self._clock()
+        with self._lock:
+            version = self._versions.get(policy_arn)
+            if version and version[1] > now:
+                key = (policy_arn, version[0])
+                entry = self._docs.get(key)
+                if entry and entry[1] > now:
+                    self._docs.move_to_end(key)
+                    self.hits += 1
+                    return entry[0]
+            self.misses += 1
+
+        pv = iam_client.get_policy(PolicyArn=policy_arn)
+        version_id = pv["Policy"]["DefaultVersionId"]
+        key = (policy_arn, version_id)
+        with self._lock:
+            entry = self._docs.get(key)
+            if entry and entry[1] > now:
+                # Version moved back to one we still hold; skip the document fetch.
+                self._versions[policy_arn] = (version_id, now + self._ttl)
+                self._docs.move_to_end(key)
+                return entry[0]
+
+        doc = iam_client.get_policy_version(PolicyArn=policy_arn, VersionId=version_id)
+        policy_doc = doc["PolicyVersion"]["Document"]
+        if isinstance(policy_doc, str):
+            policy_doc = json.loads(policy_doc)
+
+        with self._lock:
+            expires = self._clock() + self._ttl
+            self._versions[policy_arn] = (version_id, expires)
+            self._docs[key] = (policy_doc, expires)
+            self._docs.move_to_end(key)
+            while len(self._docs) > self._max_entries:
+                (old_arn, old_version), _ = self._docs.popitem(last=False)
+                if self._versions.get(old_arn, ("", 0.0))[0] == old_version:
+                    del self._versions[old_arn]
+        return policy_doc
+
+    def invalidate(self, policy_arn: str) -> None:
+        """Forget the cached default version of a policy we just rewrote."""
+        with self._lock:
+            self._versions.pop(policy_arn, None)
+
+    def clear(self) -> None:
+        """Drop all cached documents and reset the counters."""
+        with self._lock:
+            self._versions.clear()
+            self._docs.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self) -> dict[str, int]:
+        """Return hit/miss counters and the current number of cached documents."""
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses, "size": len(self._docs)}
+
+
+_policy_cache = PolicyDocumentCache()
+
+
+def get_policy_cache_stats() -> dict[str, int]:
+    """Hit/miss counters for the process-wide managed policy cache."""
+    return _policy_cache.stats()
+
+
+def clear_policy_cache() -> None:
+    """Reset the process-wide managed policy cache."""
+    _policy_cache.clear()
+
+
 def _actions_match(actions: list[str], required: set[str]) -> set[str]:
     """Check which required actions are satisfied by the given action list."""
-    found: set[str] = set()
-    for a in actions:
-        if a == "*":
-            return set(required)  # wildcard matches everything
-        if a.endswith(":*"):
-            # Service wildcard like ecr:*
-            prefix = a.split(":")[0]
-            for r in required:
-                if r.startswith(prefix + ":"):
-                    found.add(r)
-        elif a in required:
-            found.add(a)
-    return found
+    index = ActionIndex()
+    for i, a in enumerate(actions):
+        index.add(a, i)
+    return {r for r in required if index.match(r)}
 
 
-def check_role_ecr_access(iam_client: "IAMClient", role_name: str) -> bool:
-    """Check if a role has ECR read access (managed or inline policies)."""
-    if not role_name:
-        return False
-    required = set(ECR_CHECK_ACTIONS)
-    found_actions: set[str] = set()
+def _is_aws_managed_ecr_policy(arn: str) -> bool:
+    """AWS-managed ECR policies are known to grant pull access; skip fetching them."""
+    return ":aws:policy/" in arn and ("ContainerRegistry" in arn or "ECR" in arn)
+
 
-    # Check managed policies
+def get_role_policy_documents(iam_client: "IAMClient", role_name: str) -> list[dict[str, Any]]:
+    """Collect the managed and inline policy documents attached to a role.
+
+    Every policy is fetched even when an earlier one fails. If any list or
+    document could not be read, the role's access cannot be verified and a
+    RuntimeError naming the unreadable policies is raised.
+    """
+    docs: list[dict[str, Any]] = []
+    failed: list[str] = []
+
+    # Managed policies (documents come from the process-wide cache)
+    arns: list[str] = []
     try:
-        attached = iam_client.list_attached_role_policies(RoleName=role_name)
-        for pol in attached.get("AttachedPolicies", []):
-            arn = pol["PolicyArn"]
-            if "ContainerRegistry" in arn or "ECR" in arn:
-                return True
-            pv = iam_client.get_policy(PolicyArn=arn)
-            version_id = pv["Policy"]["DefaultVersionId"]
-            doc = iam_client.get_policy_version(PolicyArn=arn, VersionId=version_id)
-            policy_doc = doc["PolicyVersion"]["Document"]
-            if isinstance(policy_doc, str):
-                policy_doc = json.loads(policy_doc)
-            for stmt in policy_doc.get("Statement", []):
-                if stmt.get("Effect") != "Allow":
-                    continue
-                actions = stmt.get("Action", [])
-                if isinstance(actions, str):
-                    actions = [actions]
-                found_actions |= _actions_match(actions, required)
-                if required.issubset(found_actions):
-                    return True
-    except Exception:
-        pass
+        for page in iam_client.get_paginator("list_attached_role_policies").paginate(RoleName=role_name):
+            arns.extend(pol["PolicyArn"] for pol in page.get("AttachedPolicies", []))
+    except Exception as e:
+        failed.append(f"attached policy list ({aws_error_code(e) or e})")
+    for arn in arns:
+        if _is_aws_managed_ecr_policy(arn):
+            docs.append({"Statement": [{"Effect": "Allow", "Action": ECR_CHECK_ACTIONS, "Resource": "*"}]})
+            continue
+        try:
+            docs.append(_policy_cache.get_document(iam_client, arn))
+        except Exception as e:
+            failed.append(f"{arn} ({aws_error_code(e) or e})")
 
-    # Check inline policies
+    # Inline policies
+    names: list[str] = []
     try:
-        inline = iam_client.list_role_policies(RoleName=role_name)
-        for pol_name in inline.get("PolicyNames", []):
+        for page in iam_client.get_paginator("list_role_policies").paginate(RoleName=role_name):
+            names.extend(page.get("PolicyNames", []))
+    except Exception as e:
+        failed.append(f"inline policy list ({aws_error_code(e) or e})")
+    for pol_name in names:
+        try:
             doc_resp = iam_client.get_role_policy(RoleName=role_name, PolicyName=pol_name)
             policy_doc = doc_resp["PolicyDocument"]
             if isinstance(policy_doc, str):
                 policy_doc = json.loads(policy_doc)
-            for stmt in policy_doc.get("Statement", []):
-                if stmt.get("Effect") != "Allow":
-                    continue
-                actions = stmt.get("Action", [])
-                if isinstance(actions, str):
-                    actions = [actions]
-                found_actions |= _actions_match(actions, required)
-                if required.issubset(found_actions):
-                    return True
-    except Exception:
-        pass
+            docs.append(policy_doc)
+        except Exception as e:
+            failed.append(f"inline {pol_name} ({aws_error_code(e) or e})")
+
+    if failed:
+        raise RuntimeError(f"Cannot verify role {role_name}; unreadable: {', '.join(failed)}")
+    return docs
+
+
+def compile_role_policy(iam_client: "IAMClient", role_name: str) -> CompiledPolicy:
+    """Compile all of a role's policies for local action/resource checks."""
+    return CompiledPolicy.from_documents(get_role_policy_documents(iam_client, role_name))
 
-    return required.issubset(found_actions)
+
+def check_role_ecr_access(iam_client: "IAMClient", role_name: str) -> bool:
+    """Check if a role has ECR read access (managed or inline policies).
+
+    Deny statements, NotAction/NotResource and conditions are honoured by the
+    local policy evaluator, so an explicit Deny turns the check red. Raises
+    RuntimeError when some of the role's policies cannot be read.
+    """
+    if not role_name:
+        return False
+    policy = compile_role_policy(iam_client, role_name)
+    return all(policy.is_allowed_anywhere(action) for action in ECR_CHECK_ACTIONS)
 
 
 def get_inline_ecr_policy(iam_client: "IAMClient", role_name: str) -> dict[str, Any] | None:
@@ -212,8 +406,21 @@ def list_ecr_repos(ecr_client: "ECRClient") -> list[dict[str, str]]:
     return repos
 
 
-def get_repo_arns_in_policy(policy_doc: dict[str, Any] | None) -> set[str]:
-    """Extract ECR repo ARNs from a policy document."""
+def _expand_repo_pattern(pattern: str, known_repo_arns: set[str]) -> set[str]:
+    matches = {arn for arn in known_repo_arns if wildcard_match(pattern, arn)}
+    # Keep a pattern that matches nothing we know about, so rewriting the
+    # policy never silently revokes access.
+    return matches or {pattern}
+
+
+def get_repo_arns_in_policy(
+    policy_doc: dict[str, Any] | None, known_repo_arns: set[str] | None = None
+) -> set[str]:
+    """Extract ECR repo ARNs from a policy document.
+
+    Wildcard resources (written by ``compact_repo_arns``) are expanded to
+    the matching ARNs in ``known_repo_arns`` when given.
+    """
     if not policy_doc:
         return set()
     arns: set[str] = set()
@@ -224,13 +431,68 @@ def get_repo_arns_in_policy(policy_doc: dict[str, Any] | None) -> set[str]:
         if isinstance(resources, str):
             resources = [resources]
         for r in resources:
-            if ":repository/" in r:
+            if ":repository/" not in r:
+                continue
+            if known_repo_arns and ("*" in r or "?" in r):
+                arns |= _expand_repo_pattern(r, known_repo_arns)
+            else:
                 arns.add(r)
     return arns
 
 
-def build_ecr_policy(repo_arns: set[str]) -> dict[str, Any]:
-    """Build the DeadlineECRAccess policy document for the given repo ARNs."""
+def policy_size(policy_doc: dict[str, Any]) -> int:
+    """Length of a policy as IAM counts it against its quotas (no whitespace)."""
+    return len(json.dumps(policy_doc, separators=(",", ":")))
+
+
+_NAME_BOUNDARIES = "-_./"
+
+
+def _boundary_prefixes(name: str) -> list[str]:
+    """``""`` plus every prefix of ``name`` that ends in a separator, shortest first."""
+    return [""] + [name[: i + 1] for i, ch in enumerate(name) if ch in _NAME_BOUNDARIES]
+
+
+def compact_repo_arns(repo_arns: set[str], known_repo_arns: set[str]) -> list[str]:
+    """Replace groups of repo ARNs with ``repository/<prefix>*`` wildcards.
+
+    A wildcard is only used when every known repository under the prefix is
+    selected, so relative to ``known_repo_arns`` the result grants exactly
+    ``repo_arns``. Prefixes end at a name separator (``team-*``, ``ml/*``)
+    and must cover at least two repositories; the shortest such prefix wins.
+    """
+    selected = set(repo_arns)
+    by_base: dict[str, list[str]] = {}
+    result: list[str] = []
+    for arn in set(known_repo_arns) | selected:
+        base, sep, name = arn.partition(":repository/")
+        if sep:
+            by_base.setdefault(base + sep, []).append(name)
+        elif arn in selected:
+            result.append(arn)
+
+    for base, names in by_base.items():
+        total: dict[str, int] = {}
+        chosen: dict[str, int] = {}
+        for name in names:
+            hit = base + name in selected
+            for prefix in _boundary_prefixes(name):
+                total[prefix] = total.get(prefix, 0) + 1
+                if hit:
+                    chosen[prefix] = chosen.get(prefix, 0) + 1
+        emitted: set[str] = set()
+        for name in sorted(n for n in names if base + n in selected):
+            for prefix in _boundary_prefixes(name):
+                if total[prefix] >= 2 and chosen.get(prefix) == total[prefix]:
+                    emitted.add(base + prefix + "*")
+                    break
+            else:
+                emitted.add(base + name)
+        result.extend(emitted)
+    return sorted(result)
+
+
+def _ecr_policy_document(resources: list[str]) -> dict[str, Any]:
     statements: list[dict[str, Any]] = [
         {
             "Sid": "ECRAuth",
@@ -239,26 +501,226 @@ def build_ecr_policy(repo_arns: set[str]) -> dict[str, Any]:
             "Resource": "*",
         },
     ]
-    if repo_arns:
+    if resources:
         statements.append(
             {
                 "Sid": "ECRReadPush",
                 "Effect": "Allow",
                 "Action": ECR_READ_PUSH_ACTIONS,
-                "Resource": sorted(repo_arns),
+                "Resource": resources,
             }
         )
     return {"Version": "2012-10-17", "Statement": statements}
 
 
-def save_ecr_policy(iam_client: "IAMClient", role_name: str, repo_arns: set[str]) -> None:
-    """Save the DeadlineECRAccess inline policy to the role."""
-    policy_doc = build_ecr_policy(repo_arns)
+def build_ecr_policy(repo_arns: set[str], known_repo_arns: set[str] | None = None) -> dict[str, Any]:
+    """Build the DeadlineECRAccess policy document for the given repo ARNs.
+
+    ARNs are listed explicitly while they fit the inline policy quota. Past
+    that, and when the repo index is known, they are compacted into exact
+    prefix wildcards (see ``compact_repo_arns``).
+    """
+    policy_doc = _ecr_policy_document(sorted(repo_arns))
+    if known_repo_arns and policy_size(policy_doc) > INLINE_POLICY_MAX_CHARS:
+        policy_doc = _ecr_policy_document(compact_repo_arns(repo_arns, known_repo_arns))
+    return policy_doc
+
+
+def split_ecr_policy(
+    policy_doc: dict[str, Any], inline_limit: int = INLINE_POLICY_MAX_CHARS
+) -> tuple[dict[str, Any], list[dict[str, Any]]]:
+    """Split a policy that exceeds ``inline_limit`` into inline + managed parts.
+
+    The inline part keeps every statement but lists only as many
+    ``ECRReadPush`` resources as fit; the remaining resources are spread over
+    managed policy documents that each fit ``MANAGED_POLICY_MAX_CHARS``.
+    ``inline_limit`` is what the role's other inline policies leave of the
+    inline quota; ValueError is raised if not even one resource fits in it.
+    """
+    if policy_size(policy_doc) <= inline_limit:
+        return policy_doc, []
+    statements = policy_doc["Statement"]
+    idx = next((i for i, st in enumerate(statements) if st.get("Sid") == "ECRReadPush"), None)
+    if idx is None:
+        raise ValueError(f"{POLICY_NAME} does not fit the {inline_limit} inline policy characters left on the role")
+    resources = list(statements[idx]["Resource"])
+
+    def fill(template: dict[str, Any], limit: int) -> dict[str, Any]:
+        # Each extra resource costs its JSON string plus a comma.
+        stmt = next(st for st in template["Statement"] if st.get("Sid") == "ECRReadPush")
+        stmt["Resource"] = [resources.pop(0)]
+        size = policy_size(template)
+        while resources and size + len(json.dumps(resources[0])) + 1 <= limit:
+            size += len(json.dumps(resources[0])) + 1
+            stmt["Resource"].append(resources.pop(0))
+        return template
+
+    inline = fill(
+        {**policy_doc, "Statement": [dict(st) for st in statements]},
+        inline_limit,
+    )
+    if policy_size(inline) > inline_limit:
+        raise ValueError(f"{POLICY_NAME} does not fit the {inline_limit} inline policy characters left on the role")
+    managed: list[dict[str, Any]] = []
+    while resources:
+        part = {"Version": "2012-10-17", "Statement": [dict(statements[idx])]}
+        managed.append(fill(part, MANAGED_POLICY_MAX_CHARS))
+    return inline, managed
+
+
+def _merge_ecr_policy(inline: dict[str, Any] | None, parts: list[dict[str, Any]]) -> dict[str, Any] | None:
+    """Fold the resources of managed parts back into the inline document."""
+    if not parts:
+        return inline
+    extra = [r for part in parts for r in get_repo_arns_in_policy(part)]
+    merged = dict(inline) if inline else _ecr_policy_document([])
+    statements = [dict(st) for st in merged.get("Statement", [])]
+    for st in statements:
+        if st.get("Sid") == "ECRReadPush":
+            own = st.get("Resource", [])
+            st["Resource"] = sorted(set([own] if isinstance(own, str) else own) | set(extra))
+            break
+    else:
+        statements.append(_ecr_policy_document(sorted(set(extra)))["Statement"][1])
+    merged["Statement"] = statements
+    return merged
+
+
+def _managed_part_prefix(role_name: str) -> str:
+    return f"{POLICY_NAME}-{role_name}-"
+
+
+def get_ecr_policy_parts(iam_client: "IAMClient", role_name: str) -> list[dict[str, str]]:
+    """Managed overflow policies attached to the role, as ``{"PolicyName", "PolicyArn"}``."""
+    prefix = _managed_part_prefix(role_name)
+    parts: list[dict[str, str]] = []
+    paginator = iam_client.get_paginator("list_attached_role_policies")
+    for page in paginator.paginate(RoleName=role_name, PathPrefix=MANAGED_POLICY_PATH):
+        for p in page.get("AttachedPolicies", []):
+            if p["PolicyName"].startswith(prefix):
+                parts.append({"PolicyName": p["PolicyName"], "PolicyArn": p["PolicyArn"]})
+    return parts
+
+
+def _other_policy_usage(iam_client: "IAMClient", role_name: str) -> tuple[int, int]:
+    """Inline policy characters and managed policy attachments the role uses besides DeadlineECRAccess."""
+    inline_chars = 0
+    for page in iam_client.get_paginator("list_role_policies").paginate(RoleName=role_name):
+        for name in page.get("PolicyNames", []):
+            if name == POLICY_NAME:
+                continue
+            doc = iam_client.get_role_policy(RoleName=role_name, PolicyName=name)["PolicyDocument"]
+            inline_chars += policy_size(json.loads(doc) if isinstance(doc, str) else doc)
+    prefix = _managed_part_prefix(role_name)
+    attached = 0
+    for page in iam_client.get_paginator("list_attached_role_policies").paginate(RoleName=role_name):
+        for p in page.get("AttachedPolicies", []):
+            own = p["PolicyName"].startswith(prefix) and f":policy{MANAGED_POLICY_PATH}" in p["PolicyArn"]
+            attached += not own
+    return inline_chars, attached
+
+
+def read_ecr_policy(iam_client: "IAMClient", role_name: str) -> dict[str, Any] | None:
+    """The role's whole DeadlineECRAccess policy: inline document plus managed overflow parts.
+
+    Returns None if the role has no such policy. Any other error propagates,
+    so callers that rewrite the policy never mistake a failed read for an
+    empty one.
+    """
+    try:
+        resp = iam_client.get_role_policy(RoleName=role_name, PolicyName=POLICY_NAME)
+        inline = resp["PolicyDocument"]
+        if isinstance(inline, str):
+            inline = json.loads(inline)
+    except Exception as e:
+        if aws_error_code(e) != "NoSuchEntity":
+            raise
+        inline = None
+    parts = [
+        _policy_cache.get_document(iam_client, p["PolicyArn"])
+        for p in get_ecr_policy_parts(iam_client, role_name)
+    ]
+    return _merge_ecr_policy(inline, parts)
+
+
+def get_ecr_policy(iam_client: "IAMClient", role_name: str) -> dict[str, Any] | None:
+    """Like ``read_ecr_policy``, falling back to the inline document alone on errors."""
+    try:
+        return read_ecr_policy(iam_client, role_name)
+    except Exception:
+        return get_inline_ecr_policy(iam_client, role_name)
+
+
+def _put_managed_part(iam_client: "IAMClient", policy_arn: str, name: str, document: str) -> None:
+    try:
+        iam_client.create_policy(PolicyName=name, Path=MANAGED_POLICY_PATH, PolicyDocument=document)
+        return
+    except Exception as e:
+        if aws_error_code(e) != "EntityAlreadyExists":
+            raise
+    # A managed policy keeps at most five versions; make room for the new one.
+    versions = iam_client.list_policy_versions(PolicyArn=policy_arn)["Versions"]
+    old = sorted((v for v in versions if not v["IsDefaultVersion"]), key=lambda v: v["CreateDate"])
+    for v in old[: max(0, len(versions) - 4)]:
+        iam_client.delete_policy_version(PolicyArn=policy_arn, VersionId=v["VersionId"])
+    iam_client.create_policy_version(PolicyArn=policy_arn, PolicyDocument=document, SetAsDefault=True)
+    _policy_cache.invalidate(policy_arn)
+
+
+def _delete_managed_part(iam_client: "IAMClient", role_name: str, policy_arn: str) -> None:
+    iam_client.detach_role_policy(RoleName=role_name, PolicyArn=policy_arn)
+    for v in iam_client.list_policy_versions(PolicyArn=policy_arn)["Versions"]:
+        if not v["IsDefaultVersion"]:
+            iam_client.delete_policy_version(PolicyArn=policy_arn, VersionId=v["VersionId"])
+    iam_client.delete_policy(PolicyArn=policy_arn)
+    _policy_cache.invalidate(policy_arn)
+
+
+def save_ecr_policy(
+    iam_client: "IAMClient", role_name: str, repo_arns: set[str], known_repo_arns: set[str] | None = None
+) -> None:
+    """Save the DeadlineECRAccess policy to the role.
+
+    If the policy exceeds the inline quota even after compaction, the
+    overflow goes to managed policies ``DeadlineECRAccess-<role>-<n>`` under
+    ``MANAGED_POLICY_PATH``, attached to the role. Parts are written before
+    the inline policy shrinks and unused parts are removed last, so access to
+    repos that stay selected never lapses.
+
+    The inline share is what the role's other inline policies leave of the
+    quota. ValueError is raised, before anything is written, if the policy
+    does not fit in that or would need more managed policies than the role
+    has attachment slots for.
+    """
+    other_chars, other_attached = _other_policy_usage(iam_client, role_name)
+    inline, managed = split_ecr_policy(
+        build_ecr_policy(repo_arns, known_repo_arns), INLINE_POLICY_MAX_CHARS - other_chars
+    )
+    if other_attached + len(managed) > MANAGED_POLICIES_PER_ROLE:
+        raise ValueError(
+            f"{POLICY_NAME} for {role_name} needs {len(managed)} managed policies, but the role already has "
+            f"{other_attached} of its {MANAGED_POLICIES_PER_ROLE} attached; select fewer repositories"
+        )
+    existing = {p["PolicyName"]: p["PolicyArn"] for p in get_ecr_policy_parts(iam_client, role_name)}
+    wanted: set[str] = set()
+    if managed:
+        role_arn = iam_client.get_role(RoleName=role_name)["Role"]["Arn"]
+        partition, account = role_arn.split(":")[1], role_arn.split(":")[4]
+        for n, doc in enumerate(managed, start=1):
+            name = f"{_managed_part_prefix(role_name)}{n}"
+            policy_arn = f"arn:{partition}:iam::{account}:policy{MANAGED_POLICY_PATH}{name}"
+            _put_managed_part(iam_client, policy_arn, name, json.dumps(doc))
+            if name not in existing:
+                iam_client.attach_role_policy(RoleName=role_name, PolicyArn=policy_arn)
+            wanted.add(name)
     iam_client.put_role_policy(
         RoleName=role_name,
         PolicyName=POLICY_NAME,
-        PolicyDocument=json.dumps(policy_doc),
+        PolicyDocument=json.dumps(inline),
     )
+    for name, policy_arn in existing.items():
+        if name not in wanted:
+            _delete_managed_part(iam_client, role_name, policy_arn)
 
 
 def update_fleet_host_config(client: Any, farm_id: str, fleet_id: str, script_body: str) -> None:
@@ -0,0 +1,132 @@
+"""Apply one ECR repo change to the DeadlineECRAccess policy of many roles."""
+
+from __future__ import annotations
+
+import random
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import TYPE_CHECKING, Any, Callable, Iterable, Iterator, TypeVar
+
+from .aws_clients import (
+    aws_error_code,
+    build_ecr_policy,
+    get_repo_arns_in_policy,
+    read_ecr_policy,
+    save_ecr_policy,
+)
+
+if TYPE_CHECKING:
+    from mypy_boto3_iam import IAMClient
+
+T = TypeVar("T")
+
+# IAM write APIs are rate limited per account; a handful of parallel writers
+# finishes 40 roles in seconds without tripping sustained throttling.
+BATCH_MAX_WORKERS = 8
+IAM_MAX_ATTEMPTS = 6
+BACKOFF_BASE_SECONDS = 0.5
+BACKOFF_MAX_SECONDS = 10.0
+
+_RETRYABLE_CODES = {
+    "Throttling",
+    "ThrottlingException",
+    "RequestLimitExceeded",
+    "ConcurrentModification",
+    "ServiceFailure",
+}
+
+
+def with_backoff(
+    call: Callable[[], T],
+    max_attempts: int = IAM_MAX_ATTEMPTS,
+    sleep: Callable[[float], None] = time.sleep,
+) -> tuple[T, int]:
+    """Run ``call``, retrying throttling errors with full-jitter exponential backoff.
+
+    Returns the result and the number of attempts it took. Errors that are
+    not throttling/transient, or the last failed attempt, are re-raised.
+    """
+    attempt = 1
+    while True:
+        try:
+            return call(), attempt
+        except Exception as e:
+            if aws_error_code(e) not in _RETRYABLE_CODES or attempt >= max_attempts:
+                raise
+            sleep(random.uniform(0, min(BACKOFF_MAX_SECONDS, BACKOFF_BASE_SECONDS * 2 ** (attempt - 1))))
+            attempt += 1
+
+
+def _apply_role(
+    iam_client: "IAMClient",
+    role_name: str,
+    add: set[str],
+    remove: set[str],
+    known_repo_arns: set[str] | None,
+    dry_run: bool,
+    sleep: Callable[[float], None],
+) -> dict[str, Any]:
+    result: dict[str, Any] = {
+        "roleName": role_name,
+        "status": "failed",
+        "added": [],
+        "removed": [],
+        "attempts": 0,
+        "error": "",
+    }
+    try:
+        # Read errors propagate, so a role that could not be read is never
+        # overwritten with a policy missing its existing repos.
+        current_doc, _ = with_backoff(lambda: read_ecr_policy(iam_client, role_name), sleep=sleep)
+        current = get_repo_arns_in_policy(current_doc, known_repo_arns)
+        target = (current | add) - remove
+        target_doc = build_ecr_policy(target, known_repo_arns)
+        result["added"] = sorted(target - current)
+        result["removed"] = sorted(current - target)
+        if current_doc == target_doc or (current_doc is None and not target):
+            result["status"] = "unchanged"
+            return result
+        if dry_run:
+            result["status"] = "pending"
+            return result
+        _, result["attempts"] = with_backoff(
+            lambda: save_ecr_policy(iam_client, role_name, target, known_repo_arns),
+            sleep=sleep,
+        )
+        result["status"] = "updated"
+    except Exception as e:
+        result["error"] = str(e)
+    return result
+
+
+def apply_batch(
+    iam_client: "IAMClient",
+    role_names: Iterable[str],
+    add: Iterable[str] = (),
+    remove: Iterable[str] = (),
+    known_repo_arns: set[str] | None = None,
+    dry_run: bool = False,
+    max_workers: int = BATCH_MAX_WORKERS,
+    sleep: Callable[[float], None] = time.sleep,
+) -> Iterator[dict[str, Any]]:
+    """Add/remove repo ARNs across many roles, yielding one result per role as it finishes.
+
+    Each role is read, diffed against its target policy and only written when
+    the document actually changes. ``known_repo_arns`` (the ECR index) lets
+    large policies be compacted and wildcard resources be expanded.
+
+    Results are dicts with ``roleName``, ``status`` ("updated", "unchanged",
+    "pending" for a dry run, or "failed"), ``added``/``removed`` repo ARNs,
+    ``attempts`` for the write and ``error``.
+    """
+    add_set, remove_set = set(add), set(remove)
+    roles = sorted({name for name in role_names if name})
+    if not roles:
+        return
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(roles))) as pool:
+        futures = [
+            pool.submit(_apply_role, iam_client, r, add_set, remove_set, known_repo_arns, dry_run, sleep)
+            for r in roles
+        ]
+        for future in as_completed(futures):
+            yield future.result()
@@ -0,0 +1,117 @@
+"""In-memory app config with coalesced, atomic write-back to disk."""
+
+from __future__ import annotations
+
+import json
+import os
+import tempfile
+import threading
+import time
+from typing import Any
+
+# Short debounce so a cascade of combo changes lands in one write.
+WRITE_DEBOUNCE_SECONDS = 0.25
+# Never write more often than this.
+WRITE_MIN_INTERVAL_SECONDS = 1.0
+
+
+def app_config_path() -> str:
+    """Path of the persisted app selections."""
+    return os.path.expanduser("~/.deadline/container-config.json")
+
+
+def write_json_atomic(path: str, data: Any) -> None:
+    """Write JSON to ``path`` via a temp file and rename so readers never see a partial file."""
+    directory = os.path.dirname(path)
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(prefix=".tmp-", dir=directory)
+    try:
+        with os.fdopen(fd, "w") as f:
+            json.dump(data, f, indent=2)
+        os.replace(tmp, path)
+    except BaseException:
+        if os.path.exists(tmp):
+            os.unlink(tmp)
+        raise
+
+
+class ConfigStore:
+    """Thread-safe in-memory copy of ``container-config.json``.
+
+    Reads are served from memory. Updates mark the store dirty and arm a
+    background timer; the timer writes the latest state once, at most every
+    ``min_interval`` seconds. ``flush()`` writes synchronously (on shutdown).
+    """
+
+    def __init__(
+        self,
+        data: dict[str, str] | None = None,
+        path: str | None = None,
+        debounce: float = WRITE_DEBOUNCE_SECONDS,
+        min_interval: float = WRITE_MIN_INTERVAL_SECONDS,
+    ) -> None:
+        self._path = path or app_config_path()
+        self._data: dict[str, str] = dict(data or {})
+        self._written: dict[str, str] = dict(self._data)
+        self._debounce = debounce
+        self._min_interval = min_interval
+        self._lock = threading.Lock()
+        self._timer: threading.Timer | None = None
+        self._last_write = float("-inf")
+        self.writes = 0
+
+    @classmethod
+    def load(cls, path: str | None = None, **kwargs: Any) -> "ConfigStore":
+        """Read the config file once; a missing or corrupt file starts empty."""
+        path = path or app_config_path()
+        try:
+            with open(path) as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            data = {}
+        return cls(data if isinstance(data, dict) else {}, path, **kwargs)
+
+    def get(self, key: str, default: str = "") -> str:
+        with self._lock:
+            return self._data.get(key, default)
+
+    def data(self) -> dict[str, str]:
+        """A copy of the current values."""
+        with self._lock:
+            return dict(self._data)
+
+    def update(self, values: dict[str, str]) -> None:
+        """Merge ``values`` and schedule a write if anything changed."""
+        with self._lock:
+            changed = any(self._data.get(k) != v for k, v in values.items())
+            if not changed:
+                return
+            self._data.update(values)
+            if self._timer is None:
+                delay = max(self._debounce, self._last_write + self._min_interval - time.monotonic())
+                self._timer = threading.Timer(delay, self._write)
+                self._timer.daemon = True
+                self._timer.start()
+
+    def flush(self) -> None:
+        """Write pending changes now."""
+        with self._lock:
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+        self._write()
+
+    def _write(self) -> None:
+        with self._lock:
+            self._timer = None
+            if self._data == self._written:
+                return
+            snapshot = dict(self._data)
+            self._last_write = time.monotonic()
+        try:
+            write_json_atomic(self._path, snapshot)
+        except OSError:
+            return
+        with self._lock:
+            self._written = snapshot
+            self.writes += 1
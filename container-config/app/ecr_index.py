@@ -0,0 +1,129 @@
+"""Per-region cached index of ECR repositories and their image metadata."""
+
+from __future__ import annotations
+
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import TYPE_CHECKING, Any, Callable
+
+from .aws_clients import get_ecr_client, list_ecr_repos
+
+if TYPE_CHECKING:
+    from mypy_boto3_ecr import ECRClient
+
+# How long the repository list is trusted before it is re-listed.
+ECR_INDEX_TTL_SECONDS = 300
+# How long a repository's image metadata is trusted before describe_images runs again.
+IMAGE_METADATA_TTL_SECONDS = 900
+IMAGE_METADATA_WORKERS = 8
+
+
+def _timestamp(value: Any) -> float | None:
+    if isinstance(value, datetime):
+        return value.timestamp()
+    if isinstance(value, (int, float)):
+        return float(value)
+    return None
+
+
+def summarize_images(ecr_client: "ECRClient", repo_name: str) -> dict[str, Any]:
+    """Summarize a repository's images: count, total size and the latest push."""
+    count = 0
+    total_size = 0
+    latest: dict[str, Any] | None = None
+    latest_ts = float("-inf")
+    paginator = ecr_client.get_paginator("describe_images")
+    for page in paginator.paginate(repositoryName=repo_name):
+        for img in page.get("imageDetails", []):
+            count += 1
+            total_size += img.get("imageSizeInBytes", 0)
+            ts = _timestamp(img.get("imagePushedAt"))
+            if ts is not None and ts > latest_ts:
+                latest, latest_ts = img, ts
+    return {
+        "imageCount": count,
+        "totalSizeBytes": total_size,
+        "latestTags": list(latest.get("imageTags", [])) if latest else [],
+        "latestPushedAt": latest_ts if latest else None,
+        "latestSizeBytes": latest.get("imageSizeInBytes", 0) if latest else 0,
+    }
+
+
+class EcrIndex:
+    """Repositories of one region, enriched with image tags, push times and sizes.
+
+    ``refresh()`` re-lists repositories only when the list is older than the
+    TTL, and then calls ``describe_images`` concurrently for new repositories
+    and for those whose metadata has gone stale. Unchanged repositories keep
+    their cached metadata.
+    """
+
+    def __init__(self, ecr_client: "ECRClient", clock: Callable[[], float] = time.monotonic) -> None:
+        self._ecr = ecr_client
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._refresh_lock = threading.Lock()
+        self._repos: dict[str, dict[str, Any]] = {}
+        self._meta_fetched: dict[str, float] = {}
+        self._listed_at = float("-inf")
+
+    def is_fresh(self) -> bool:
+        return self._clock() - self._listed_at < ECR_INDEX_TTL_SECONDS
+
+    def repos(self) -> list[dict[str, Any]]:
+        """Indexed repositories sorted by name."""
+        with self._lock:
+            return [dict(self._repos[name]) for name in sorted(self._repos)]
+
+    def refresh(self, force: bool = False) -> list[dict[str, Any]]:
+        """Bring the index up to date and return the repositories."""
+        with self._refresh_lock:
+            if not force and self.is_fresh():
+                return self.repos()
+            listed = list_ecr_repos(self._ecr)
+            now = self._clock()
+            with self._lock:
+                names = {r["repositoryName"] for r in listed}
+                for gone in set(self._repos) - names:
+                    del self._repos[gone]
+                    self._meta_fetched.pop(gone, None)
+                for r in listed:
+                    entry = self._repos.setdefault(r["repositoryName"], {})
+                    entry.update(r)
+                stale = [
+                    name
+                    for name in names
+                    if now - self._meta_fetched.get(name, float("-inf")) >= IMAGE_METADATA_TTL_SECONDS
+                ]
+            if stale:
+                with ThreadPoolExecutor(max_workers=IMAGE_METADATA_WORKERS) as pool:
+                    results = pool.map(self._fetch_metadata, stale)
+                    with self._lock:
+                        for name, meta in zip(stale, results):
+                            if meta is not None and name in self._repos:
+                                self._repos[name].update(meta)
+                                self._meta_fetched[name] = now
+            self._listed_at = now
+            return self.repos()
+
+    def _fetch_metadata(self, repo_name: str) -> dict[str, Any] | None:
+        try:
+            return summarize_images(self._ecr, repo_name)
+        except Exception:
+            return None
+
+
+_indexes: dict[str, EcrIndex] = {}
+_indexes_lock = threading.Lock()
+
+
+def get_ecr_index(region: str = "us-west-2") -> EcrIndex:
+    """Return the process-wide index for ``region``."""
+    with _indexes_lock:
+        index = _indexes.get(region)
+        if index is None:
+            index = EcrIndex(get_ecr_client(region))
+            _indexes[region] = index
+        return index
@@ -0,0 +1,111 @@
+"""Farm-wide ECR access audit across all queues and fleets."""
+
+from __future__ import annotations
+
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor, as_completed
+from typing import TYPE_CHECKING, Any, Iterator
+
+from .aws_clients import (
+    check_role_ecr_access,
+    get_fleet_details,
+    get_queue_role_arn,
+    list_fleets,
+    list_queues,
+    role_name_from_arn,
+)
+from .host_config_builder import has_fragment
+
+if TYPE_CHECKING:
+    from mypy_boto3_iam import IAMClient
+
+AUDIT_MAX_WORKERS = 8
+
+
+class _RoleResults:
+    """Evaluate each role once, no matter how many queues/fleets share it.
+
+    The first caller for a role evaluates it on its own thread; later callers
+    block on the same future instead of queueing more work on the pool.
+    """
+
+    def __init__(self, iam: "IAMClient") -> None:
+        self._iam = iam
+        self._lock = threading.Lock()
+        self._futures: dict[str, Future[bool]] = {}
+        self.evaluations = 0
+
+    def has_ecr(self, role_name: str) -> bool:
+        if not role_name:
+            return False
+        with self._lock:
+            future = self._futures.get(role_name)
+            owner = future is None
+            if owner:
+                future = Future()
+                self._futures[role_name] = future
+                self.evaluations += 1
+        if owner:
+            try:
+                future.set_result(check_role_ecr_access(self._iam, role_name))
+            except Exception as e:
+                future.set_exception(e)
+        return future.result()
+
+
+def _audit_queue(dc: Any, roles: _RoleResults, farm_id: str, queue: dict[str, str]) -> dict[str, Any]:
+    result: dict[str, Any] = {
+        "kind": "queue",
+        "id": queue["queueId"],
+        "displayName": queue["displayName"],
+        "roleArn": "",
+        "hasEcr": False,
+        "hasDocker": None,
+        "error": "",
+    }
+    try:
+        result["roleArn"] = get_queue_role_arn(dc, farm_id, queue["queueId"])
+        result["hasEcr"] = roles.has_ecr(role_name_from_arn(result["roleArn"]))
+    except Exception as e:
+        result["error"] = str(e)
+    return result
+
+
+def _audit_fleet(dc: Any, roles: _RoleResults, farm_id: str, fleet: dict[str, str]) -> dict[str, Any]:
+    result: dict[str, Any] = {
+        "kind": "fleet",
+        "id": fleet["fleetId"],
+        "displayName": fleet["displayName"],
+        "roleArn": "",
+        "hasEcr": False,
+        "hasDocker": False,
+        "error": "",
+    }
+    try:
+        details = get_fleet_details(dc, farm_id, fleet["fleetId"])
+        result["roleArn"] = details["roleArn"]
+        host_cfg = details.get("hostConfiguration", {}).get("scriptBody", "")
+        result["hasDocker"] = has_fragment(host_cfg, "docker")
+        result["hasEcr"] = roles.has_ecr(role_name_from_arn(result["roleArn"]))
+    except Exception as e:
+        result["error"] = str(e)
+    return result
+
+
+def scan_farm(
+    dc: Any, iam: "IAMClient", farm_id: str, max_workers: int = AUDIT_MAX_WORKERS
+) -> Iterator[dict[str, Any]]:
+    """Audit every queue and fleet in a farm, yielding results as they finish.
+
+    Each result is a dict with ``kind`` ("queue" or "fleet"), ``id``,
+    ``displayName``, ``roleArn``, ``hasEcr``, ``hasDocker`` (None for queues)
+    and ``error``. Roles shared by several resources are evaluated once.
+    """
+    queues = list_queues(dc, farm_id)
+    fleets = list_fleets(dc, farm_id)
+    roles = _RoleResults(iam)
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        futures = [pool.submit(_audit_queue, dc, roles, farm_id, q) for q in queues]
+        futures += [pool.submit(_audit_fleet, dc, roles, farm_id, f) for f in fleets]
+        for future in as_completed(futures):
+            yield future.result()
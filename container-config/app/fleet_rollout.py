@@ -0,0 +1,138 @@
+"""Roll a host configuration script out to many fleets and verify it landed."""
+
+from __future__ import annotations
+
+import hashlib
+import queue
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Iterable, Iterator
+
+from .aws_clients import get_fleet_details, update_fleet_host_config
+from .batch_policy import with_backoff
+
+ROLLOUT_MAX_WORKERS = 8
+POLL_INTERVAL_SECONDS = 5.0
+# How long a fleet may stay in UPDATE_IN_PROGRESS before the rollout gives up on it.
+SETTLE_TIMEOUT_SECONDS = 300.0
+
+_FAILED_STATUSES = {"UPDATE_FAILED", "CREATE_FAILED"}
+
+
+def script_sha256(script: str) -> str:
+    return hashlib.sha256(script.encode("utf-8")).hexdigest()
+
+
+def _script_body(details: dict[str, Any]) -> str:
+    return details.get("hostConfiguration", {}).get("scriptBody", "")
+
+
+def _rollout_fleet(
+    dc: Any,
+    farm_id: str,
+    fleet: dict[str, str],
+    render: Callable[[str], str],
+    dry_run: bool,
+    emit: Callable[[dict[str, Any]], None],
+    poll_interval: float,
+    settle_timeout: float,
+    sleep: Callable[[float], None],
+    clock: Callable[[], float],
+) -> None:
+    result: dict[str, Any] = {
+        "fleetId": fleet["fleetId"],
+        "displayName": fleet.get("displayName", fleet["fleetId"]),
+        "status": "failed",
+        "sha256": "",
+        "error": "",
+    }
+    try:
+        current, _ = with_backoff(lambda: get_fleet_details(dc, farm_id, fleet["fleetId"]), sleep=sleep)
+        script = render(_script_body(current))
+        expected = script_sha256(script)
+        result["sha256"] = expected
+        if script_sha256(_script_body(current)) == expected:
+            result["status"] = "unchanged"
+            emit(result)
+            return
+        if dry_run:
+            result["status"] = "pending"
+            emit(result)
+            return
+
+        with_backoff(lambda: update_fleet_host_config(dc, farm_id, fleet["fleetId"], script), sleep=sleep)
+        emit({**result, "status": "updating"})
+        # The update is accepted asynchronously: wait for the fleet to settle
+        # and for get_fleet to return exactly the script that was sent.
+        deadline = clock() + settle_timeout
+        while True:
+            details, _ = with_backoff(lambda: get_fleet_details(dc, farm_id, fleet["fleetId"]), sleep=sleep)
+            status = details.get("status", "")
+            if status in _FAILED_STATUSES:
+                result["error"] = details.get("statusMessage") or status
+                break
+            if status == "ACTIVE" and script_sha256(_script_body(details)) == expected:
+                result["status"] = "updated"
+                break
+            if clock() >= deadline:
+                if status == "ACTIVE":
+                    result["error"] = "Stored scriptBody does not match the script that was sent"
+                else:
+                    result["error"] = f"Fleet still {status or 'unknown'} after {settle_timeout:.0f}s"
+                break
+            sleep(poll_interval)
+    except Exception as e:
+        result["error"] = str(e)
+    emit(result)
+
+
+def rollout_host_config(
+    dc: Any,
+    farm_id: str,
+    fleets: Iterable[dict[str, str]],
+    render: Callable[[str], str],
+    dry_run: bool = False,
+    max_workers: int = ROLLOUT_MAX_WORKERS,
+    poll_interval: float = POLL_INTERVAL_SECONDS,
+    settle_timeout: float = SETTLE_TIMEOUT_SECONDS,
+    sleep: Callable[[float], None] = time.sleep,
+    clock: Callable[[], float] = time.monotonic,
+) -> Iterator[dict[str, Any]]:
+    """Update the host config of many fleets concurrently, yielding progress as it happens.
+
+    ``render`` maps a fleet's current script to the one it should have, so
+    user sections of each fleet can be kept (see ``update_host_config``).
+    Fleets whose script already matches are not written. After a write the
+    fleet is polled until it is ACTIVE with a ``scriptBody`` whose sha256
+    matches the script sent.
+
+    Events are dicts with ``fleetId``, ``displayName``, ``status``, ``sha256``
+    and ``error``. A fleet first reports "updating" once its write is
+    accepted, then exactly one final status: "updated", "unchanged",
+    "pending" (dry run) or "failed".
+    """
+    targets = list({f["fleetId"]: f for f in fleets if f.get("fleetId")}.values())
+    if not targets:
+        return
+    events: queue.Queue[dict[str, Any]] = queue.Queue()
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(targets))) as pool:
+        for fleet in targets:
+            pool.submit(
+                _rollout_fleet,
+                dc,
+                farm_id,
+                fleet,
+                render,
+                dry_run,
+                events.put,
+                poll_interval,
+                settle_timeout,
+                sleep,
+                clock,
+            )
+        remaining = len(targets)
+        while remaining:
+            event = events.get()
+            if event["status"] != "updating":
+                remaining -= 1
+            yield event
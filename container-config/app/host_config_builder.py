@@ -1,7 +1,13 @@
-"""Build fleet host configuration scripts from checkbox options."""
+"""Build fleet host configuration scripts from a registry of fragments."""
 
 from __future__ import annotations
 
+import json
+import re
+import shlex
+from dataclasses import dataclass, field
+from typing import Any, Callable, Iterable
+
 HEADER = """#!/bin/bash
 set -e
 """
@@ -34,6 +40,18 @@ nvidia-ctk cdi generate --output=/etc/cdi/nvidia.yaml
 systemctl restart docker
 """
 
+ECR_LOGIN_FRAGMENT = """
+# --- ECR credential helper (root and job-user) ---
+dnf install -y amazon-ecr-credential-helper
+for home in /root $(getent passwd job-user | cut -d: -f6); do
+    mkdir -p "$home/.docker"
+    echo '{"credsStore": "ecr-login"}' > "$home/.docker/config.json"
+done
+if id "job-user" &>/dev/null; then
+    chown -R job-user: "$(getent passwd job-user | cut -d: -f6)/.docker"
+fi
+"""
+
 
 def swap_fragment(size_gb: int) -> str:
     """Generate swap configuration fragment."""
@@ -51,8 +69,630 @@ fi
 """
 
 
+# Must leave room for the other fragments inside update_fleet_host_config's
+# 600 s scriptTimeoutSeconds.
+PREPULL_TIMEOUTS = [120, 240, 300, 420]
+PREPULL_MAX_TIMEOUT_SECONDS = 540
+PREPULL_LOG = "/var/log/deadline-prepull.log"
+
+
+def image_prepull_fragment(images: str, timeout_s: int = 300, mode: str = "background") -> str:
+    """Pull the listed images in parallel so jobs find them in the local cache.
+
+    Images already present are skipped, each pull is bounded by ``timeout``,
+    and duplicates in the list are pulled once. In ``background`` mode the
+    pulls continue after the script returns, so the worker starts while
+    they run (a job that needs an image still in flight joins that pull).
+    """
+    refs = sorted({shlex.quote(i) for i in re.split(r"[\s,]+", images) if i})
+    timeout_s = min(int(timeout_s), PREPULL_MAX_TIMEOUT_SECONDS)
+    pulls = f"""prepull_one() {{
+    if docker image inspect "$1" >/dev/null 2>&1; then
+        echo "prepull: $1 already present"
+    elif timeout {timeout_s} docker pull --quiet "$1" >/dev/null; then
+        echo "prepull: pulled $1"
+    else
+        echo "prepull: failed $1" >&2
+    fi
+}}
+prepull_all() {{
+    for image in {" ".join(refs)}; do
+        prepull_one "$image" &
+    done
+    wait
+}}"""
+    if mode == "wait":
+        run = "prepull_all"
+    else:
+        run = f"prepull_all >>{PREPULL_LOG} 2>&1 </dev/null &\ndisown"
+    return f"""
+# --- Pre-pull container images ({mode}, {timeout_s}s per image) ---
+{pulls}
+{run}
+"""
+
+
+DOCKER_DOWNLOAD_LIMITS = [3, 6, 10, 16]
+DOCKER_IMAGE_STORES = ["overlay2", "containerd"]
+
+# Merges settings from the environment into daemon.json, keeping keys that
+# other fragments (e.g. the NVIDIA runtime) wrote there.
+_DAEMON_JSON_MERGE = """python3 - <<'PY'
+import json, os
+path = "/etc/docker/daemon.json"
+try:
+    with open(path) as f:
+        cfg = json.load(f)
+except (OSError, ValueError):
+    cfg = {}
+cfg["max-concurrent-downloads"] = int(os.environ["DOCKER_MAX_DOWNLOADS"])
+cfg["max-download-attempts"] = 5
+if os.environ["DOCKER_IMAGE_STORE"] == "containerd":
+    cfg.pop("storage-driver", None)
+    cfg.setdefault("features", {})["containerd-snapshotter"] = True
+else:
+    cfg["storage-driver"] = "overlay2"
+    cfg.get("features", {}).pop("containerd-snapshotter", None)
+os.makedirs(os.path.dirname(path), exist_ok=True)
+with open(path, "w") as f:
+    json.dump(cfg, f, indent=2)
+PY"""
+
+
+def docker_tuning_fragment(max_downloads: int = 10, image_store: str = "overlay2") -> str:
+    """Tune the Docker daemon for pulling large multi-layer images.
+
+    Raises ``max-concurrent-downloads`` (Docker's default is 3), installs
+    pigz so gzip layers decompress on all cores, and selects the storage
+    backend. ``containerd`` switches to the containerd image store (native
+    zstd layers, pluggable snapshotters) when the daemon is 24 or newer and
+    falls back to overlay2 otherwise.
+    """
+    store = shlex.quote(image_store)
+    return f"""
+# --- Docker daemon tuning ({int(max_downloads)} concurrent downloads, {image_store}) ---
+dnf install -y pigz
+docker_store={store}
+docker_major=$(docker version --format '{{{{.Server.Version}}}}' 2>/dev/null | cut -d. -f1)
+if [ "$docker_store" = containerd ] && [ "${{docker_major:-0}}" -lt 24 ]; then
+    docker_store=overlay2
+fi
+DOCKER_MAX_DOWNLOADS={int(max_downloads)} DOCKER_IMAGE_STORE="$docker_store" {_DAEMON_JSON_MERGE}
+systemctl restart docker
+"""
+
+
+NVME_SWAP_SIZES = [0, 32, 64, 128]
+NVME_VOLUME = "/mnt/nvme"
+# Directories bind-mounted onto the NVMe volume before Docker first starts.
+NVME_DATA_DIRS = ["/var/lib/docker", "/var/lib/containerd"]
+
+
+def nvme_fragment(scratch_dir: str = "/scratch", swap_gb: int = 0) -> str:
+    """Put Docker's data-root, a scratch directory and optionally swap on instance-store NVMe.
+
+    All instance-store devices are striped into one RAID0 array (a single
+    device is used directly), formatted as XFS and mounted at ``NVME_VOLUME``.
+    Docker/containerd data and ``scratch_dir`` are bind mounts into it, so
+    daemon.json stays untouched. Instances without instance storage skip
+    the whole section. The volume is ephemeral and is not added to fstab.
+    """
+    scratch = shlex.quote(scratch_dir)
+    swap_gb = int(swap_gb)
+    swap = (
+        f"""
+    if [ ! -f {NVME_VOLUME}/swapfile ]; then
+        fallocate -l {swap_gb}G {NVME_VOLUME}/swapfile
+        chmod 600 {NVME_VOLUME}/swapfile
+        mkswap {NVME_VOLUME}/swapfile
+    fi
+    swapon {NVME_VOLUME}/swapfile 2>/dev/null || true"""
+        if swap_gb
+        else ""
+    )
+    return f"""
+# --- Instance-store NVMe: RAID0 at {NVME_VOLUME}, Docker data, {scratch_dir}{f", {swap_gb}GB swap" if swap_gb else ""} ---
+nvme_devs=$(lsblk -dpno NAME,MODEL | awk '/Instance Storage/ {{print $1}}')
+if [ -n "$nvme_devs" ] && ! mountpoint -q {NVME_VOLUME}; then
+    nvme_count=$(echo "$nvme_devs" | wc -l)
+    if [ "$nvme_count" -gt 1 ]; then
+        dnf install -y mdadm
+        mdadm --create /dev/md0 --run --level=0 --raid-devices="$nvme_count" $nvme_devs
+        nvme_vol=/dev/md0
+    else
+        nvme_vol=$nvme_devs
+    fi
+    # -K skips the discard pass; instance storage starts out empty.
+    mkfs.xfs -f -K "$nvme_vol"
+    mkdir -p {NVME_VOLUME}
+    mount -o noatime "$nvme_vol" {NVME_VOLUME}
+fi
+if mountpoint -q {NVME_VOLUME}; then
+    docker_was_active=0
+    if systemctl is-active --quiet docker; then
+        docker_was_active=1
+        systemctl stop docker
+    fi
+    for dir in {" ".join(NVME_DATA_DIRS)}; do
+        mkdir -p "{NVME_VOLUME}$dir" "$dir"
+        mountpoint -q "$dir" || mount --bind "{NVME_VOLUME}$dir" "$dir"
+    done
+    mkdir -p {NVME_VOLUME}/scratch {scratch}
+    chmod 1777 {NVME_VOLUME}/scratch
+    mountpoint -q {scratch} || mount --bind {NVME_VOLUME}/scratch {scratch}{swap}
+    if [ "$docker_was_active" = 1 ]; then
+        systemctl start docker
+    fi
+fi
+"""
+
+
+def fsx_fragment(dns_name: str, mount_name: str, mount_point: str) -> str:
+    """Mount an FSx for Lustre file system."""
+    mp = shlex.quote(mount_point)
+    src = shlex.quote(f"{dns_name}@tcp:/{mount_name}")
+    return f"""
+# --- FSx for Lustre at {mount_point} ---
+dnf install -y lustre-client
+mkdir -p {mp}
+if ! mountpoint -q {mp}; then
+    mount -t lustre -o relatime,flock {src} {mp}
+fi
+"""
+
+
 SWAP_SIZES = [32, 64, 96, 128]
 
+# The summary line the timing fragment writes to the worker log on exit;
+# host_config_timing parses it back.
+TIMING_LOG_PREFIX = "HOSTCONFIG_TIMING "
+
+TIMING_FRAGMENT = """
+# --- Boot timing: per-fragment durations, summarized on exit ---
+_hc_start=$(date +%s%N)
+_hc_frag=""
+_hc_frag_start=0
+_hc_times=""
+_hc_ms() { echo $(( ($(date +%s%N) - $1) / 1000000 )); }
+_hc_begin() {
+    _hc_frag=$1
+    _hc_frag_start=$(date +%s%N)
+    echo "hostconfig: begin $1 at $(date -u +%FT%T.%3NZ)"
+}
+_hc_end() {
+    local ms
+    ms=$(_hc_ms "$_hc_frag_start")
+    _hc_times="${_hc_times:+$_hc_times,}\\"$1\\":$ms"
+    _hc_frag=""
+    echo "hostconfig: end $1 after ${ms}ms"
+}
+_hc_summary() {
+    local rc=$? failed=$_hc_frag
+    if [ -n "$failed" ]; then
+        _hc_end "$failed"
+    fi
+    echo "HOSTCONFIG_TIMING {\\"v\\":1,\\"host\\":\\"$(hostname)\\",\\"exit\\":$rc,\\"failed\\":\\"$failed\\",\\"total_ms\\":$(_hc_ms "$_hc_start"),\\"fragments_ms\\":{$_hc_times}}"
+}
+trap _hc_summary EXIT
+# A timeout kill (SIGTERM) still writes the summary, naming the fragment that was running.
+trap 'exit 143' TERM
+"""
+
+
+@dataclass(frozen=True)
+class Param:
+    """A user-settable fragment parameter: a dropdown if ``choices`` is set, else free text."""
+
+    name: str
+    label: str
+    default: Any
+    choices: tuple[Any, ...] = ()
+    unit: str = ""
+
+    def coerce(self, value: Any) -> Any:
+        """``value`` converted to the default's type, or the default if it is not a valid value.
+
+        Free text must be a single line; a dropdown value must be one of ``choices``.
+        """
+        if isinstance(self.default, str):
+            valid = isinstance(value, str) and "\n" not in value and "\r" not in value
+        else:
+            try:
+                value = type(self.default)(value)
+                valid = True
+            except (TypeError, ValueError, OverflowError):
+                valid = False
+        if not valid or (self.choices and value not in self.choices):
+            return self.default
+        return value
+
+
+@dataclass(frozen=True)
+class Fragment:
+    """One named, versioned piece of a host configuration script.
+
+    ``requires`` names fragments that must run earlier; they are pulled in
+    automatically. Fragments are emitted by ascending ``order`` unless a
+    requirement forces otherwise. ``detect`` recognizes the fragment in a
+    script written before fragments were tracked, returning its params or None.
+    ``always`` fragments are not user selections: they are added to every
+    non-empty script and every other fragment is wrapped in their timing calls.
+    """
+
+    name: str
+    version: int
+    label: str
+    render: Callable[[dict[str, Any]], str]
+    requires: tuple[str, ...] = ()
+    order: int = 100
+    params: tuple[Param, ...] = field(default=())
+    detect: Callable[[str], dict[str, Any] | None] | None = None
+    always: bool = False
+
+    def defaults(self) -> dict[str, Any]:
+        return {p.name: p.default for p in self.params}
+
+    def clean(self, params: dict[str, Any]) -> dict[str, Any]:
+        """Every declared param, taken from ``params`` where valid and defaulted otherwise.
+
+        Params a fragment no longer declares (older versions) are dropped.
+        """
+        return {p.name: p.coerce(params[p.name]) if p.name in params else p.default for p in self.params}
+
+
+_REGISTRY: dict[str, Fragment] = {}
+
+
+def register(fragment: Fragment) -> Fragment:
+    """Add a fragment to the registry (replacing one with the same name)."""
+    _REGISTRY[fragment.name] = fragment
+    return fragment
+
+
+def get_fragment(name: str) -> Fragment:
+    try:
+        return _REGISTRY[name]
+    except KeyError:
+        raise ValueError(f"Unknown host config fragment: {name}") from None
+
+
+def fragments() -> list[Fragment]:
+    """All registered fragments in display/emit order."""
+    return sorted(_REGISTRY.values(), key=lambda f: (f.order, f.name))
+
+
+def resolve(names: Iterable[str]) -> list[Fragment]:
+    """The selected fragments plus their requirements, in dependency order."""
+    selected: dict[str, Fragment] = {}
+    pending = list(names)
+    while pending:
+        frag = get_fragment(pending.pop())
+        if frag.name not in selected:
+            selected[frag.name] = frag
+            pending.extend(frag.requires)
+
+    ordered: list[Fragment] = []
+    done: set[str] = set()
+    visiting: set[str] = set()
+
+    def visit(frag: Fragment) -> None:
+        if frag.name in done:
+            return
+        if frag.name in visiting:
+            raise ValueError(f"Circular fragment requirement involving {frag.name}")
+        visiting.add(frag.name)
+        for req in sorted((selected[r] for r in frag.requires), key=lambda f: (f.order, f.name)):
+            visit(req)
+        visiting.discard(frag.name)
+        done.add(frag.name)
+        ordered.append(frag)
+
+    for frag in sorted(selected.values(), key=lambda f: (f.order, f.name)):
+        visit(frag)
+    return ordered
+
+
+BEGIN_MARKER = "# >>> fragment:"
+END_MARKER = "# <<< fragment:"
+_BEGIN_RE = re.compile(r"^# >>> fragment:(?P<name>[\w.-]+) v(?P<version>\d+)(?: (?P<params>\{.*\}))?\s*$")
+_END_RE = re.compile(r"^# <<< fragment:(?P<name>[\w.-]+)\s*$")
+
+
+@dataclass
+class Section:
+    """A slice of a host config script: a marked fragment, or any other text.
+
+    ``raw`` is the exact source text (marker lines included), so joining the
+    ``raw`` of all sections reproduces the script byte for byte.
+    """
+
+    raw: str
+    name: str = ""
+    version: int = 0
+    params: dict[str, Any] = field(default_factory=dict)
+
+    @property
+    def is_fragment(self) -> bool:
+        return bool(self.name)
+
+
+def _fragment_block(frag: Fragment, params: dict[str, Any]) -> str:
+    body = frag.render(params).strip()
+    if not frag.always:
+        body = f"_hc_begin {frag.name}\n{body}\n_hc_end {frag.name}"
+    meta = json.dumps(params, sort_keys=True, separators=(",", ":"))
+    return f"{BEGIN_MARKER}{frag.name} v{frag.version} {meta}\n{body}\n{END_MARKER}{frag.name}"
+
+
+def parse_script(script: str) -> list[Section]:
+    """Split a script into fragment and text sections in a single pass.
+
+    A begin marker without its matching end marker (e.g. a hand-edited
+    script) is kept as plain text rather than guessed at.
+    """
+    sections: list[Section] = []
+    text: list[str] = []
+    block: list[str] = []
+    current: re.Match[str] | None = None
+
+    def flush_text() -> None:
+        if text:
+            sections.append(Section("".join(text)))
+            text.clear()
+
+    for line in script.splitlines(keepends=True):
+        if current is None:
+            m = _BEGIN_RE.match(line.rstrip("\n"))
+            if m:
+                current = m
+                block.append(line)
+            else:
+                text.append(line)
+            continue
+        block.append(line)
+        end = _END_RE.match(line.rstrip("\n"))
+        if end and end.group("name") == current.group("name"):
+            flush_text()
+            try:
+                params = json.loads(current.group("params") or "{}")
+            except ValueError:
+                params = {}
+            sections.append(Section("".join(block), current.group("name"), int(current.group("version")), params))
+            block.clear()
+            current = None
+    text.extend(block)
+    flush_text()
+    return sections
+
+
+def render_script(sections: list[Section]) -> str:
+    """Inverse of ``parse_script``."""
+    return "".join(s.raw for s in sections)
+
+
+def update_host_config(script: str, selections: dict[str, dict[str, Any]]) -> str:
+    """Re-render the fragments of ``script`` for ``selections``, keeping everything else.
+
+    Text before the first fragment (the header) and user text following a
+    fragment are preserved verbatim; text that followed a removed fragment
+    moves up to the previous remaining one. Sections for fragments this
+    version does not know are preserved like user text. A script without
+    markers is kept whole as the header, ahead of the rendered fragments.
+    """
+    sections = parse_script(script)
+    ordered = resolve(selections)
+    if ordered:
+        ordered = resolve([*selections, *(f.name for f in _REGISTRY.values() if f.always)])
+    keep = {f.name for f in ordered}
+
+    preamble: list[str] = []
+    trailing: dict[str, list[str]] = {}
+    anchor: list[str] | None = None
+    for section in sections:
+        if section.is_fragment and section.name in _REGISTRY:
+            if section.name in keep:
+                anchor = trailing.setdefault(section.name, [])
+            continue
+        target = preamble if anchor is None else anchor
+        target.append(section.raw)
+
+    head = "".join(preamble).strip("\n") or HEADER.strip()
+    parts = [head]
+    for frag in ordered:
+        block = _fragment_block(frag, frag.clean(selections.get(frag.name, {})))
+        extra = "".join(trailing.get(frag.name, [])).strip("\n")
+        parts.append(f"{block}\n{extra}" if extra else block)
+    return "\n\n".join(parts) + "\n"
+
+
+def render_host_config(selections: dict[str, dict[str, Any]]) -> str:
+    """Build a host config script from ``{fragment_name: params}``.
+
+    Missing params fall back to each fragment's defaults; required fragments
+    are added with their defaults. Each fragment is wrapped in begin/end
+    markers carrying its name, version and params.
+    """
+    return update_host_config("", selections)
+
+
+def _strip_comments(script: str) -> str:
+    return "\n".join(line for line in script.splitlines() if not line.lstrip().startswith("#"))
+
+
+def parse_fragments(script: str) -> dict[str, dict[str, Any]]:
+    """The fragments in a script, as ``{name: params}``.
+
+    Marked fragments are read from their markers. Scripts written before
+    markers existed fall back to each fragment's ``detect`` heuristic,
+    applied with comment lines removed. ``always`` fragments are left out.
+    """
+    found: dict[str, dict[str, Any]] = {}
+    if not script:
+        return found
+    if BEGIN_MARKER in script:
+        for section in parse_script(script):
+            if section.is_fragment:
+                frag = _REGISTRY.get(section.name)
+                if frag is not None and frag.always:
+                    continue
+                found[section.name] = frag.clean(section.params) if frag else dict(section.params)
+        if found:
+            return found
+    code = _strip_comments(script)
+    for frag in fragments():
+        if frag.detect is None:
+            continue
+        params = frag.detect(code)
+        if params is not None:
+            found[frag.name] = frag.clean(params)
+    return found
+
+
+def has_fragment(script: str, name: str) -> bool:
+    """Whether ``script`` contains the fragment ``name`` (e.g. ``"docker"``)."""
+    return name in parse_fragments(script)
+
+
+def _detect_swap(script: str) -> dict[str, Any] | None:
+    if "swapfile" not in script:
+        return None
+    for size in reversed(SWAP_SIZES):
+        if f"fallocate -l {size}G" in script:
+            return {"size_gb": size}
+    return {}
+
+
+def _detect_fsx(script: str) -> dict[str, Any] | None:
+    m = re.search(r"mount -t lustre\s+(?:-o \S+\s+)?'?([^@\s']+)@tcp:/([^\s']+?)'?\s+'?([^\s']+?)'?$", script, re.M)
+    if m is None:
+        return None
+    return {"dns_name": m.group(1), "mount_name": m.group(2), "mount_point": m.group(3)}
+
+
+register(
+    Fragment(
+        name="timing",
+        version=1,
+        label="Boot timing",
+        order=0,
+        render=lambda p: TIMING_FRAGMENT,
+        always=True,
+    )
+)
+register(
+    Fragment(
+        name="docker",
+        version=1,
+        label="Install Docker",
+        order=10,
+        render=lambda p: DOCKER_FRAGMENT,
+        detect=lambda s: {} if re.search(r"^\s*(dnf|yum)\s+install\b.*\bdocker\b", s, re.M) else None,
+    )
+)
+register(
+    Fragment(
+        name="sudo",
+        version=1,
+        label="Job-user passwordless sudo",
+        order=20,
+        render=lambda p: SUDO_FRAGMENT,
+        detect=lambda s: {} if "NOPASSWD" in s else None,
+    )
+)
+register(
+    Fragment(
+        name="nvidia",
+        version=1,
+        label="NVIDIA Container Toolkit",
+        requires=("docker",),
+        order=30,
+        render=lambda p: NVIDIA_FRAGMENT,
+        detect=lambda s: {} if "nvidia-container-toolkit" in s else None,
+    )
+)
+register(
+    Fragment(
+        name="docker-tuning",
+        version=1,
+        label="Docker daemon tuning for large images",
+        requires=("docker",),
+        order=35,
+        params=(
+            Param("max_downloads", "Concurrent downloads", 10, tuple(DOCKER_DOWNLOAD_LIMITS)),
+            Param("image_store", "Image store", "overlay2", tuple(DOCKER_IMAGE_STORES)),
+        ),
+        render=lambda p: docker_tuning_fragment(p["max_downloads"], p["image_store"]),
+        detect=lambda s: {} if "max-concurrent-downloads" in s else None,
+    )
+)
+register(
+    Fragment(
+        name="swap",
+        version=1,
+        label="Swap",
+        order=40,
+        params=(Param("size_gb", "Size", 32, tuple(SWAP_SIZES), "GB"),),
+        render=lambda p: swap_fragment(int(p["size_gb"])),
+        detect=_detect_swap,
+    )
+)
+register(
+    Fragment(
+        name="nvme",
+        version=2,
+        label="Instance-store NVMe (Docker data, scratch, swap)",
+        order=5,
+        params=(
+            Param("scratch_dir", "Scratch", "/scratch"),
+            Param("swap_gb", "Swap", 0, tuple(NVME_SWAP_SIZES), "GB"),
+        ),
+        render=lambda p: nvme_fragment(p["scratch_dir"], p["swap_gb"]),
+        detect=lambda s: {} if "Instance Storage" in s and "mkfs" in s else None,
+    )
+)
+register(
+    Fragment(
+        name="fsx",
+        version=1,
+        label="FSx for Lustre mount",
+        order=45,
+        params=(
+            Param("dns_name", "DNS name", ""),
+            Param("mount_name", "Mount name", ""),
+            Param("mount_point", "Mount point", "/mnt/fsx"),
+        ),
+        render=lambda p: fsx_fragment(p["dns_name"], p["mount_name"], p["mount_point"]),
+        detect=_detect_fsx,
+    )
+)
+register(
+    Fragment(
+        name="ecr-login",
+        version=1,
+        label="ECR credential helper",
+        requires=("docker",),
+        order=50,
+        render=lambda p: ECR_LOGIN_FRAGMENT,
+        detect=lambda s: {} if '"credsStore": "ecr-login"' in s else None,
+    )
+)
+register(
+    Fragment(
+        name="image-prepull",
+        version=2,
+        label="Pre-pull container images",
+        requires=("ecr-login",),
+        order=60,
+        params=(
+            Param("images", "Images", ""),
+            Param("timeout_s", "Timeout", 300, tuple(PREPULL_TIMEOUTS), "s"),
+            Param("mode", "Mode", "background", ("background", "wait")),
+        ),
+        render=lambda p: image_prepull_fragment(p["images"], p["timeout_s"], p["mode"]),
+        detect=lambda s: {} if "docker pull" in s else None,
+    )
+)
+
 
 def build_host_config(
     docker: bool = False,
@@ -62,36 +702,25 @@ def build_host_config(
     swap_size_gb: int = 32,
 ) -> str:
     """Build a host config script from the selected options."""
-    parts = [HEADER.strip()]
+    selections: dict[str, dict[str, Any]] = {}
     if docker:
-        parts.append(DOCKER_FRAGMENT.strip())
+        selections["docker"] = {}
     if sudo:
-        parts.append(SUDO_FRAGMENT.strip())
+        selections["sudo"] = {}
     if nvidia:
-        parts.append(NVIDIA_FRAGMENT.strip())
+        selections["nvidia"] = {}
     if swap:
-        parts.append(swap_fragment(swap_size_gb).strip())
-    return "\n\n".join(parts) + "\n"
+        selections["swap"] = {"size_gb": swap_size_gb}
+    return render_host_config(selections)
 
 
 def parse_host_config(script: str) -> dict[str, bool | int]:
     """Parse an existing host config script to determine which options are enabled."""
-    result: dict[str, bool | int] = {
-        "docker": False,
-        "sudo": False,
-        "nvidia": False,
-        "swap": False,
-        "swap_size_gb": 32,
+    found = parse_fragments(script)
+    return {
+        "docker": "docker" in found,
+        "sudo": "sudo" in found,
+        "nvidia": "nvidia" in found,
+        "swap": "swap" in found,
+        "swap_size_gb": int(found.get("swap", {}).get("size_gb", 32)),
     }
-    if not script:
-        return result
-    result["docker"] = "dnf install" in script and "docker" in script
-    result["sudo"] = "NOPASSWD" in script
-    result["nvidia"] = "nvidia-container-toolkit" in script
-    result["swap"] = "swapfile" in script
-    # Try to extract swap size
-    for size in reversed(SWAP_SIZES):
-        if f"fallocate -l {size}G" in script:
-            result["swap_size_gb"] = size
-            break
-    return result
@@ -0,0 +1,109 @@
+"""Per-fragment boot timing from host configuration worker logs."""
+
+from __future__ import annotations
+
+import json
+import math
+from typing import Any, Iterable
+
+from .host_config_builder import TIMING_LOG_PREFIX
+
+# Worker logs, including host configuration output, go to one log group per fleet.
+WORKER_LOG_GROUP = "/aws/deadline/{farm_id}/{fleet_id}"
+MAX_LOG_EVENTS = 5000
+TOTAL = "(total)"
+
+
+def parse_timing_log(text: str) -> list[dict[str, Any]]:
+    """The timing summaries in a worker log, one dict per host config run.
+
+    Lines may carry a CloudWatch or agent prefix before the marker; lines
+    that are not valid summaries are skipped.
+    """
+    runs: list[dict[str, Any]] = []
+    for line in text.splitlines():
+        idx = line.find(TIMING_LOG_PREFIX)
+        if idx < 0:
+            continue
+        try:
+            run = json.loads(line[idx + len(TIMING_LOG_PREFIX):])
+        except ValueError:
+            continue
+        if isinstance(run, dict) and isinstance(run.get("fragments_ms"), dict):
+            runs.append(run)
+    return runs
+
+
+def load_timing_files(paths: Iterable[str]) -> list[dict[str, Any]]:
+    """Timing summaries from log files saved from one or more workers."""
+    runs: list[dict[str, Any]] = []
+    for path in paths:
+        with open(path, errors="replace") as f:
+            runs.extend(parse_timing_log(f.read()))
+    return runs
+
+
+def fetch_fleet_timings(
+    logs_client: Any,
+    farm_id: str,
+    fleet_id: str,
+    start_time_ms: int | None = None,
+    max_events: int = MAX_LOG_EVENTS,
+) -> list[dict[str, Any]]:
+    """Timing summaries from the fleet's worker log group in CloudWatch Logs."""
+    kwargs: dict[str, Any] = {
+        "logGroupName": WORKER_LOG_GROUP.format(farm_id=farm_id, fleet_id=fleet_id),
+        "filterPattern": f'"{TIMING_LOG_PREFIX.strip()}"',
+    }
+    if start_time_ms is not None:
+        kwargs["startTime"] = start_time_ms
+    lines: list[str] = []
+    paginator = logs_client.get_paginator("filter_log_events")
+    for page in paginator.paginate(**kwargs):
+        lines.extend(e.get("message", "") for e in page.get("events", []))
+        if len(lines) >= max_events:
+            break
+    return parse_timing_log("\n".join(lines[:max_events]))
+
+
+def percentile(values: list[float], pct: float) -> float:
+    """Nearest-rank percentile of ``values`` (0 for an empty list)."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(1, math.ceil(pct / 100 * len(ordered)))
+    return float(ordered[min(rank, len(ordered)) - 1])
+
+
+def summarize_timings(runs: list[dict[str, Any]]) -> list[dict[str, Any]]:
+    """Per-fragment statistics across runs, slowest p95 first, with the total last.
+
+    Each row has ``fragment``, ``runs``, ``p50_ms``, ``p95_ms``, ``max_ms``
+    and ``failures`` (runs that failed or timed out inside that fragment).
+    """
+    durations: dict[str, list[float]] = {}
+    failures: dict[str, int] = {}
+    for run in runs:
+        for name, ms in run["fragments_ms"].items():
+            if isinstance(ms, (int, float)):
+                durations.setdefault(name, []).append(ms)
+        failed = run.get("failed")
+        if failed:
+            failures[failed] = failures.get(failed, 0) + 1
+        if isinstance(run.get("total_ms"), (int, float)):
+            durations.setdefault(TOTAL, []).append(run["total_ms"])
+    failures[TOTAL] = sum(1 for run in runs if run.get("exit", 0) != 0)
+
+    rows = [
+        {
+            "fragment": name,
+            "runs": len(values),
+            "p50_ms": percentile(values, 50),
+            "p95_ms": percentile(values, 95),
+            "max_ms": float(max(values)),
+            "failures": failures.get(name, 0),
+        }
+        for name, values in durations.items()
+    ]
+    rows.sort(key=lambda r: (r["fragment"] == TOTAL, -r["p95_ms"], r["fragment"]))
+    return rows
@@ -4,9 +4,11 @@ from __future__ import annotations
 
 import sys
 
+from PySide6.QtGui import QCloseEvent
 from PySide6.QtWidgets import QApplication, QMainWindow, QTabWidget
 
-from .aws_clients import get_deadline_client, load_app_config
+from .aws_clients import get_deadline_client
+from .config_store import ConfigStore
 from .tab_fleet_config import FleetConfigTab
 from .tab_queue_config import QueueConfigTab
 from .tab_summary import SummaryTab
@@ -114,24 +116,30 @@ class MainWindow(QMainWindow):
         self.setWindowTitle("Deadline Cloud — Container Config")
         self.setMinimumSize(900, 650)
 
-        app_cfg = load_app_config()
-        region = app_cfg.get("region", "us-west-2")
+        self.config = ConfigStore.load()
+        region = self.config.get("region", "us-west-2")
         dc = get_deadline_client(region)
 
         tabs = QTabWidget()
         self.setCentralWidget(tabs)
 
-        self.summary_tab = SummaryTab(dc)
+        self.summary_tab = SummaryTab(dc, self.config)
         tabs.addTab(self.summary_tab, "Summary")
 
         self.queue_tab = QueueConfigTab(region)
         tabs.addTab(self.queue_tab, "Queue Config")
 
-        self.fleet_tab = FleetConfigTab(dc)
+        self.fleet_tab = FleetConfigTab(dc, region)
         tabs.addTab(self.fleet_tab, "Fleet Config")
 
         self.summary_tab.queue_changed.connect(self.queue_tab.on_queue_changed)
         self.summary_tab.fleet_changed.connect(self.fleet_tab.on_fleet_changed)
+        self.queue_tab.set_role_source(self.summary_tab.known_roles)
+
+    def closeEvent(self, event: QCloseEvent) -> None:
+        self.summary_tab.flush()
+        self.config.flush()
+        super().closeEvent(event)
 
 
 def main() -> None:
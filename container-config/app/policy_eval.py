@@ -0,0 +1,257 @@
+"""Local evaluation of IAM identity policies.
+
+Statements from all of a role's policies are compiled once into a
+``CompiledPolicy``. Action patterns are indexed (exact names in a dict,
+``service:Prefix*`` globs in a prefix trie) so each lookup only visits the
+statements that can match. Evaluation follows IAM's order: an applicable
+``Deny`` always wins, otherwise any applicable ``Allow`` grants access.
+
+There is no request context when checking a role offline, so conditions on
+keys that are not supplied are treated as *unknown*: an unknown ``Allow``
+does not grant access and an unknown ``Deny`` is assumed to apply. That
+errs on the side of reporting missing access rather than a false green.
+"""
+
+from __future__ import annotations
+
+import json
+import re
+from functools import lru_cache
+from typing import Any, Iterable
+
+# Condition operators understood locally, mapped to a comparison on
+# (context_value, policy_value) strings. Anything else is treated as unknown.
+_STRING_OPS = {
+    "StringEquals": lambda v, p: v == p,
+    "StringNotEquals": lambda v, p: v != p,
+    "StringEqualsIgnoreCase": lambda v, p: v.lower() == p.lower(),
+    "StringNotEqualsIgnoreCase": lambda v, p: v.lower() != p.lower(),
+    "StringLike": lambda v, p: _wildcard_regex(p).fullmatch(v) is not None,
+    "StringNotLike": lambda v, p: _wildcard_regex(p).fullmatch(v) is None,
+    "ArnEquals": lambda v, p: v == p,
+    "ArnNotEquals": lambda v, p: v != p,
+    "ArnLike": lambda v, p: _wildcard_regex(p).fullmatch(v) is not None,
+    "ArnNotLike": lambda v, p: _wildcard_regex(p).fullmatch(v) is None,
+    "Bool": lambda v, p: v.lower() == p.lower(),
+    "NumericEquals": lambda v, p: float(v) == float(p),
+    "NumericNotEquals": lambda v, p: float(v) != float(p),
+    "NumericLessThan": lambda v, p: float(v) < float(p),
+    "NumericLessThanEquals": lambda v, p: float(v) <= float(p),
+    "NumericGreaterThan": lambda v, p: float(v) > float(p),
+    "NumericGreaterThanEquals": lambda v, p: float(v) >= float(p),
+}
+
+# Negated operators match when *no* policy value matches rather than when any does.
+_NEGATED_OPS = {"StringNotEquals", "StringNotEqualsIgnoreCase", "StringNotLike", "ArnNotEquals", "ArnNotLike", "NumericNotEquals"}
+
+
+def _as_list(value: Any) -> list[Any]:
+    if value is None:
+        return []
+    if isinstance(value, list):
+        return value
+    return [value]
+
+
+@lru_cache(maxsize=4096)
+def _wildcard_regex(pattern: str, ignore_case: bool = False) -> re.Pattern[str]:
+    """Compile an IAM ``*``/``?`` wildcard pattern into a regex."""
+    body = re.escape(pattern).replace(r"\*", ".*").replace(r"\?", ".")
+    return re.compile(body, re.IGNORECASE if ignore_case else 0)
+
+
+def wildcard_match(pattern: str, value: str) -> bool:
+    """Whether ``value`` matches an IAM wildcard pattern (case-sensitive, like ARNs)."""
+    return _wildcard_regex(pattern).fullmatch(value) is not None
+
+
+class _TrieNode:
+    __slots__ = ("children", "ids")
+
+    def __init__(self) -> None:
+        self.children: dict[str, _TrieNode] = {}
+        self.ids: list[int] = []
+
+
+class ActionIndex:
+    """Case-insensitive index from action patterns to statement ids.
+
+    ``ecr:GetAuthorizationToken`` goes into an exact-match dict,
+    ``ecr:Get*`` / ``ecr:*`` / ``*`` into a prefix trie, and anything with
+    an inner wildcard (``ecr:*Image``, ``ecr:Get?``) into a short regex list.
+    """
+
+    def __init__(self) -> None:
+        self._exact: dict[str, list[int]] = {}
+        self._root = _TrieNode()
+        self._patterns: list[tuple[re.Pattern[str], int]] = []
+
+    def add(self, pattern: str, stmt_id: int) -> None:
+        pattern = pattern.lower()
+        head = pattern[:-1] if pattern.endswith("*") else pattern
+        if "*" not in head and "?" not in head:
+            if pattern.endswith("*"):
+                node = self._root
+                for ch in head:
+                    node = node.children.setdefault(ch, _TrieNode())
+                node.ids.append(stmt_id)
+            else:
+                self._exact.setdefault(pattern, []).append(stmt_id)
+        else:
+            self._patterns.append((_wildcard_regex(pattern, True), stmt_id))
+
+    def match(self, action: str) -> set[int]:
+        """Return ids of all statements with a pattern matching ``action``."""
+        action = action.lower()
+        found = set(self._exact.get(action, ()))
+        node: _TrieNode | None = self._root
+        for ch in action:
+            found.update(node.ids)
+            node = node.children.get(ch)
+            if node is None:
+                break
+        else:
+            found.update(node.ids)
+        for regex, stmt_id in self._patterns:
+            if regex.fullmatch(action):
+                found.add(stmt_id)
+        return found
+
+
+class _Statement:
+    __slots__ = ("deny", "patterns", "resources", "not_resource", "conditions")
+
+    def __init__(self, stmt: dict[str, Any]) -> None:
+        self.deny = stmt.get("Effect") == "Deny"
+        self.not_resource = "NotResource" in stmt
+        self.patterns: list[str] = _as_list(stmt.get("NotResource" if self.not_resource else "Resource", "*"))
+        self.resources = [_wildcard_regex(p) for p in self.patterns]
+        self.conditions: dict[str, dict[str, Any]] = stmt.get("Condition") or {}
+
+    def matches_resource(self, resource: str) -> bool:
+        hit = any(r.fullmatch(resource) for r in self.resources)
+        return not hit if self.not_resource else hit
+
+    def condition_result(self, context: dict[str, Any] | None) -> bool | None:
+        """True/False when every condition can be decided, None if any is unknown."""
+        result: bool | None = True
+        for operator, clauses in self.conditions.items():
+            for key, expected in clauses.items():
+                outcome = _evaluate_condition(operator, key, _as_list(expected), context or {})
+                if outcome is False:
+                    return False
+                if outcome is None:
+                    result = None
+        return result
+
+
+def _evaluate_condition(operator: str, key: str, expected: list[Any], context: dict[str, Any]) -> bool | None:
+    set_op = ""
+    if ":" in operator:
+        set_op, operator = operator.split(":", 1)
+    if_exists = operator.endswith("IfExists")
+    if if_exists:
+        operator = operator[: -len("IfExists")]
+
+    present = key in context
+    if operator == "Null":
+        want_null = str(expected[0]).lower() == "true"
+        return (not present) == want_null
+    if not present:
+        return True if if_exists else None
+    compare = _STRING_OPS.get(operator)
+    if compare is None:
+        return None
+
+    values = [str(v) for v in _as_list(context[key])]
+    policy_values = [str(p) for p in expected]
+    negated = operator in _NEGATED_OPS
+
+    def one(value: str) -> bool:
+        try:
+            if negated:
+                return all(compare(value, p) for p in policy_values)
+            return any(compare(value, p) for p in policy_values)
+        except ValueError:
+            return False
+
+    if set_op == "ForAllValues":
+        return all(one(v) for v in values)
+    return any(one(v) for v in values)
+
+
+class CompiledPolicy:
+    """All statements of a set of identity policies, indexed for fast lookups."""
+
+    def __init__(self, statements: Iterable[dict[str, Any]] = ()) -> None:
+        self._statements: list[_Statement] = []
+        self._actions = ActionIndex()
+        self._not_actions: list[tuple[ActionIndex, int]] = []
+        self._memo: dict[tuple[str, str], bool] = {}
+        for stmt in statements:
+            self._add(stmt)
+
+    @classmethod
+    def from_documents(cls, documents: Iterable[dict[str, Any] | str]) -> "CompiledPolicy":
+        """Compile the statements of one or more policy documents."""
+        statements: list[dict[str, Any]] = []
+        for doc in documents:
+            if isinstance(doc, str):
+                doc = json.loads(doc)
+            statements.extend(_as_list(doc.get("Statement")))
+        return cls(statements)
+
+    def _add(self, stmt: dict[str, Any]) -> None:
+        stmt_id = len(self._statements)
+        self._statements.append(_Statement(stmt))
+        if "NotAction" in stmt:
+            index = ActionIndex()
+            for pattern in _as_list(stmt["NotAction"]):
+                index.add(pattern, stmt_id)
+            self._not_actions.append((index, stmt_id))
+        else:
+            for pattern in _as_list(stmt.get("Action")):
+                self._actions.add(pattern, stmt_id)
+
+    def _candidates(self, action: str) -> list[_Statement]:
+        ids = self._actions.match(action)
+        for index, stmt_id in self._not_actions:
+            if not index.match(action):
+                ids.add(stmt_id)
+        return [self._statements[i] for i in sorted(ids)]
+
+    def is_allowed(self, action: str, resource: str = "*", context: dict[str, Any] | None = None) -> bool:
+        """Whether ``action`` on ``resource`` is allowed by these policies."""
+        key = (action.lower(), resource)
+        if context is None and key in self._memo:
+            return self._memo[key]
+        allowed = False
+        for stmt in self._candidates(action):
+            if not stmt.matches_resource(resource):
+                continue
+            cond = stmt.condition_result(context)
+            if stmt.deny:
+                if cond is not False:
+                    allowed = False
+                    break
+            elif cond is True:
+                allowed = True
+        if context is None:
+            self._memo[key] = allowed
+        return allowed
+
+    def is_allowed_anywhere(self, action: str, context: dict[str, Any] | None = None) -> bool:
+        """Whether ``action`` is allowed on at least one resource.
+
+        Each resource pattern granted by an ``Allow`` statement is checked as if
+        it were the requested resource, so a ``Deny`` on ``*`` or on a covering
+        pattern still wins.
+        """
+        for stmt in self._candidates(action):
+            if stmt.deny or stmt.condition_result(context) is not True:
+                continue
+            targets = ["*"] if stmt.not_resource else stmt.patterns
+            for target in targets:
+                if self.is_allowed(action, target, context):
+                    return True
+        return False
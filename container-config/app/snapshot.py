@@ -0,0 +1,109 @@
+"""On-disk snapshot of farm topology and last-known status for instant startup."""
+
+from __future__ import annotations
+
+import json
+import os
+import time
+from typing import Any
+
+from .config_store import write_json_atomic
+
+SNAPSHOT_VERSION = 1
+
+
+def snapshot_path() -> str:
+    """Snapshot file, stored next to container-config.json."""
+    return os.path.expanduser("~/.deadline/container-config-snapshot.json")
+
+
+def _empty() -> dict[str, Any]:
+    return {
+        "version": SNAPSHOT_VERSION,
+        "savedAt": 0.0,
+        "farms": [],
+        "queues": {},
+        "fleets": {},
+        "queueStatus": {},
+        "fleetStatus": {},
+    }
+
+
+class TopologySnapshot:
+    """Farms, queues, fleets, role ARNs and last-known ECR/Docker status.
+
+    The Summary tab renders from the snapshot on launch and then revalidates
+    every list and status against AWS in the background, writing the fresh
+    values back here (stale-while-revalidate). Snapshots written by a
+    different ``SNAPSHOT_VERSION`` are discarded.
+    """
+
+    def __init__(self, data: dict[str, Any] | None = None, path: str | None = None) -> None:
+        self._data = data if data is not None else _empty()
+        self._path = path or snapshot_path()
+        self.dirty = False
+
+    @classmethod
+    def load(cls, path: str | None = None) -> "TopologySnapshot":
+        """Load the snapshot, falling back to an empty one if missing, corrupt or outdated."""
+        path = path or snapshot_path()
+        try:
+            with open(path) as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return cls(path=path)
+        if not isinstance(data, dict) or data.get("version") != SNAPSHOT_VERSION:
+            return cls(path=path)
+        merged = _empty()
+        merged.update(data)
+        return cls(merged, path)
+
+    def to_dict(self) -> dict[str, Any]:
+        return self._data
+
+    def save(self) -> None:
+        """Write the snapshot to disk if anything changed since the last save."""
+        if not self.dirty:
+            return
+        self._data["savedAt"] = time.time()
+        write_json_atomic(self._path, self._data)
+        self.dirty = False
+
+    def _set(self, section: str, key: str | None, value: Any) -> None:
+        target = self._data[section] if key is not None else self._data
+        name = key if key is not None else section
+        if target.get(name) != value:
+            target[name] = value
+            self.dirty = True
+
+    def farms(self) -> list[dict[str, str]]:
+        return list(self._data["farms"])
+
+    def set_farms(self, farms: list[dict[str, str]]) -> None:
+        self._set("farms", None, list(farms))
+
+    def queues(self, farm_id: str) -> list[dict[str, str]]:
+        return list(self._data["queues"].get(farm_id, []))
+
+    def set_queues(self, farm_id: str, queues: list[dict[str, str]]) -> None:
+        self._set("queues", farm_id, list(queues))
+
+    def fleets(self, farm_id: str) -> list[dict[str, str]]:
+        return list(self._data["fleets"].get(farm_id, []))
+
+    def set_fleets(self, farm_id: str, fleets: list[dict[str, str]]) -> None:
+        self._set("fleets", farm_id, list(fleets))
+
+    def queue_status(self, queue_id: str) -> dict[str, Any] | None:
+        """Last-known ``{"roleArn", "hasEcr"}`` for a queue."""
+        return self._data["queueStatus"].get(queue_id)
+
+    def set_queue_status(self, queue_id: str, role_arn: str, has_ecr: bool) -> None:
+        self._set("queueStatus", queue_id, {"roleArn": role_arn, "hasEcr": has_ecr})
+
+    def fleet_status(self, fleet_id: str) -> dict[str, Any] | None:
+        """Last-known ``{"roleArn", "hasEcr", "hasDocker"}`` for a fleet."""
+        return self._data["fleetStatus"].get(fleet_id)
+
+    def set_fleet_status(self, fleet_id: str, role_arn: str, has_ecr: bool, has_docker: bool) -> None:
+        self._set("fleetStatus", fleet_id, {"roleArn": role_arn, "hasEcr": has_ecr, "hasDocker": has_docker})
@@ -4,31 +4,280 @@ from __future__ import annotations
 
 from typing import Any
 
+from PySide6.QtCore import Qt
 from PySide6.QtWidgets import (
     QCheckBox,
     QComboBox,
+    QDialog,
+    QFileDialog,
     QHBoxLayout,
     QLabel,
+    QLineEdit,
+    QListWidget,
+    QListWidgetItem,
     QMessageBox,
     QPushButton,
+    QTableWidget,
+    QTableWidgetItem,
     QTextEdit,
     QVBoxLayout,
     QWidget,
 )
 
-from .aws_clients import get_fleet_details, update_fleet_host_config
-from .host_config_builder import SWAP_SIZES, build_host_config, parse_host_config
+from .aws_clients import get_client, get_fleet_details, list_fleets
+from .fleet_rollout import rollout_host_config
+from .host_config_builder import Fragment, fragments, get_fragment, parse_fragments, update_host_config
+from .host_config_timing import fetch_fleet_timings, load_timing_files, summarize_timings
+from .workers import CheckScheduler, Task, submit
+
+
+class BootTimingDialog(QDialog):
+    """Per-fragment host config durations (p50/p95) across a fleet's workers."""
+
+    _COLUMNS = ["Fragment", "Runs", "p50 (s)", "p95 (s)", "Max (s)", "Failed in"]
+
+    def __init__(self, region: str, farm_id: str, fleet_id: str, fleet_name: str, parent: QWidget) -> None:
+        super().__init__(parent)
+        self.setWindowTitle(f"Boot Timing — {fleet_name or 'log files'}")
+        self.setMinimumSize(600, 400)
+        self._region = region
+        self._farm_id = farm_id
+        self._fleet_id = fleet_id
+
+        layout = QVBoxLayout(self)
+        btn_row = QHBoxLayout()
+        self.cloudwatch_btn = QPushButton("Load from CloudWatch")
+        self.cloudwatch_btn.setEnabled(bool(farm_id and fleet_id))
+        self.cloudwatch_btn.clicked.connect(self._load_cloudwatch)
+        btn_row.addWidget(self.cloudwatch_btn)
+        self.files_btn = QPushButton("Open Log Files…")
+        self.files_btn.clicked.connect(self._load_files)
+        btn_row.addWidget(self.files_btn)
+        btn_row.addStretch()
+        layout.addLayout(btn_row)
+
+        self.table = QTableWidget(0, len(self._COLUMNS))
+        self.table.setHorizontalHeaderLabels(self._COLUMNS)
+        self.table.verticalHeader().setVisible(False)
+        self.table.setEditTriggers(QTableWidget.EditTrigger.NoEditTriggers)
+        layout.addWidget(self.table, 1)
+
+        self.status_label = QLabel("Load the HOSTCONFIG_TIMING lines from worker logs.")
+        layout.addWidget(self.status_label)
+
+    def _load_cloudwatch(self) -> None:
+        logs = get_client("logs", self._region)
+        self._run(Task(fetch_fleet_timings, logs, self._farm_id, self._fleet_id))
+
+    def _load_files(self) -> None:
+        paths, _ = QFileDialog.getOpenFileNames(self, "Worker Log Files", "", "Logs (*.log *.txt);;All Files (*)")
+        if paths:
+            self._run(Task(load_timing_files, paths))
+
+    def _run(self, task: Task) -> None:
+        self.cloudwatch_btn.setEnabled(False)
+        self.files_btn.setEnabled(False)
+        self.status_label.setText("Loading…")
+        task.signals.result.connect(self._on_runs)
+        task.signals.error.connect(lambda e: self.status_label.setText(f"Failed to load timings: {e}"))
+        task.signals.finished.connect(self._on_finished)
+        submit(task)
+
+    def _on_finished(self) -> None:
+        self.cloudwatch_btn.setEnabled(bool(self._farm_id and self._fleet_id))
+        self.files_btn.setEnabled(True)
+
+    def _on_runs(self, runs: list[dict[str, Any]]) -> None:
+        rows = summarize_timings(runs)
+        self.table.setRowCount(len(rows))
+        for i, row in enumerate(rows):
+            values = [
+                row["fragment"],
+                str(row["runs"]),
+                f"{row['p50_ms'] / 1000:.1f}",
+                f"{row['p95_ms'] / 1000:.1f}",
+                f"{row['max_ms'] / 1000:.1f}",
+                str(row["failures"] or ""),
+            ]
+            for col, value in enumerate(values):
+                self.table.setItem(i, col, QTableWidgetItem(value))
+        self.table.resizeColumnsToContents()
+        self.status_label.setText(f"{len(runs)} host config runs" if runs else "No timing summaries found.")
+
+
+class FleetRolloutDialog(QDialog):
+    """Apply the selected host config fragments to many fleets of the farm at once."""
+
+    _STATUS_TEXT = {
+        "updating": "waiting for fleet to apply…",
+        "updated": "updated and verified",
+        "unchanged": "already up to date",
+        "pending": "will change",
+        "failed": "failed",
+    }
+
+    def __init__(
+        self,
+        dc: Any,
+        farm_id: str,
+        current_fleet_id: str,
+        selections: dict[str, dict[str, Any]],
+        parent: QWidget,
+    ) -> None:
+        super().__init__(parent)
+        self.setWindowTitle("Roll Out Host Config")
+        self.setMinimumSize(560, 420)
+        self._dc = dc
+        self._farm_id = farm_id
+        self._current_fleet_id = current_fleet_id
+        self._selections = selections
+        self._items: dict[str, QListWidgetItem] = {}
+        self._labels: dict[str, str] = {}
+        self._done = 0
+        self._total = 0
+        self._changed = 0
+        self._dry_run = False
+
+        layout = QVBoxLayout(self)
+        layout.addWidget(QLabel("Fragments: " + (", ".join(selections) or "(none)")))
+
+        filter_row = QHBoxLayout()
+        self.filter_edit = QLineEdit()
+        self.filter_edit.setPlaceholderText("Fleet name contains…")
+        filter_row.addWidget(self.filter_edit)
+        check_btn = QPushButton("Check Matching")
+        check_btn.clicked.connect(lambda: self._check_matching(True))
+        filter_row.addWidget(check_btn)
+        uncheck_btn = QPushButton("Uncheck Matching")
+        uncheck_btn.clicked.connect(lambda: self._check_matching(False))
+        filter_row.addWidget(uncheck_btn)
+        layout.addLayout(filter_row)
+
+        self.fleet_list = QListWidget()
+        layout.addWidget(self.fleet_list, 1)
+
+        self.status_label = QLabel("Loading fleets…")
+        layout.addWidget(self.status_label)
+
+        btn_row = QHBoxLayout()
+        self.preview_btn = QPushButton("Preview")
+        self.preview_btn.clicked.connect(lambda: self._run(dry_run=True))
+        btn_row.addWidget(self.preview_btn)
+        self.apply_btn = QPushButton("Apply")
+        self.apply_btn.clicked.connect(lambda: self._run(dry_run=False))
+        btn_row.addWidget(self.apply_btn)
+        btn_row.addStretch()
+        close_btn = QPushButton("Close")
+        close_btn.clicked.connect(self.accept)
+        btn_row.addWidget(close_btn)
+        layout.addLayout(btn_row)
+
+        self._set_busy(True)
+        task = Task(list_fleets, dc, farm_id)
+        task.signals.result.connect(self._on_fleets)
+        task.signals.error.connect(lambda e: self.status_label.setText(f"Failed to list fleets: {e}"))
+        task.signals.finished.connect(lambda: self._set_busy(False))
+        submit(task)
+
+    def _set_busy(self, busy: bool) -> None:
+        self.preview_btn.setEnabled(not busy)
+        self.apply_btn.setEnabled(not busy)
+
+    def _on_fleets(self, fleets: list[dict[str, str]]) -> None:
+        for fleet in sorted(fleets, key=lambda f: f["displayName"].lower()):
+            self._labels[fleet["fleetId"]] = fleet["displayName"]
+            item = QListWidgetItem(fleet["displayName"])
+            item.setFlags(item.flags() | Qt.ItemFlag.ItemIsUserCheckable)
+            checked = fleet["fleetId"] == self._current_fleet_id
+            item.setCheckState(Qt.CheckState.Checked if checked else Qt.CheckState.Unchecked)
+            item.setToolTip(fleet["fleetId"])
+            self.fleet_list.addItem(item)
+            self._items[fleet["fleetId"]] = item
+        self.status_label.setText(f"{len(fleets)} fleets")
+
+    def _check_matching(self, checked: bool) -> None:
+        text = self.filter_edit.text().strip().lower()
+        state = Qt.CheckState.Checked if checked else Qt.CheckState.Unchecked
+        for fleet_id, item in self._items.items():
+            if text in self._labels[fleet_id].lower():
+                item.setCheckState(state)
+
+    def _run(self, dry_run: bool) -> None:
+        fleets = [
+            {"fleetId": fleet_id, "displayName": self._labels[fleet_id]}
+            for fleet_id, item in self._items.items()
+            if item.checkState() == Qt.CheckState.Checked
+        ]
+        if not fleets:
+            return
+        for fleet_id, item in self._items.items():
+            item.setText(self._labels[fleet_id])
+            item.setToolTip(fleet_id)
+        self._done = 0
+        self._changed = 0
+        self._total = len(fleets)
+        self._dry_run = dry_run
+        self._set_busy(True)
+        self.status_label.setText(f"Rolling out 0/{self._total}…")
+        selections = self._selections
+        task = Task(
+            rollout_host_config,
+            self._dc,
+            self._farm_id,
+            fleets,
+            lambda current: update_host_config(current, selections),
+            dry_run=dry_run,
+            stream=True,
+        )
+        task.signals.progress.connect(self._on_event)
+        task.signals.error.connect(lambda e: self.status_label.setText(f"Rollout failed: {e}"))
+        task.signals.finished.connect(self._on_finished)
+        submit(task, long_running=True)
+
+    def _on_event(self, event: dict[str, Any]) -> None:
+        item = self._items.get(event["fleetId"])
+        if item is not None:
+            item.setText(f"{self._labels[event['fleetId']]} — {self._STATUS_TEXT[event['status']]}")
+            if event["error"]:
+                item.setToolTip(event["error"])
+        if event["status"] == "updating":
+            return
+        self._done += 1
+        if event["status"] in ("updated", "pending"):
+            self._changed += 1
+        self.status_label.setText(f"Rolling out {self._done}/{self._total}…")
+
+    def _on_finished(self) -> None:
+        self._set_busy(False)
+        if self._done == self._total:
+            verb = "will change" if self._dry_run else "updated"
+            self.status_label.setText(f"{self._changed} of {self._total} fleets {verb}")
+
+
+def _fetch_host_script(dc: Any, farm_id: str, fleet_id: str) -> str:
+    """A fleet's host config script, or "" if it cannot be read. Runs on the worker pool."""
+    try:
+        details = get_fleet_details(dc, farm_id, fleet_id)
+        return details.get("hostConfiguration", {}).get("scriptBody", "")
+    except Exception:
+        return ""
 
 
 class FleetConfigTab(QWidget):
     """Fleet host configuration script builder with checkboxes."""
 
-    def __init__(self, deadline_client: Any) -> None:
+    def __init__(self, deadline_client: Any, region: str = "us-west-2") -> None:
         super().__init__()
         self._dc = deadline_client
+        self._region = region
         self._farm_id = ""
         self._fleet_id = ""
         self._fleet_name = ""
+        # The fleet's current script; its user sections survive rebuilds.
+        self._base_script = ""
+        self._checkboxes: dict[str, QCheckBox] = {}
+        self._param_widgets: dict[str, dict[str, QComboBox | QLineEdit]] = {}
+        self._checks = CheckScheduler(self)
 
         layout = QVBoxLayout(self)
 
@@ -37,30 +286,10 @@ class FleetConfigTab(QWidget):
 
         layout.addWidget(QLabel("Host Configuration Options:"))
 
-        self.docker_cb = QCheckBox("Install Docker")
-        self.docker_cb.stateChanged.connect(self._rebuild_script)
-        layout.addWidget(self.docker_cb)
-
-        self.sudo_cb = QCheckBox("Job-user passwordless sudo")
-        self.sudo_cb.stateChanged.connect(self._rebuild_script)
-        layout.addWidget(self.sudo_cb)
-
-        self.nvidia_cb = QCheckBox("NVIDIA Container Toolkit")
-        self.nvidia_cb.stateChanged.connect(self._rebuild_script)
-        layout.addWidget(self.nvidia_cb)
-
-        # Swap row: checkbox + size dropdown
-        swap_row = QHBoxLayout()
-        self.swap_cb = QCheckBox("Swap")
-        self.swap_cb.stateChanged.connect(self._rebuild_script)
-        swap_row.addWidget(self.swap_cb)
-        self.swap_combo = QComboBox()
-        for size in SWAP_SIZES:
-            self.swap_combo.addItem(f"{size}GB", size)
-        self.swap_combo.currentIndexChanged.connect(self._rebuild_script)
-        swap_row.addWidget(self.swap_combo)
-        swap_row.addStretch()
-        layout.addLayout(swap_row)
+        # One row per registered fragment: checkbox + parameter widgets
+        for frag in fragments():
+            if not frag.always:
+                layout.addLayout(self._fragment_row(frag))
 
         # Script preview
         layout.addWidget(QLabel("Generated Host Config Script:"))
@@ -69,10 +298,76 @@ class FleetConfigTab(QWidget):
         self.script_text.setFontFamily("Arial")
         layout.addWidget(self.script_text)
 
-        # Save button
+        btn_row = QHBoxLayout()
         self.save_btn = QPushButton("Save")
         self.save_btn.clicked.connect(self._save)
-        layout.addWidget(self.save_btn)
+        btn_row.addWidget(self.save_btn)
+        self.rollout_btn = QPushButton("Roll Out to Fleets…")
+        self.rollout_btn.setToolTip("Apply the checked fragments to several fleets of this farm")
+        self.rollout_btn.clicked.connect(self._open_rollout)
+        btn_row.addWidget(self.rollout_btn)
+        self.timing_btn = QPushButton("Boot Timing…")
+        self.timing_btn.setToolTip("Per-fragment p50/p95 durations from worker logs")
+        self.timing_btn.clicked.connect(self._open_timing)
+        btn_row.addWidget(self.timing_btn)
+        btn_row.addStretch()
+        layout.addLayout(btn_row)
+
+    def _fragment_row(self, frag: Fragment) -> QHBoxLayout:
+        row = QHBoxLayout()
+        cb = QCheckBox(frag.label)
+        dependents = [f.name for f in fragments() if frag.name in f.requires]
+        tips = []
+        if frag.requires:
+            tips.append("Also enables: " + ", ".join(frag.requires))
+        if dependents:
+            tips.append("Unchecking also disables: " + ", ".join(dependents))
+        if tips:
+            cb.setToolTip("\n".join(tips))
+        cb.stateChanged.connect(lambda _state, name=frag.name: self._on_toggled(name))
+        row.addWidget(cb)
+        self._checkboxes[frag.name] = cb
+        widgets: dict[str, QComboBox | QLineEdit] = {}
+        for param in frag.params:
+            widget: QComboBox | QLineEdit
+            if param.choices:
+                widget = QComboBox()
+                for choice in param.choices:
+                    widget.addItem(f"{choice}{param.unit}", choice)
+                widget.currentIndexChanged.connect(self._rebuild_script)
+            else:
+                row.addWidget(QLabel(param.label))
+                widget = QLineEdit(str(param.default))
+                widget.textChanged.connect(self._rebuild_script)
+            widgets[param.name] = widget
+            row.addWidget(widget)
+        self._param_widgets[frag.name] = widgets
+        row.addStretch()
+        return row
+
+    def _on_toggled(self, name: str) -> None:
+        # Checking a fragment checks what it requires, and unchecking one
+        # unchecks what depends on it, so the boxes always match the script.
+        if self._checkboxes[name].isChecked():
+            for req in get_fragment(name).requires:
+                self._checkboxes[req].setChecked(True)
+        else:
+            for frag in fragments():
+                if name in frag.requires and frag.name in self._checkboxes:
+                    self._checkboxes[frag.name].setChecked(False)
+        self._rebuild_script()
+
+    def _set_param(self, widget: QComboBox | QLineEdit, value: Any) -> None:
+        if isinstance(widget, QComboBox):
+            idx = widget.findData(value)
+            widget.setCurrentIndex(idx if idx >= 0 else 0)
+        else:
+            widget.setText(str(value))
+
+    def _get_param(self, widget: QComboBox | QLineEdit) -> Any:
+        if isinstance(widget, QComboBox):
+            return widget.currentData()
+        return widget.text().strip()
 
     def on_fleet_changed(self, fleet_id: str, farm_id: str, fleet_name: str) -> None:
         """Called when Tab 1 fleet selection changes."""
@@ -83,57 +378,95 @@ class FleetConfigTab(QWidget):
         self._load_current_config()
 
     def _load_current_config(self) -> None:
-        """Load the fleet's current host config and set checkboxes."""
+        """Fetch the fleet's current host config in the background, then set checkboxes."""
         if not self._farm_id or not self._fleet_id:
+            self._checks.cancel("config")
             return
-        try:
-            details = get_fleet_details(self._dc, self._farm_id, self._fleet_id)
-            script = details.get("hostConfiguration", {}).get("scriptBody", "")
-        except Exception:
-            script = ""
-
-        opts = parse_host_config(script)
+        self.fleet_label.setText(f"Fleet: {self._fleet_name} (loading…)")
+        self._checks.schedule(
+            "config",
+            _fetch_host_script,
+            self._dc,
+            self._farm_id,
+            self._fleet_id,
+            on_result=self._on_config_loaded,
+        )
 
-        # Block signals while setting checkboxes to avoid redundant rebuilds
-        for cb in (self.docker_cb, self.sudo_cb, self.nvidia_cb, self.swap_cb):
-            cb.blockSignals(True)
-        self.swap_combo.blockSignals(True)
+    def _on_config_loaded(self, script: str) -> None:
+        self.fleet_label.setText(f"Fleet: {self._fleet_name}")
+        self._base_script = script
+        found = parse_fragments(script)
 
-        self.docker_cb.setChecked(bool(opts["docker"]))
-        self.sudo_cb.setChecked(bool(opts["sudo"]))
-        self.nvidia_cb.setChecked(bool(opts["nvidia"]))
-        self.swap_cb.setChecked(bool(opts["swap"]))
+        # Block signals while setting widgets to avoid redundant rebuilds
+        widgets = [*self._checkboxes.values(), *(w for ws in self._param_widgets.values() for w in ws.values())]
+        for w in widgets:
+            w.blockSignals(True)
 
-        swap_size = int(opts.get("swap_size_gb", 32))
-        idx = SWAP_SIZES.index(swap_size) if swap_size in SWAP_SIZES else 0
-        self.swap_combo.setCurrentIndex(idx)
+        for frag in fragments():
+            if frag.always:
+                continue
+            self._checkboxes[frag.name].setChecked(frag.name in found)
+            params = found.get(frag.name, frag.defaults())
+            for pname, widget in self._param_widgets[frag.name].items():
+                self._set_param(widget, params.get(pname, ""))
 
-        for cb in (self.docker_cb, self.sudo_cb, self.nvidia_cb, self.swap_cb):
-            cb.blockSignals(False)
-        self.swap_combo.blockSignals(False)
+        for w in widgets:
+            w.blockSignals(False)
 
         self._rebuild_script()
 
+    def _selections(self) -> dict[str, dict[str, Any]]:
+        return {
+            name: {pname: self._get_param(w) for pname, w in self._param_widgets[name].items()}
+            for name, cb in self._checkboxes.items()
+            if cb.isChecked()
+        }
+
     def _rebuild_script(self) -> None:
         """Regenerate the script preview from current checkbox state."""
-        swap_size = self.swap_combo.currentData() or 32
-        script = build_host_config(
-            docker=self.docker_cb.isChecked(),
-            sudo=self.sudo_cb.isChecked(),
-            nvidia=self.nvidia_cb.isChecked(),
-            swap=self.swap_cb.isChecked(),
-            swap_size_gb=swap_size,
-        )
-        self.script_text.setPlainText(script)
+        self.script_text.setPlainText(update_host_config(self._base_script, self._selections()))
+
+    def _open_timing(self) -> None:
+        BootTimingDialog(self._region, self._farm_id, self._fleet_id, self._fleet_name, self).exec()
+
+    def _open_rollout(self) -> None:
+        if not self._farm_id:
+            QMessageBox.warning(self, "No Farm", "No farm selected.")
+            return
+        FleetRolloutDialog(self._dc, self._farm_id, self._fleet_id, self._selections(), self).exec()
+        self._load_current_config()
 
     def _save(self) -> None:
-        """Persist the host config to the fleet."""
+        """Persist the host config to the fleet in the background and verify it."""
         if not self._farm_id or not self._fleet_id:
             QMessageBox.warning(self, "No Fleet", "No fleet selected.")
             return
         script = self.script_text.toPlainText()
-        try:
-            update_fleet_host_config(self._dc, self._farm_id, self._fleet_id, script)
-            QMessageBox.information(self, "Saved", f"Host config saved to fleet {self._fleet_name}.")
-        except Exception as e:
-            QMessageBox.critical(self, "Error", f"Failed to save host config: {e}")
+        self.save_btn.setEnabled(False)
+        self.save_btn.setText("Saving…")
+        task = Task(
+            rollout_host_config,
+            self._dc,
+            self._farm_id,
+            [{"fleetId": self._fleet_id, "displayName": self._fleet_name}],
+            lambda _current: script,
+            stream=True,
+        )
+        task.signals.progress.connect(lambda event: self._on_save_event(event, script))
+        task.signals.error.connect(lambda e: QMessageBox.critical(self, "Error", f"Failed to save host config: {e}"))
+        task.signals.finished.connect(self._on_save_finished)
+        submit(task, long_running=True)
+
+    def _on_save_event(self, event: dict[str, Any], script: str) -> None:
+        if event["status"] == "updating":
+            self.save_btn.setText("Verifying…")
+        elif event["status"] in ("updated", "unchanged"):
+            if event["fleetId"] == self._fleet_id:
+                self._base_script = script
+            QMessageBox.information(self, "Saved", f"Host config saved to fleet {event['displayName']}.")
+        else:
+            QMessageBox.critical(self, "Error", f"Failed to save host config: {event['error']}")
+
+    def _on_save_finished(self) -> None:
+        self.save_btn.setText("Save")
+        self.save_btn.setEnabled(True)
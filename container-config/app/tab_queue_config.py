@@ -3,13 +3,26 @@
 from __future__ import annotations
 
 import json
-from typing import TYPE_CHECKING
+from datetime import datetime
+from typing import TYPE_CHECKING, Any, Callable
 
+from PySide6.QtCore import (
+    QAbstractListModel,
+    QModelIndex,
+    QPersistentModelIndex,
+    QSortFilterProxyModel,
+    Qt,
+    QTimer,
+)
 from PySide6.QtGui import QColor
 from PySide6.QtWidgets import (
     QComboBox,
+    QDialog,
     QHBoxLayout,
     QLabel,
+    QLineEdit,
+    QListWidget,
+    QListWidgetItem,
     QMessageBox,
     QPushButton,
     QTextEdit,
@@ -18,19 +31,239 @@ from PySide6.QtWidgets import (
 )
 
 from .aws_clients import (
+    INLINE_POLICY_MAX_CHARS,
     build_ecr_policy,
-    get_ecr_client,
+    get_ecr_policy,
     get_iam_client,
-    get_inline_ecr_policy,
     get_repo_arns_in_policy,
-    list_ecr_repos,
+    policy_size,
     role_name_from_arn,
     save_ecr_policy,
+    split_ecr_policy,
 )
+from .batch_policy import apply_batch
+from .ecr_index import get_ecr_index
+from .workers import Task, submit
 
 if TYPE_CHECKING:
     pass
 
+IN_POLICY_COLOR = QColor("#a6e3a1")
+PREVIEW_DELAY_MS = 50
+
+
+def _repo_tooltip(repo: dict[str, Any]) -> str:
+    if "imageCount" not in repo:
+        return repo["repositoryArn"]
+    pushed = repo.get("latestPushedAt")
+    pushed_text = datetime.fromtimestamp(pushed).strftime("%Y-%m-%d %H:%M") if pushed is not None else "—"
+    tags = ", ".join(repo.get("latestTags", [])) or "(untagged)"
+    size_gb = repo.get("latestSizeBytes", 0) / 1e9
+    return (
+        f"{repo['repositoryArn']}\n"
+        f"Images: {repo['imageCount']}\n"
+        f"Latest: {tags} — pushed {pushed_text}, {size_gb:.2f} GB"
+    )
+
+
+class RepoListModel(QAbstractListModel):
+    """ECR repositories with an in-policy marker per row.
+
+    Toggling a repo only emits ``dataChanged`` for that row, so views never
+    rebuild. ``ArnRole`` is ``UserRole`` so ``QComboBox.currentData()``
+    returns the repository ARN.
+    """
+
+    ArnRole = Qt.ItemDataRole.UserRole
+    NameRole = Qt.ItemDataRole.UserRole + 1
+
+    def __init__(self) -> None:
+        super().__init__()
+        self._repos: list[dict[str, Any]] = []
+        self._rows: dict[str, int] = {}
+        self._checked: set[str] = set()
+
+    def rowCount(self, parent: QModelIndex | QPersistentModelIndex = QModelIndex()) -> int:
+        return 0 if parent.isValid() else len(self._repos)
+
+    def data(self, index: QModelIndex | QPersistentModelIndex, role: int = Qt.ItemDataRole.DisplayRole) -> Any:
+        if not index.isValid() or index.row() >= len(self._repos):
+            return None
+        repo = self._repos[index.row()]
+        arn = repo["repositoryArn"]
+        if role == Qt.ItemDataRole.DisplayRole:
+            return f"{'✓ ' if arn in self._checked else '  '}{repo['repositoryName']}"
+        if role == self.ArnRole:
+            return arn
+        if role == self.NameRole:
+            return repo["repositoryName"]
+        if role == Qt.ItemDataRole.ToolTipRole:
+            return _repo_tooltip(repo)
+        if role == Qt.ItemDataRole.ForegroundRole and arn in self._checked:
+            return IN_POLICY_COLOR
+        return None
+
+    def set_repos(self, repos: list[dict[str, Any]]) -> None:
+        """Replace the repository list (only when the index itself changes)."""
+        self.beginResetModel()
+        self._repos = list(repos)
+        self._rows = {r["repositoryArn"]: i for i, r in enumerate(self._repos)}
+        self.endResetModel()
+
+    def set_checked_arns(self, arns: set[str]) -> None:
+        """Mark exactly ``arns`` as in-policy, repainting only rows that flipped."""
+        changed = self._checked ^ arns
+        self._checked = set(arns)
+        for arn in changed:
+            self._row_changed(arn)
+
+    def set_checked(self, arn: str, checked: bool) -> None:
+        if (arn in self._checked) == checked:
+            return
+        if checked:
+            self._checked.add(arn)
+        else:
+            self._checked.discard(arn)
+        self._row_changed(arn)
+
+    def _row_changed(self, arn: str) -> None:
+        row = self._rows.get(arn)
+        if row is not None:
+            idx = self.index(row)
+            self.dataChanged.emit(idx, idx)
+
+
+class BatchPolicyDialog(QDialog):
+    """Grant or revoke one repository on many queue/fleet roles at once."""
+
+    _STATUS_TEXT = {
+        "updated": "updated",
+        "unchanged": "already up to date",
+        "pending": "will change",
+        "failed": "failed",
+    }
+
+    def __init__(
+        self,
+        iam: Any,
+        repo_arn: str,
+        repo_name: str,
+        roles: list[dict[str, str]],
+        known_repo_arns: set[str],
+        parent: QWidget,
+    ) -> None:
+        super().__init__(parent)
+        self.setWindowTitle(f"Apply to Many Roles — {repo_name}")
+        self.setMinimumSize(560, 420)
+        self._iam = iam
+        self._repo_arn = repo_arn
+        self._known_repo_arns = known_repo_arns
+        self._items: dict[str, QListWidgetItem] = {}
+        self._labels: dict[str, str] = {}
+        self._done = 0
+        self._total = 0
+        self._changed = 0
+        self._dry_run = False
+        # Roles written by any run of this dialog, so the tab knows to reload.
+        self.updated = 0
+
+        layout = QVBoxLayout(self)
+        action_row = QHBoxLayout()
+        self.action_combo = QComboBox()
+        self.action_combo.addItem(f"Grant access to {repo_name}", "add")
+        self.action_combo.addItem(f"Revoke access to {repo_name}", "remove")
+        action_row.addWidget(self.action_combo)
+        action_row.addStretch()
+        layout.addLayout(action_row)
+
+        uses: dict[str, list[str]] = {}
+        for role in roles:
+            name = role_name_from_arn(role["roleArn"])
+            uses.setdefault(name, []).append(f"{role['kind'].title()} {role['displayName']}")
+        self.role_list = QListWidget()
+        for name in sorted(uses):
+            self._labels[name] = f"{name}  ({', '.join(uses[name])})"
+            item = QListWidgetItem(self._labels[name])
+            item.setFlags(item.flags() | Qt.ItemFlag.ItemIsUserCheckable)
+            item.setCheckState(Qt.CheckState.Checked)
+            item.setData(Qt.ItemDataRole.UserRole, name)
+            self.role_list.addItem(item)
+            self._items[name] = item
+        layout.addWidget(self.role_list, 1)
+
+        self.status_label = QLabel(f"{len(uses)} roles" if uses else "No roles known yet — run a farm scan first.")
+        layout.addWidget(self.status_label)
+
+        btn_row = QHBoxLayout()
+        self.preview_btn = QPushButton("Preview")
+        self.preview_btn.clicked.connect(lambda: self._run(dry_run=True))
+        btn_row.addWidget(self.preview_btn)
+        self.apply_btn = QPushButton("Apply")
+        self.apply_btn.clicked.connect(lambda: self._run(dry_run=False))
+        btn_row.addWidget(self.apply_btn)
+        btn_row.addStretch()
+        close_btn = QPushButton("Close")
+        close_btn.clicked.connect(self.accept)
+        btn_row.addWidget(close_btn)
+        layout.addLayout(btn_row)
+
+    def _checked_roles(self) -> list[str]:
+        return [name for name, item in self._items.items() if item.checkState() == Qt.CheckState.Checked]
+
+    def _run(self, dry_run: bool) -> None:
+        roles = self._checked_roles()
+        if not roles:
+            return
+        for name, item in self._items.items():
+            item.setText(self._labels[name])
+            item.setToolTip("")
+        self._done = 0
+        self._changed = 0
+        self._total = len(roles)
+        self._dry_run = dry_run
+        self.preview_btn.setEnabled(False)
+        self.apply_btn.setEnabled(False)
+        self.status_label.setText(f"Checking 0/{self._total}…")
+        repos = [self._repo_arn]
+        add = self.action_combo.currentData() == "add"
+        task = Task(
+            apply_batch,
+            self._iam,
+            roles,
+            add=repos if add else [],
+            remove=[] if add else repos,
+            known_repo_arns=self._known_repo_arns,
+            dry_run=dry_run,
+            stream=True,
+        )
+        task.signals.progress.connect(self._on_result)
+        task.signals.error.connect(self._on_error)
+        task.signals.finished.connect(self._on_finished)
+        submit(task)
+
+    def _on_result(self, res: dict[str, Any]) -> None:
+        self._done += 1
+        if res["status"] in ("updated", "pending"):
+            self._changed += 1
+        if res["status"] == "updated":
+            self.updated += 1
+        item = self._items.get(res["roleName"])
+        if item is not None:
+            item.setText(f"{self._labels[res['roleName']]} — {self._STATUS_TEXT[res['status']]}")
+            if res["error"]:
+                item.setToolTip(res["error"])
+        self.status_label.setText(f"Checking {self._done}/{self._total}…")
+
+    def _on_error(self, error: str) -> None:
+        self.status_label.setText(f"Batch update failed: {error}")
+
+    def _on_finished(self) -> None:
+        self.preview_btn.setEnabled(True)
+        self.apply_btn.setEnabled(True)
+        if self._done == self._total:
+            verb = "will change" if self._dry_run else "updated"
+            self.status_label.setText(f"{self._changed} of {self._total} roles {verb}")
+
 
 class QueueConfigTab(QWidget):
     """Queue IAM policy viewer and ECR repo access manager."""
@@ -38,13 +271,17 @@ class QueueConfigTab(QWidget):
     def __init__(self, region: str = "us-west-2") -> None:
         super().__init__()
         self._iam = get_iam_client()
-        self._ecr = get_ecr_client(region)
+        self._index = get_ecr_index(region)
         self._role_arn = ""
         self._role_name = ""
         self._queue_name = ""
-        self._repos: list[dict[str, str]] = []
+        self._repos: list[dict[str, Any]] = []
+        self._repos_loading = False
+        self._policy_gen = 0
         self._policy_repo_arns: set[str] = set()
         self._pending_repo_arns: set[str] = set()
+        self._policy_doc: dict[str, Any] | None = None
+        self._role_source: Callable[[], list[dict[str, str]]] | None = None
 
         layout = QVBoxLayout(self)
 
@@ -56,8 +293,20 @@ class QueueConfigTab(QWidget):
 
         # ECR repo selector
         layout.addWidget(QLabel("ECR Repositories:"))
+        self.repo_filter = QLineEdit()
+        self.repo_filter.setPlaceholderText("Filter repositories…")
+        self.repo_filter.setClearButtonEnabled(True)
+        layout.addWidget(self.repo_filter)
         ecr_row = QHBoxLayout()
+        self.repo_model = RepoListModel()
+        self.repo_proxy = QSortFilterProxyModel(self)
+        self.repo_proxy.setSourceModel(self.repo_model)
+        self.repo_proxy.setFilterRole(RepoListModel.NameRole)
+        self.repo_proxy.setFilterCaseSensitivity(Qt.CaseSensitivity.CaseInsensitive)
+        self.repo_filter.textChanged.connect(self.repo_proxy.setFilterFixedString)
         self.repo_combo = QComboBox()
+        self.repo_combo.setModel(self.repo_proxy)
+        self.repo_combo.setMaxVisibleItems(20)
         self.repo_combo.setMinimumWidth(400)
         ecr_row.addWidget(self.repo_combo)
         self.add_btn = QPushButton("Add to Policy")
@@ -66,6 +315,9 @@ class QueueConfigTab(QWidget):
         self.remove_btn = QPushButton("Remove from Policy")
         self.remove_btn.clicked.connect(self._remove_repo)
         ecr_row.addWidget(self.remove_btn)
+        self.batch_btn = QPushButton("Apply to Many Roles…")
+        self.batch_btn.clicked.connect(self._open_batch)
+        ecr_row.addWidget(self.batch_btn)
         ecr_row.addStretch()
         layout.addLayout(ecr_row)
 
@@ -75,12 +327,26 @@ class QueueConfigTab(QWidget):
         self.policy_text.setReadOnly(True)
         self.policy_text.setFontFamily("Courier")
         layout.addWidget(self.policy_text)
+        self.size_label = QLabel("")
+        self.size_label.setStyleSheet("color: #a6adc8; font-size: 11px;")
+        layout.addWidget(self.size_label)
 
         # Save button
         self.save_btn = QPushButton("Save")
         self.save_btn.clicked.connect(self._save)
         layout.addWidget(self.save_btn)
 
+        self._preview_timer = QTimer(self)
+        self._preview_timer.setSingleShot(True)
+        self._preview_timer.setInterval(PREVIEW_DELAY_MS)
+        self._preview_timer.timeout.connect(self._update_preview)
+
+        self._load_repos()
+
+    def set_role_source(self, source: Callable[[], list[dict[str, str]]]) -> None:
+        """Set the callable listing candidate roles for batch updates."""
+        self._role_source = source
+
     def on_queue_changed(self, queue_id: str, role_arn: str, queue_name: str) -> None:
         """Called when Tab 1 queue selection changes."""
         self._role_arn = role_arn
@@ -91,77 +357,137 @@ class QueueConfigTab(QWidget):
         self._refresh()
 
     def _refresh(self) -> None:
-        """Reload ECR repos and current policy."""
-        # Load repos
-        try:
-            self._repos = list_ecr_repos(self._ecr)
-        except Exception:
-            self._repos = []
-
-        # Load current policy
-        policy_doc = get_inline_ecr_policy(self._iam, self._role_name) if self._role_name else None
-        self._policy_repo_arns = get_repo_arns_in_policy(policy_doc)
-        self._pending_repo_arns = set(self._policy_repo_arns)
-
-        # Update policy text
+        """Reload the current policy, and the ECR index if it has gone stale."""
+        self._policy_gen += 1
+        gen = self._policy_gen
+        self._policy_repo_arns = set()
+        self._pending_repo_arns = set()
+        self._policy_doc = None
+        self._preview_timer.stop()
+        self.policy_text.setPlainText("Loading…")
+        self.size_label.setText("")
+        self.repo_model.set_checked_arns(self._pending_repo_arns)
+        if self._role_name:
+            task = Task(get_ecr_policy, self._iam, self._role_name)
+            task.signals.result.connect(lambda doc: self._on_policy_loaded(gen, doc))
+            submit(task)
+        else:
+            self._on_policy_loaded(gen, None)
+        if not self._index.is_fresh():
+            self._load_repos()
+
+    def _load_repos(self) -> None:
+        """Refresh the ECR index on the worker pool."""
+        if self._repos_loading:
+            return
+        self._repos_loading = True
+        self._set_repos(self._index.repos())
+        task = Task(self._index.refresh)
+        task.signals.result.connect(self._set_repos)
+        task.signals.finished.connect(lambda: setattr(self, "_repos_loading", False))
+        submit(task)
+
+    def _set_repos(self, repos: list[dict[str, Any]]) -> None:
+        if repos == self._repos:
+            return
+        selected = self.repo_combo.currentData()
+        self._repos = repos
+        self.repo_model.set_repos(repos)
+        idx = self.repo_combo.findData(selected)
+        if idx >= 0:
+            self.repo_combo.setCurrentIndex(idx)
+        if self._policy_doc and self._pending_repo_arns == self._policy_repo_arns:
+            # Wildcard resources expand against the index, which just changed.
+            self._set_policy_arns(get_repo_arns_in_policy(self._policy_doc, self._known_repo_arns()))
+
+    def _known_repo_arns(self) -> set[str]:
+        return {r["repositoryArn"] for r in self._repos}
+
+    def _set_policy_arns(self, arns: set[str]) -> None:
+        self._policy_repo_arns = arns
+        self._pending_repo_arns = set(arns)
+        self.repo_model.set_checked_arns(self._pending_repo_arns)
+
+    def _on_policy_loaded(self, gen: int, policy_doc: dict[str, Any] | None) -> None:
+        if gen != self._policy_gen:
+            return
+        self._policy_doc = policy_doc
+        self._set_policy_arns(get_repo_arns_in_policy(policy_doc, self._known_repo_arns()))
         if policy_doc:
             self.policy_text.setPlainText(json.dumps(policy_doc, indent=2))
+            self._update_size_label(policy_doc)
         else:
             self.policy_text.setPlainText("(no DeadlineECRAccess policy found)")
 
-        # Update repo combo with color coding
-        self.repo_combo.clear()
-        for r in self._repos:
-            name = r["repositoryName"]
-            arn = r["repositoryArn"]
-            in_policy = arn in self._pending_repo_arns
-            display = f"{'✓ ' if in_policy else '  '}{name}"
-            self.repo_combo.addItem(display, arn)
-
     def _add_repo(self) -> None:
         """Add the selected repo to the pending policy."""
-        idx = self.repo_combo.currentIndex()
-        if idx < 0 or idx >= len(self._repos):
+        arn = self.repo_combo.currentData()
+        if not arn or arn in self._pending_repo_arns:
             return
-        arn = self._repos[idx]["repositoryArn"]
         self._pending_repo_arns.add(arn)
-        self._update_preview()
+        self.repo_model.set_checked(arn, True)
+        self._preview_timer.start()
 
     def _remove_repo(self) -> None:
         """Remove the selected repo from the pending policy."""
-        idx = self.repo_combo.currentIndex()
-        if idx < 0 or idx >= len(self._repos):
+        arn = self.repo_combo.currentData()
+        if not arn or arn not in self._pending_repo_arns:
             return
-        arn = self._repos[idx]["repositoryArn"]
         self._pending_repo_arns.discard(arn)
-        self._update_preview()
+        self.repo_model.set_checked(arn, False)
+        self._preview_timer.start()
+
+    def _open_batch(self) -> None:
+        """Grant or revoke the selected repo across many roles."""
+        arn = self.repo_combo.currentData()
+        if not arn:
+            return
+        row = self.repo_combo.currentIndex()
+        repo_name = self.repo_proxy.data(self.repo_proxy.index(row, 0), RepoListModel.NameRole)
+        roles = self._role_source() if self._role_source else []
+        dialog = BatchPolicyDialog(self._iam, arn, repo_name, roles, self._known_repo_arns(), self)
+        dialog.exec()
+        if dialog.updated:
+            self._refresh()
 
     def _update_preview(self) -> None:
-        """Update the policy text preview and repo combo indicators."""
-        policy_doc = build_ecr_policy(self._pending_repo_arns)
+        """Update the policy text preview (coalesced across rapid clicks)."""
+        policy_doc = build_ecr_policy(self._pending_repo_arns, self._known_repo_arns())
         self.policy_text.setPlainText(json.dumps(policy_doc, indent=2))
-        # Refresh combo indicators
-        current_idx = self.repo_combo.currentIndex()
-        self.repo_combo.blockSignals(True)
-        self.repo_combo.clear()
-        for r in self._repos:
-            name = r["repositoryName"]
-            arn = r["repositoryArn"]
-            in_policy = arn in self._pending_repo_arns
-            display = f"{'✓ ' if in_policy else '  '}{name}"
-            self.repo_combo.addItem(display, arn)
-        if 0 <= current_idx < self.repo_combo.count():
-            self.repo_combo.setCurrentIndex(current_idx)
-        self.repo_combo.blockSignals(False)
+        self._update_size_label(policy_doc)
+
+    def _update_size_label(self, policy_doc: dict[str, Any]) -> None:
+        size = policy_size(policy_doc)
+        _, managed = split_ecr_policy(policy_doc)
+        if managed:
+            self.size_label.setText(
+                f"{size} characters — over the {INLINE_POLICY_MAX_CHARS} inline limit, "
+                f"saved as the inline policy plus {len(managed)} managed policies"
+            )
+        else:
+            self.size_label.setText(f"{size} / {INLINE_POLICY_MAX_CHARS} characters")
 
     def _save(self) -> None:
-        """Persist the policy to IAM."""
+        """Persist the policy to IAM on the worker pool."""
         if not self._role_name:
             QMessageBox.warning(self, "No Role", "No queue role selected.")
             return
-        try:
-            save_ecr_policy(self._iam, self._role_name, self._pending_repo_arns)
-            self._policy_repo_arns = set(self._pending_repo_arns)
-            QMessageBox.information(self, "Saved", f"ECR policy saved to role {self._role_name}.")
-        except Exception as e:
-            QMessageBox.critical(self, "Error", f"Failed to save policy: {e}")
+        role_name = self._role_name
+        arns = set(self._pending_repo_arns)
+        gen = self._policy_gen
+        self.save_btn.setEnabled(False)
+        self.save_btn.setText("Saving…")
+        task = Task(save_ecr_policy, self._iam, role_name, arns, self._known_repo_arns())
+        task.signals.result.connect(lambda _res: self._on_saved(gen, role_name, arns))
+        task.signals.error.connect(lambda e: QMessageBox.critical(self, "Error", f"Failed to save policy: {e}"))
+        task.signals.finished.connect(self._on_save_finished)
+        submit(task)
+
+    def _on_saved(self, gen: int, role_name: str, arns: set[str]) -> None:
+        if gen == self._policy_gen:
+            self._policy_repo_arns = arns
+        QMessageBox.information(self, "Saved", f"ECR policy saved to role {role_name}.")
+
+    def _on_save_finished(self) -> None:
+        self.save_btn.setText("Save")
+        self.save_btn.setEnabled(True)
@@ -4,11 +4,17 @@ from __future__ import annotations
 
 from typing import Any
 
-from PySide6.QtCore import QObject, QThread, Signal
+from PySide6.QtCore import QTimer, Signal
 from PySide6.QtWidgets import (
+    QAbstractItemView,
     QComboBox,
     QGridLayout,
+    QHBoxLayout,
+    QHeaderView,
     QLabel,
+    QPushButton,
+    QTableWidget,
+    QTableWidgetItem,
     QVBoxLayout,
     QWidget,
 )
@@ -17,15 +23,22 @@ from .aws_clients import (
     check_role_ecr_access,
     get_fleet_details,
     get_iam_client,
+    get_policy_cache_stats,
     get_queue_role_arn,
-    list_farms,
-    list_fleets,
-    list_queues,
-    load_app_config,
+    iter_farm_pages,
+    iter_fleet_pages,
+    iter_queue_pages,
     load_deadline_default_farm,
     role_name_from_arn,
-    save_app_config,
 )
+from .config_store import ConfigStore
+from .farm_audit import scan_farm
+from .host_config_builder import has_fragment
+from .snapshot import TopologySnapshot
+from .workers import CheckScheduler, Task, submit
+
+
+SNAPSHOT_SAVE_DELAY_MS = 1000
 
 
 class StatusDot(QLabel):
@@ -39,54 +52,40 @@ class StatusDot(QLabel):
         self.setToolTip(color)
 
 
-class _QueueCheckWorker(QObject):
-    """Background worker to check queue ECR access."""
-
-    finished = Signal(str, str, str, bool)  # queue_id, role_arn, queue_name, has_ecr
-
-    def __init__(self, dc: Any, iam: Any, farm_id: str, queue_id: str, queue_name: str) -> None:
-        super().__init__()
-        self._dc = dc
-        self._iam = iam
-        self._farm_id = farm_id
-        self._queue_id = queue_id
-        self._queue_name = queue_name
-
-    def run(self) -> None:
-        try:
-            role_arn = get_queue_role_arn(self._dc, self._farm_id, self._queue_id)
-            role_name = role_name_from_arn(role_arn)
-            has_ecr = check_role_ecr_access(self._iam, role_name) if role_name else False
-        except Exception:
-            role_arn = ""
-            has_ecr = False
-        self.finished.emit(self._queue_id, role_arn, self._queue_name, has_ecr)
-
-
-class _FleetCheckWorker(QObject):
-    """Background worker to check fleet IAM + Docker status."""
-
-    finished = Signal(str, str, str, bool, bool)  # fleet_id, farm_id, fleet_name, has_ecr, has_docker
-
-    def __init__(self, dc: Any, iam: Any, farm_id: str, fleet_id: str, fleet_name: str) -> None:
-        super().__init__()
-        self._dc = dc
-        self._iam = iam
-        self._farm_id = farm_id
-        self._fleet_id = fleet_id
-        self._fleet_name = fleet_name
-
-    def run(self) -> None:
-        try:
-            details = get_fleet_details(self._dc, self._farm_id, self._fleet_id)
-            role_name = role_name_from_arn(details["roleArn"])
-            has_ecr = check_role_ecr_access(self._iam, role_name) if role_name else False
-            host_cfg = details.get("hostConfiguration", {}).get("scriptBody", "")
-            has_docker = "docker" in host_cfg.lower() if host_cfg else False
-        except Exception:
-            has_ecr = False
-            has_docker = False
-        self.finished.emit(self._fleet_id, self._farm_id, self._fleet_name, has_ecr, has_docker)
+def _has_ecr(iam: Any, role_name: str) -> bool:
+    """ECR access of a role; a role whose policies cannot all be read shows as lacking it."""
+    try:
+        return check_role_ecr_access(iam, role_name) if role_name else False
+    except RuntimeError:
+        return False
+
+
+def _check_queue(dc: Any, iam: Any, farm_id: str, queue_id: str) -> tuple[str, bool]:
+    """Resolve a queue's role and check it for ECR access. Runs on the worker pool."""
+    try:
+        role_arn = get_queue_role_arn(dc, farm_id, queue_id)
+        role_name = role_name_from_arn(role_arn)
+        has_ecr = _has_ecr(iam, role_name)
+    except Exception:
+        role_arn = ""
+        has_ecr = False
+    return role_arn, has_ecr
+
+
+def _check_fleet(dc: Any, iam: Any, farm_id: str, fleet_id: str) -> tuple[str, bool, bool]:
+    """Check a fleet's role for ECR access and its host config for Docker. Runs on the worker pool."""
+    try:
+        details = get_fleet_details(dc, farm_id, fleet_id)
+        role_arn = details["roleArn"]
+        role_name = role_name_from_arn(role_arn)
+        has_ecr = _has_ecr(iam, role_name)
+        host_cfg = details.get("hostConfiguration", {}).get("scriptBody", "")
+        has_docker = has_fragment(host_cfg, "docker")
+    except Exception:
+        role_arn = ""
+        has_ecr = False
+        has_docker = False
+    return role_arn, has_ecr, has_docker
 
 
 class SummaryTab(QWidget):
@@ -95,14 +94,31 @@ class SummaryTab(QWidget):
     queue_changed = Signal(str, str, str)  # queue_id, role_arn, queue_name
     fleet_changed = Signal(str, str, str)  # fleet_id, farm_id, fleet_name
 
-    def __init__(self, deadline_client: Any) -> None:
+    def __init__(
+        self,
+        deadline_client: Any,
+        config: ConfigStore | None = None,
+        snapshot: TopologySnapshot | None = None,
+    ) -> None:
         super().__init__()
         self._dc = deadline_client
+        self._config = config if config is not None else ConfigStore.load()
+        self._load_gen = {"farms": 0, "queues": 0, "fleets": 0}
+        self._fresh: dict[str, list[dict[str, str]]] = {"farms": [], "queues": [], "fleets": []}
+        self._revalidating = {"farms": False, "queues": False, "fleets": False}
+        self._load_failed = {"farms": False, "queues": False, "fleets": False}
+        self._snapshot = snapshot if snapshot is not None else TopologySnapshot.load()
+        self._snapshot_timer = QTimer(self)
+        self._snapshot_timer.setSingleShot(True)
+        self._snapshot_timer.setInterval(SNAPSHOT_SAVE_DELAY_MS)
+        self._snapshot_timer.timeout.connect(self.flush)
+        self._last_emitted_queue = ("", "")
+        self._last_emitted_fleet = ("", "")
         self._iam = get_iam_client()
         self._farms: list[dict[str, str]] = []
         self._queues: list[dict[str, str]] = []
         self._fleets: list[dict[str, str]] = []
-        self._threads: list[QThread] = []
+        self._checks = CheckScheduler(self)
 
         layout = QVBoxLayout(self)
         layout.setContentsMargins(20, 20, 20, 20)
@@ -147,33 +163,149 @@ class SummaryTab(QWidget):
         grid.addWidget(self.fleet_docker_dot, 2, 5)
 
         layout.addLayout(grid)
-        layout.addStretch()
+
+        # Farm-wide audit
+        scan_row = QHBoxLayout()
+        self.scan_btn = QPushButton("Scan Entire Farm")
+        self.scan_btn.clicked.connect(self._run_farm_scan)
+        scan_row.addWidget(self.scan_btn)
+        self.scan_status = QLabel("")
+        scan_row.addWidget(self.scan_status)
+        scan_row.addStretch()
+        layout.addLayout(scan_row)
+
+        self.scan_table = QTableWidget(0, 5)
+        self.scan_table.setHorizontalHeaderLabels(["Type", "Name", "Role", "ECR", "Docker"])
+        self.scan_table.setEditTriggers(QAbstractItemView.EditTrigger.NoEditTriggers)
+        self.scan_table.setSelectionBehavior(QAbstractItemView.SelectionBehavior.SelectRows)
+        self.scan_table.verticalHeader().setVisible(False)
+        self.scan_table.horizontalHeader().setSectionResizeMode(2, QHeaderView.ResizeMode.Stretch)
+        layout.addWidget(self.scan_table, 1)
+
+        self.cache_label = QLabel()
+        self.cache_label.setStyleSheet("color: #a6adc8; font-size: 11px;")
+        layout.addWidget(self.cache_label)
+        self._update_cache_label()
 
         self.farm_combo.currentIndexChanged.connect(self._on_farm_changed)
         self.queue_combo.currentIndexChanged.connect(self._on_queue_changed)
         self.fleet_combo.currentIndexChanged.connect(self._on_fleet_changed)
 
-        self._load_farms()
+        # Start once the event loop runs so MainWindow has connected our signals.
+        QTimer.singleShot(0, self._load_farms)
 
     def _load_farms(self) -> None:
-        try:
-            self._farms = list_farms(self._dc)
-        except Exception:
-            self._farms = []
-        self.farm_combo.blockSignals(True)
-        self.farm_combo.clear()
-        for f in self._farms:
-            self.farm_combo.addItem(f["displayName"], f["farmId"])
-        app_cfg = load_app_config()
-        default_farm = app_cfg.get("last_farm_id", "") or load_deadline_default_farm()
-        idx = 0
-        for i, f in enumerate(self._farms):
-            if f["farmId"] == default_farm:
-                idx = i
-                break
-        self.farm_combo.setCurrentIndex(idx)
-        self.farm_combo.blockSignals(False)
-        self._on_farm_changed()
+        gen = self._start_load("farms")
+        preferred = self._config.get("last_farm_id", "") or load_deadline_default_farm()
+        cached = self._snapshot.farms()
+        if cached:
+            self._show_cached("farms", cached, preferred)
+        else:
+            self._begin_load(self.farm_combo, "Loading farms…")
+            self._begin_load(self.queue_combo, "Loading queues…")
+            self._begin_load(self.fleet_combo, "Loading fleets…")
+        task = Task(iter_farm_pages, self._dc, stream=True)
+        task.signals.progress.connect(lambda page: self._on_page("farms", gen, page, preferred))
+        task.signals.error.connect(lambda err: self._on_load_error("farms", gen))
+        task.signals.finished.connect(lambda: self._on_farms_loaded(gen, preferred))
+        submit(task)
+        if cached:
+            self._on_farm_changed()
+
+    def _on_farms_loaded(self, gen: int, preferred: str) -> None:
+        if self._finish_load("farms", gen, "", preferred, "No farms found"):
+            if not self._farms:
+                self._end_load(self.queue_combo, self._queues, "")
+                self._end_load(self.fleet_combo, self._fleets, "")
+            self._on_farm_changed()
+        elif gen == self._load_gen["farms"] and self._load_failed["farms"] and not self._revalidating["farms"]:
+            # Nothing cached to fall back on: release the dependent skeletons too.
+            self._end_load(self.queue_combo, [], "No farm loaded")
+            self._end_load(self.fleet_combo, [], "No farm loaded")
+
+    def _start_load(self, kind: str) -> int:
+        """Begin a new load of ``kind``; pages from older loads are ignored from now on."""
+        self._load_gen[kind] += 1
+        self._fresh[kind] = []
+        self._revalidating[kind] = False
+        self._load_failed[kind] = False
+        return self._load_gen[kind]
+
+    def _show_cached(self, kind: str, cached: list[dict[str, str]], preferred_id: str) -> None:
+        """Render a list from the snapshot; the running load only revalidates it."""
+        combo, id_key = self._combo_for(kind)
+        combo.blockSignals(True)
+        combo.clear()
+        items: list[dict[str, str]] = []
+        setattr(self, f"_{kind}", items)
+        self._append_items(combo, items, cached, id_key, preferred_id)
+        combo.blockSignals(False)
+        self._revalidating[kind] = True
+
+    def _combo_for(self, kind: str) -> tuple[QComboBox, str]:
+        if kind == "farms":
+            return self.farm_combo, "farmId"
+        if kind == "queues":
+            return self.queue_combo, "queueId"
+        return self.fleet_combo, "fleetId"
+
+    @staticmethod
+    def _begin_load(combo: QComboBox, placeholder: str) -> None:
+        """Put a combo into its loading (skeleton) state."""
+        combo.blockSignals(True)
+        combo.clear()
+        combo.setPlaceholderText(placeholder)
+        combo.setCurrentIndex(-1)
+        combo.setEnabled(False)
+
+    @staticmethod
+    def _end_load(combo: QComboBox, items: list[dict[str, str]], empty_text: str) -> None:
+        combo.setPlaceholderText(empty_text)
+        combo.setEnabled(bool(items))
+        combo.blockSignals(False)
+
+    def _on_load_error(self, kind: str, gen: int) -> None:
+        if gen == self._load_gen[kind]:
+            self._load_failed[kind] = True
+
+    def _finish_load(self, kind: str, gen: int, farm_id: str, preferred_id: str, empty_text: str) -> bool:
+        """Settle a finished load. Returns True if the selection needs (re)checking.
+
+        When the combo was rendered from the snapshot, the fresh list replaces
+        it only if it differs, keeping the current selection where possible.
+        A failed load leaves cached content untouched.
+        """
+        if gen != self._load_gen[kind]:
+            return False
+        combo, id_key = self._combo_for(kind)
+        items: list[dict[str, str]] = getattr(self, f"_{kind}")
+        if self._load_failed[kind]:
+            if not self._revalidating[kind]:
+                self._end_load(combo, items, f"Failed to load {kind}")
+            return False
+        fresh = self._fresh[kind]
+        if kind == "farms":
+            self._snapshot.set_farms(fresh)
+        elif kind == "queues":
+            self._snapshot.set_queues(farm_id, fresh)
+        else:
+            self._snapshot.set_fleets(farm_id, fresh)
+        self._schedule_snapshot_save()
+        if not self._revalidating[kind]:
+            self._end_load(combo, items, empty_text)
+            return True
+        if fresh == items:
+            return False
+        idx = combo.currentIndex()
+        selected = items[idx][id_key] if 0 <= idx < len(items) else ""
+        combo.blockSignals(True)
+        combo.clear()
+        new_items: list[dict[str, str]] = []
+        setattr(self, f"_{kind}", new_items)
+        self._append_items(combo, new_items, fresh, id_key, selected or preferred_id)
+        self._end_load(combo, new_items, empty_text)
+        idx = combo.currentIndex()
+        return not (0 <= idx < len(new_items) and new_items[idx][id_key] == selected)
 
     def _current_farm_id(self) -> str:
         idx = self.farm_combo.currentIndex()
@@ -190,44 +322,72 @@ class SummaryTab(QWidget):
         self._load_fleets(farm_id)
 
     def _load_queues(self, farm_id: str) -> None:
-        try:
-            self._queues = list_queues(self._dc, farm_id)
-        except Exception:
+        gen = self._start_load("queues")
+        self._checks.cancel("queue")
+        last_queue = self._config.get("last_queue_id", "")
+        cached = self._snapshot.queues(farm_id)
+        if cached:
+            self._show_cached("queues", cached, last_queue)
+        else:
             self._queues = []
-        self.queue_combo.blockSignals(True)
-        self.queue_combo.clear()
-        for q in self._queues:
-            self.queue_combo.addItem(q["displayName"], q["queueId"])
-        app_cfg = load_app_config()
-        last_queue = app_cfg.get("last_queue_id", "")
-        idx = 0
-        for i, q in enumerate(self._queues):
-            if q["queueId"] == last_queue:
-                idx = i
-                break
-        self.queue_combo.setCurrentIndex(idx)
-        self.queue_combo.blockSignals(False)
-        self._on_queue_changed()
+            self.queue_ecr_dot.set_color("gray")
+            self._begin_load(self.queue_combo, "Loading queues…")
+        task = Task(iter_queue_pages, self._dc, farm_id, stream=True)
+        task.signals.progress.connect(lambda page: self._on_page("queues", gen, page, last_queue))
+        task.signals.error.connect(lambda err: self._on_load_error("queues", gen))
+        task.signals.finished.connect(lambda: self._on_queues_loaded(gen, farm_id, last_queue))
+        submit(task)
+        if cached:
+            self._on_queue_changed()
 
     def _load_fleets(self, farm_id: str) -> None:
-        try:
-            self._fleets = list_fleets(self._dc, farm_id)
-        except Exception:
+        gen = self._start_load("fleets")
+        self._checks.cancel("fleet")
+        last_fleet = self._config.get("last_fleet_id", "")
+        cached = self._snapshot.fleets(farm_id)
+        if cached:
+            self._show_cached("fleets", cached, last_fleet)
+        else:
             self._fleets = []
-        self.fleet_combo.blockSignals(True)
-        self.fleet_combo.clear()
-        for f in self._fleets:
-            self.fleet_combo.addItem(f["displayName"], f["fleetId"])
-        app_cfg = load_app_config()
-        last_fleet = app_cfg.get("last_fleet_id", "")
-        idx = 0
-        for i, f in enumerate(self._fleets):
-            if f["fleetId"] == last_fleet:
-                idx = i
-                break
-        self.fleet_combo.setCurrentIndex(idx)
-        self.fleet_combo.blockSignals(False)
-        self._on_fleet_changed()
+            self.fleet_iam_dot.set_color("gray")
+            self.fleet_docker_dot.set_color("gray")
+            self._begin_load(self.fleet_combo, "Loading fleets…")
+        task = Task(iter_fleet_pages, self._dc, farm_id, stream=True)
+        task.signals.progress.connect(lambda page: self._on_page("fleets", gen, page, last_fleet))
+        task.signals.error.connect(lambda err: self._on_load_error("fleets", gen))
+        task.signals.finished.connect(lambda: self._on_fleets_loaded(gen, farm_id, last_fleet))
+        submit(task)
+        if cached:
+            self._on_fleet_changed()
+
+    def _on_queues_loaded(self, gen: int, farm_id: str, preferred: str) -> None:
+        if self._finish_load("queues", gen, farm_id, preferred, "No queues"):
+            self._on_queue_changed()
+
+    def _on_fleets_loaded(self, gen: int, farm_id: str, preferred: str) -> None:
+        if self._finish_load("fleets", gen, farm_id, preferred, "No fleets"):
+            self._on_fleet_changed()
+
+    def _on_page(self, kind: str, gen: int, page: list[dict[str, str]], preferred_id: str) -> None:
+        """Collect a streamed page; show it right away unless cached content is being revalidated."""
+        if gen != self._load_gen[kind]:
+            return
+        self._fresh[kind].extend(page)
+        if not self._revalidating[kind]:
+            combo, id_key = self._combo_for(kind)
+            self._append_items(combo, getattr(self, f"_{kind}"), page, id_key, preferred_id)
+
+    @staticmethod
+    def _append_items(
+        combo: QComboBox, items: list[dict[str, str]], page: list[dict[str, str]], id_key: str, preferred_id: str
+    ) -> None:
+        """Append one page of resources to a combo, selecting ``preferred_id`` once it shows up."""
+        for item in page:
+            items.append(item)
+            combo.addItem(item["displayName"], item[id_key])
+            if item[id_key] == preferred_id or combo.currentIndex() < 0:
+                combo.setCurrentIndex(len(items) - 1)
+        combo.setEnabled(True)
 
     def _on_queue_changed(self) -> None:
         idx = self.queue_combo.currentIndex()
@@ -238,7 +398,13 @@ class SummaryTab(QWidget):
         queue_name = self._queues[idx]["displayName"]
         farm_id = self._current_farm_id()
         self._save_selection()
-        self.queue_ecr_dot.set_color("gray")  # loading
+        cached = self._snapshot.queue_status(queue_id)
+        if cached:
+            # Show the last-known state now; the check below revalidates it.
+            self.queue_ecr_dot.set_color("green" if cached["hasEcr"] else "red")
+            self._emit_queue_changed(queue_id, cached["roleArn"], queue_name)
+        else:
+            self.queue_ecr_dot.set_color("gray")  # loading
         self._run_queue_check(farm_id, queue_id, queue_name)
 
     def _on_fleet_changed(self) -> None:
@@ -251,47 +417,150 @@ class SummaryTab(QWidget):
         fleet_name = self._fleets[idx]["displayName"]
         farm_id = self._current_farm_id()
         self._save_selection()
-        self.fleet_iam_dot.set_color("gray")
-        self.fleet_docker_dot.set_color("gray")
+        cached = self._snapshot.fleet_status(fleet_id)
+        if cached:
+            self.fleet_iam_dot.set_color("green" if cached["hasEcr"] else "yellow")
+            self.fleet_docker_dot.set_color("green" if cached["hasDocker"] else "red")
+            self._emit_fleet_changed(fleet_id, farm_id, fleet_name)
+        else:
+            self.fleet_iam_dot.set_color("gray")
+            self.fleet_docker_dot.set_color("gray")
         self._run_fleet_check(farm_id, fleet_id, fleet_name)
 
+    def _emit_queue_changed(self, queue_id: str, role_arn: str, queue_name: str) -> None:
+        """Emit queue_changed unless the other tabs already have this queue and role."""
+        if self._last_emitted_queue != (queue_id, role_arn):
+            self._last_emitted_queue = (queue_id, role_arn)
+            self.queue_changed.emit(queue_id, role_arn, queue_name)
+
+    def _emit_fleet_changed(self, fleet_id: str, farm_id: str, fleet_name: str) -> None:
+        if self._last_emitted_fleet != (fleet_id, farm_id):
+            self._last_emitted_fleet = (fleet_id, farm_id)
+            self.fleet_changed.emit(fleet_id, farm_id, fleet_name)
+
     def _run_queue_check(self, farm_id: str, queue_id: str, queue_name: str) -> None:
-        thread = QThread()
-        worker = _QueueCheckWorker(self._dc, self._iam, farm_id, queue_id, queue_name)
-        worker.moveToThread(thread)
-        thread.started.connect(worker.run)
-        worker.finished.connect(self._on_queue_check_done)
-        worker.finished.connect(thread.quit)
-        thread.finished.connect(lambda: self._cleanup_thread(thread))
-        self._threads.append(thread)
-        thread.start()
+        self._checks.schedule(
+            "queue",
+            _check_queue,
+            self._dc,
+            self._iam,
+            farm_id,
+            queue_id,
+            on_result=lambda res: self._on_queue_check_done(queue_id, res[0], queue_name, res[1]),
+        )
 
     def _on_queue_check_done(self, queue_id: str, role_arn: str, queue_name: str, has_ecr: bool) -> None:
         self.queue_ecr_dot.set_color("green" if has_ecr else "red")
-        self.queue_changed.emit(queue_id, role_arn, queue_name)
+        self._update_cache_label()
+        if role_arn:
+            self._snapshot.set_queue_status(queue_id, role_arn, has_ecr)
+            self._schedule_snapshot_save()
+        self._emit_queue_changed(queue_id, role_arn, queue_name)
 
     def _run_fleet_check(self, farm_id: str, fleet_id: str, fleet_name: str) -> None:
-        thread = QThread()
-        worker = _FleetCheckWorker(self._dc, self._iam, farm_id, fleet_id, fleet_name)
-        worker.moveToThread(thread)
-        thread.started.connect(worker.run)
-        worker.finished.connect(self._on_fleet_check_done)
-        worker.finished.connect(thread.quit)
-        thread.finished.connect(lambda: self._cleanup_thread(thread))
-        self._threads.append(thread)
-        thread.start()
-
-    def _on_fleet_check_done(self, fleet_id: str, farm_id: str, fleet_name: str, has_ecr: bool, has_docker: bool) -> None:
+        self._checks.schedule(
+            "fleet",
+            _check_fleet,
+            self._dc,
+            self._iam,
+            farm_id,
+            fleet_id,
+            on_result=lambda res: self._on_fleet_check_done(fleet_id, farm_id, fleet_name, *res),
+        )
+
+    def _on_fleet_check_done(
+        self, fleet_id: str, farm_id: str, fleet_name: str, role_arn: str, has_ecr: bool, has_docker: bool
+    ) -> None:
         self.fleet_iam_dot.set_color("green" if has_ecr else "yellow")
         self.fleet_docker_dot.set_color("green" if has_docker else "red")
-        self.fleet_changed.emit(fleet_id, farm_id, fleet_name)
+        self._update_cache_label()
+        if role_arn:
+            self._snapshot.set_fleet_status(fleet_id, role_arn, has_ecr, has_docker)
+            self._schedule_snapshot_save()
+        self._emit_fleet_changed(fleet_id, farm_id, fleet_name)
+
+    def _schedule_snapshot_save(self) -> None:
+        """Coalesce snapshot writes from a burst of loads and checks into one."""
+        self._snapshot_timer.start()
+
+    def flush(self) -> None:
+        """Write any pending snapshot changes now (called on shutdown)."""
+        self._snapshot_timer.stop()
+        try:
+            self._snapshot.save()
+        except OSError:
+            pass
 
-    def _cleanup_thread(self, thread: QThread) -> None:
-        if thread in self._threads:
-            self._threads.remove(thread)
+    def _run_farm_scan(self) -> None:
+        farm_id = self._current_farm_id()
+        if not farm_id:
+            return
+        self.scan_btn.setEnabled(False)
+        self.scan_table.setRowCount(0)
+        self.scan_status.setText("Scanning…")
+        errors: list[str] = []
+        task = Task(scan_farm, self._dc, self._iam, farm_id, stream=True)
+        task.signals.progress.connect(self._on_farm_scan_result)
+        task.signals.error.connect(errors.append)
+        task.signals.finished.connect(lambda: self._on_farm_scan_done(farm_id, errors[0] if errors else ""))
+        # A scan audits every queue and fleet; keep it off the pool used by status checks.
+        submit(task, long_running=True)
+
+    def _on_farm_scan_result(self, res: dict[str, Any]) -> None:
+        if not res["error"]:
+            if res["kind"] == "queue":
+                self._snapshot.set_queue_status(res["id"], res["roleArn"], res["hasEcr"])
+            else:
+                self._snapshot.set_fleet_status(res["id"], res["roleArn"], res["hasEcr"], res["hasDocker"])
+            self._schedule_snapshot_save()
+        row = self.scan_table.rowCount()
+        self.scan_table.insertRow(row)
+        if res["error"]:
+            ecr_text = "error"
+        else:
+            ecr_text = "✓" if res["hasEcr"] else "✗"
+        docker = res["hasDocker"]
+        docker_text = "—" if docker is None else ("✓" if docker else "✗")
+        cells = [res["kind"].title(), res["displayName"], res["roleArn"] or "(none)", ecr_text, docker_text]
+        for col, text in enumerate(cells):
+            item = QTableWidgetItem(text)
+            if res["error"]:
+                item.setToolTip(res["error"])
+            self.scan_table.setItem(row, col, item)
+        self.scan_status.setText(f"Scanning… {row + 1} checked")
+
+    def _on_farm_scan_done(self, farm_id: str, error: str) -> None:
+        self.scan_btn.setEnabled(True)
+        count = self.scan_table.rowCount()
+        self.scan_status.setText(f"Scan failed: {error}" if error else f"Scanned {count} queues and fleets")
+        self._update_cache_label()
+
+    def known_roles(self) -> list[dict[str, str]]:
+        """Queue and fleet roles of the current farm whose ARN is known.
+
+        Roles come from the snapshot, so they cover every queue and fleet
+        that has been selected or included in a farm scan.
+        """
+        farm_id = self._current_farm_id()
+        roles: list[dict[str, str]] = []
+        for queue in self._snapshot.queues(farm_id):
+            status = self._snapshot.queue_status(queue["queueId"])
+            if status and status["roleArn"]:
+                roles.append({"kind": "queue", "displayName": queue["displayName"], "roleArn": status["roleArn"]})
+        for fleet in self._snapshot.fleets(farm_id):
+            status = self._snapshot.fleet_status(fleet["fleetId"])
+            if status and status["roleArn"]:
+                roles.append({"kind": "fleet", "displayName": fleet["displayName"], "roleArn": status["roleArn"]})
+        return roles
+
+    def _update_cache_label(self) -> None:
+        stats = get_policy_cache_stats()
+        self.cache_label.setText(
+            f"Policy cache: {stats['hits']} hits / {stats['misses']} misses ({stats['size']} documents)"
+        )
 
     def _save_selection(self) -> None:
-        data = load_app_config()
+        data: dict[str, str] = {}
         farm_id = self._current_farm_id()
         if farm_id:
             data["last_farm_id"] = farm_id
@@ -301,4 +570,4 @@ class SummaryTab(QWidget):
         f_idx = self.fleet_combo.currentIndex()
         if 0 <= f_idx < len(self._fleets):
             data["last_fleet_id"] = self._fleets[f_idx]["fleetId"]
-        save_app_config(data)
+        self._config.update(data)
@@ -0,0 +1,155 @@
+"""Shared thread pool for running AWS calls off the Qt main thread."""
+
+from __future__ import annotations
+
+from typing import Any, Callable
+
+from PySide6.QtCore import QObject, QRunnable, QThreadPool, QTimer, Signal
+
+POOL_MAX_THREADS = 6
+# Tasks that wait on AWS for minutes (fleet rollouts polling until settled)
+# get their own pool so short calls never queue behind them.
+LONG_POOL_MAX_THREADS = 4
+CHECK_DEBOUNCE_MS = 200
+
+_pool: QThreadPool | None = None
+_long_pool: QThreadPool | None = None
+_active: set["Task"] = set()
+
+
+def get_pool() -> QThreadPool:
+    """Return the application-wide worker pool."""
+    global _pool
+    if _pool is None:
+        _pool = QThreadPool()
+        _pool.setMaxThreadCount(POOL_MAX_THREADS)
+    return _pool
+
+
+def get_long_pool() -> QThreadPool:
+    """Return the pool for long-running tasks, separate from the shared pool."""
+    global _long_pool
+    if _long_pool is None:
+        _long_pool = QThreadPool()
+        _long_pool.setMaxThreadCount(LONG_POOL_MAX_THREADS)
+    return _long_pool
+
+
+class TaskSignals(QObject):
+    """Signals for a Task. Created on the main thread so slots run there."""
+
+    progress = Signal(object)  # one item from a streaming task
+    result = Signal(object)  # return value of a non-streaming task
+    error = Signal(str)
+    finished = Signal()
+
+
+class Task(QRunnable):
+    """Run ``fn(*args, **kwargs)`` on the worker pool.
+
+    With ``stream=True`` the callable must return an iterator; each item is
+    emitted through ``signals.progress`` as soon as it is produced.
+    """
+
+    def __init__(self, fn: Callable[..., Any], *args: Any, stream: bool = False, **kwargs: Any) -> None:
+        super().__init__()
+        self.setAutoDelete(False)
+        self.signals = TaskSignals()
+        self._fn = fn
+        self._args = args
+        self._kwargs = kwargs
+        self._stream = stream
+
+    def run(self) -> None:
+        try:
+            if self._stream:
+                for item in self._fn(*self._args, **self._kwargs):
+                    self.signals.progress.emit(item)
+            else:
+                self.signals.result.emit(self._fn(*self._args, **self._kwargs))
+        except Exception as e:
+            self.signals.error.emit(str(e))
+        self.signals.finished.emit()
+
+
+def submit(task: Task, long_running: bool = False) -> Task:
+    """Queue a task on the shared pool, or on the long-running pool.
+
+    Connect to ``task.signals`` before calling this; the task is kept alive
+    until ``finished`` has been delivered on the main thread.
+    """
+    _active.add(task)
+    task.signals.finished.connect(lambda: _active.discard(task))
+    (get_long_pool() if long_running else get_pool()).start(task)
+    return task
+
+
+def cancel(task: Task) -> bool:
+    """Drop a task that has not started yet. Returns False if it is already running."""
+    if get_pool().tryTake(task) or get_long_pool().tryTake(task):
+        _active.discard(task)
+        return True
+    return False
+
+
+class CheckScheduler(QObject):
+    """Debounce background checks and discard superseded results.
+
+    Checks are scheduled under a key such as ``"queue"``. Each call bumps the
+    key's generation and restarts a short debounce timer, so only the last of
+    a burst of selection changes is submitted. A still-queued task for the
+    same key is taken back off the pool, and a result that arrives after a
+    newer generation was scheduled is dropped instead of overwriting it.
+    """
+
+    def __init__(self, parent: QObject | None = None, delay_ms: int = CHECK_DEBOUNCE_MS) -> None:
+        super().__init__(parent)
+        self._delay_ms = delay_ms
+        self._generations: dict[str, int] = {}
+        self._pending: dict[str, tuple[Callable[..., Any], tuple[Any, ...], Callable[[Any], None]]] = {}
+        self._tasks: dict[str, Task] = {}
+        self._timers: dict[str, QTimer] = {}
+
+    def schedule(self, key: str, fn: Callable[..., Any], *args: Any, on_result: Callable[[Any], None]) -> int:
+        """Schedule ``fn(*args)`` for ``key``; ``on_result`` only sees the latest generation."""
+        generation = self._generations.get(key, 0) + 1
+        self._generations[key] = generation
+        self._pending[key] = (fn, args, on_result)
+        timer = self._timers.get(key)
+        if timer is None:
+            timer = QTimer(self)
+            timer.setSingleShot(True)
+            timer.timeout.connect(lambda: self._fire(key))
+            self._timers[key] = timer
+        timer.start(self._delay_ms)
+        return generation
+
+    def cancel(self, key: str) -> None:
+        """Forget any pending or in-flight check for ``key``."""
+        self._generations[key] = self._generations.get(key, 0) + 1
+        self._pending.pop(key, None)
+        if key in self._timers:
+            self._timers[key].stop()
+        task = self._tasks.pop(key, None)
+        if task is not None:
+            cancel(task)
+
+    def _fire(self, key: str) -> None:
+        pending = self._pending.pop(key, None)
+        if pending is None:
+            return
+        fn, args, on_result = pending
+        generation = self._generations[key]
+        previous = self._tasks.pop(key, None)
+        if previous is not None:
+            cancel(previous)
+        task = Task(fn, *args)
+        task.signals.result.connect(lambda result: self._deliver(key, generation, on_result, result))
+        self._tasks[key] = task
+        submit(task)
+
+    def _deliver(self, key: str, generation: int, on_result: Callable[[Any], None], result: Any) -> None:
+        if generation != self._generations.get(key):
+            return
+        self._tasks.pop(key, None)
+        on_result(result)
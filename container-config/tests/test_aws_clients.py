@@ -9,19 +9,37 @@ from unittest.mock import MagicMock, patch
 import pytest
 
 from app.aws_clients import (
+    CLIENT_MAX_POOL_CONNECTIONS,
+    ECR_CHECK_ACTIONS,
+    INLINE_POLICY_MAX_CHARS,
+    MANAGED_POLICIES_PER_ROLE,
+    MANAGED_POLICY_MAX_CHARS,
+    PolicyDocumentCache,
     _actions_match,
     build_ecr_policy,
     check_role_ecr_access,
+    clear_policy_cache,
+    compact_repo_arns,
+    get_deadline_client,
+    get_ecr_client,
+    get_iam_client,
     get_inline_ecr_policy,
+    get_policy_cache_stats,
     get_repo_arns_in_policy,
+    iter_farm_pages,
     list_ecr_repos,
     list_farms,
     list_fleets,
     list_queues,
     load_app_config,
     load_deadline_default_farm,
+    policy_size,
+    read_ecr_policy,
+    reset_clients,
     role_name_from_arn,
     save_app_config,
+    save_ecr_policy,
+    split_ecr_policy,
 )
 
 
@@ -36,46 +54,92 @@ class TestRoleNameFromArn:
         assert role_name_from_arn("") == ""
 
 
+def _paginated(mock_client: MagicMock, *pages: dict) -> MagicMock:
+    paginator = MagicMock()
+    paginator.paginate.return_value = iter(pages)
+    mock_client.get_paginator.return_value = paginator
+    return paginator
+
+
+def _role_policies(mock_iam: MagicMock, attached: tuple[str, ...] = (), inline: tuple[str, ...] = ()) -> None:
+    """Serve a role's attached policy ARNs and inline policy names through paginators."""
+    pages = {
+        "list_attached_role_policies": {
+            "AttachedPolicies": [{"PolicyName": a.rsplit("/", 1)[-1], "PolicyArn": a} for a in attached]
+        },
+        "list_role_policies": {"PolicyNames": list(inline)},
+    }
+
+    def paginator(name: str) -> MagicMock:
+        pager = MagicMock()
+        pager.paginate.side_effect = lambda **kwargs: iter([pages[name]])
+        return pager
+
+    mock_iam.get_paginator.side_effect = paginator
+
+
 class TestListFarms:
     def test_returns_farms(self) -> None:
         mock_client = MagicMock()
-        mock_client.list_farms.return_value = {
-            "farms": [
-                {"farmId": "farm-abc", "displayName": "TestFarm"},
-                {"farmId": "farm-def", "displayName": "ProdFarm"},
-            ]
-        }
+        _paginated(
+            mock_client,
+            {
+                "farms": [
+                    {"farmId": "farm-abc", "displayName": "TestFarm"},
+                    {"farmId": "farm-def", "displayName": "ProdFarm"},
+                ]
+            },
+        )
         result = list_farms(mock_client)
         assert len(result) == 2
         assert result[0]["farmId"] == "farm-abc"
         assert result[1]["displayName"] == "ProdFarm"
+        mock_client.get_paginator.assert_called_once_with("list_farms")
 
     def test_empty_farms(self) -> None:
         mock_client = MagicMock()
-        mock_client.list_farms.return_value = {"farms": []}
+        _paginated(mock_client, {"farms": []})
         assert list_farms(mock_client) == []
 
+    def test_all_pages_are_returned(self) -> None:
+        mock_client = MagicMock()
+        _paginated(
+            mock_client,
+            {"farms": [{"farmId": "farm-1", "displayName": "One"}]},
+            {"farms": [{"farmId": "farm-2", "displayName": "Two"}]},
+        )
+        assert [f["farmId"] for f in list_farms(mock_client)] == ["farm-1", "farm-2"]
+
+    def test_pages_stream_lazily(self) -> None:
+        mock_client = MagicMock()
+        _paginated(
+            mock_client,
+            {"farms": [{"farmId": "farm-1", "displayName": "One"}]},
+            {"farms": [{"farmId": "farm-2", "displayName": "Two"}]},
+        )
+        pages = iter_farm_pages(mock_client)
+        assert next(pages) == [{"farmId": "farm-1", "displayName": "One"}]
+        assert next(pages) == [{"farmId": "farm-2", "displayName": "Two"}]
+
 
 class TestListQueues:
     def test_returns_queues(self) -> None:
         mock_client = MagicMock()
-        mock_client.list_queues.return_value = {
-            "queues": [{"queueId": "queue-123", "displayName": "MyQueue"}]
-        }
+        paginator = _paginated(mock_client, {"queues": [{"queueId": "queue-123", "displayName": "MyQueue"}]})
         result = list_queues(mock_client, "farm-abc")
         assert len(result) == 1
-        mock_client.list_queues.assert_called_once_with(farmId="farm-abc")
+        mock_client.get_paginator.assert_called_once_with("list_queues")
+        paginator.paginate.assert_called_once_with(farmId="farm-abc")
 
 
 class TestListFleets:
     def test_returns_fleets(self) -> None:
         mock_client = MagicMock()
-        mock_client.list_fleets.return_value = {
-            "fleets": [{"fleetId": "fleet-456", "displayName": "GPUFleet"}]
-        }
+        paginator = _paginated(mock_client, {"fleets": [{"fleetId": "fleet-456", "displayName": "GPUFleet"}]})
         result = list_fleets(mock_client, "farm-abc")
         assert len(result) == 1
-        mock_client.list_fleets.assert_called_once_with(farmId="farm-abc")
+        mock_client.get_paginator.assert_called_once_with("list_fleets")
+        paginator.paginate.assert_called_once_with(farmId="farm-abc")
 
 
 class TestActionsMatch:
@@ -99,17 +163,12 @@ class TestActionsMatch:
 class TestCheckRoleEcrAccess:
     def test_managed_policy_with_ecr_name(self) -> None:
         mock_iam = MagicMock()
-        mock_iam.list_attached_role_policies.return_value = {
-            "AttachedPolicies": [
-                {"PolicyArn": "arn:aws:iam::aws:policy/AmazonEC2ContainerRegistryFullAccess"}
-            ]
-        }
+        _role_policies(mock_iam, attached=("arn:aws:iam::aws:policy/AmazonEC2ContainerRegistryFullAccess",))
         assert check_role_ecr_access(mock_iam, "MyRole") is True
 
     def test_inline_policy_with_ecr_actions(self) -> None:
         mock_iam = MagicMock()
-        mock_iam.list_attached_role_policies.return_value = {"AttachedPolicies": []}
-        mock_iam.list_role_policies.return_value = {"PolicyNames": ["ecr-access"]}
+        _role_policies(mock_iam, inline=("ecr-access",))
         mock_iam.get_role_policy.return_value = {
             "PolicyDocument": {
                 "Version": "2012-10-17",
@@ -130,14 +189,12 @@ class TestCheckRoleEcrAccess:
 
     def test_no_ecr_access(self) -> None:
         mock_iam = MagicMock()
-        mock_iam.list_attached_role_policies.return_value = {"AttachedPolicies": []}
-        mock_iam.list_role_policies.return_value = {"PolicyNames": []}
+        _role_policies(mock_iam)
         assert check_role_ecr_access(mock_iam, "MyRole") is False
 
     def test_ecr_star_wildcard_in_inline(self) -> None:
         mock_iam = MagicMock()
-        mock_iam.list_attached_role_policies.return_value = {"AttachedPolicies": []}
-        mock_iam.list_role_policies.return_value = {"PolicyNames": ["ecr-full"]}
+        _role_policies(mock_iam, inline=("ecr-full",))
         mock_iam.get_role_policy.return_value = {
             "PolicyDocument": {
                 "Version": "2012-10-17",
@@ -152,6 +209,40 @@ class TestCheckRoleEcrAccess:
         mock_iam = MagicMock()
         assert check_role_ecr_access(mock_iam, "") is False
 
+    def test_policies_are_listed_across_pages(self) -> None:
+        clear_policy_cache()
+        mock_iam = MagicMock()
+        pages = {
+            "list_attached_role_policies": [
+                {"AttachedPolicies": [{"PolicyArn": "arn:aws:iam::123:policy/Other"}]},
+                {"AttachedPolicies": [{"PolicyArn": "arn:aws:iam::aws:policy/AmazonEC2ContainerRegistryReadOnly"}]},
+            ],
+            "list_role_policies": [{"PolicyNames": []}],
+        }
+        mock_iam.get_paginator.side_effect = lambda name: MagicMock(
+            paginate=MagicMock(return_value=iter(pages[name]))
+        )
+        mock_iam.get_policy.return_value = {"Policy": {"DefaultVersionId": "v1"}}
+        mock_iam.get_policy_version.return_value = {"PolicyVersion": {"Document": {"Statement": []}}}
+        assert check_role_ecr_access(mock_iam, "MyRole") is True
+
+    def test_unreadable_policy_is_reported_after_reading_the_rest(self) -> None:
+        clear_policy_cache()
+        mock_iam = MagicMock()
+        _role_policies(
+            mock_iam,
+            attached=("arn:aws:iam::123:policy/Broken", "arn:aws:iam::aws:policy/AmazonEC2ContainerRegistryReadOnly"),
+            inline=("secret", "ecr-full"),
+        )
+        mock_iam.get_policy.side_effect = RuntimeError("AccessDenied")
+        mock_iam.get_role_policy.side_effect = lambda RoleName, PolicyName: {
+            "PolicyDocument": {"Statement": [{"Effect": "Allow", "Action": "ecr:*", "Resource": "*"}]}
+        }
+        with pytest.raises(RuntimeError, match="policy/Broken") as err:
+            check_role_ecr_access(mock_iam, "MyRole")
+        assert "secret" not in str(err.value)
+        assert mock_iam.get_role_policy.call_count == 2
+
 
 class TestBuildEcrPolicy:
     def test_empty_repos(self) -> None:
@@ -167,6 +258,104 @@ class TestBuildEcrPolicy:
         assert "arn:aws:ecr:us-west-2:123:repository/myrepo" in policy["Statement"][1]["Resource"]
 
 
+def _repo(name: str) -> str:
+    return f"arn:aws:ecr:us-west-2:123456789012:repository/{name}"
+
+
+class TestCompactRepoArns:
+    def test_prefix_wildcard_when_all_selected(self) -> None:
+        known = {_repo(n) for n in ["team-a", "team-b", "team-c-gpu", "other"]}
+        selected = {_repo(n) for n in ["team-a", "team-b", "team-c-gpu"]}
+        assert compact_repo_arns(selected, known) == [_repo("team-*")]
+
+    def test_no_widening_beyond_selection(self) -> None:
+        known = {_repo(n) for n in ["team-a", "team-b", "team-c", "ml/x", "ml/y"]}
+        selected = {_repo(n) for n in ["team-a", "team-b", "ml/x", "ml/y"]}
+        assert compact_repo_arns(selected, known) == [_repo("ml/*"), _repo("team-a"), _repo("team-b")]
+
+    def test_everything_selected(self) -> None:
+        known = {_repo(n) for n in ["a", "b"]}
+        assert compact_repo_arns(known, known) == [_repo("*")]
+
+
+class TestPolicySizeLimits:
+    def _many(self, count: int, prefix: str = "team-") -> set[str]:
+        return {_repo(f"{prefix}{i:04d}") for i in range(count)}
+
+    def test_explicit_while_it_fits(self) -> None:
+        arns = self._many(20)
+        policy = build_ecr_policy(arns, arns | {_repo("other")})
+        assert policy["Statement"][1]["Resource"] == sorted(arns)
+
+    def test_compacts_when_over_inline_limit(self) -> None:
+        arns = self._many(300)
+        policy = build_ecr_policy(arns, arns | {_repo("other")})
+        assert policy["Statement"][1]["Resource"] == [_repo("team-*")]
+        assert get_repo_arns_in_policy(policy, arns | {_repo("other")}) == arns
+
+    def test_splits_when_compaction_cannot_fit(self) -> None:
+        arns = self._many(400)
+        policy = build_ecr_policy(arns)
+        assert policy_size(policy) > INLINE_POLICY_MAX_CHARS
+        inline, managed = split_ecr_policy(policy)
+        assert policy_size(inline) <= INLINE_POLICY_MAX_CHARS
+        assert managed and all(policy_size(doc) <= MANAGED_POLICY_MAX_CHARS for doc in managed)
+        parts = [inline, *managed]
+        assert set().union(*(get_repo_arns_in_policy(doc) for doc in parts)) == arns
+
+    def test_save_writes_managed_parts_and_reads_them_back(self) -> None:
+        clear_policy_cache()
+        arns = self._many(400)
+        created: dict[str, dict] = {}
+        mock_iam = MagicMock()
+        mock_iam.get_role.return_value = {"Role": {"Arn": "arn:aws:iam::123456789012:role/Big"}}
+        mock_iam.create_policy.side_effect = lambda PolicyName, Path, PolicyDocument: created.update(
+            {f"arn:aws:iam::123456789012:policy{Path}{PolicyName}": json.loads(PolicyDocument)}
+        )
+        _paginated(mock_iam)
+        save_ecr_policy(mock_iam, "Big", arns)
+        attached = [c.kwargs["PolicyArn"] for c in mock_iam.attach_role_policy.call_args_list]
+        assert attached == sorted(created)
+        inline = json.loads(mock_iam.put_role_policy.call_args.kwargs["PolicyDocument"])
+
+        mock_iam.get_role_policy.return_value = {"PolicyDocument": inline}
+        _paginated(
+            mock_iam,
+            {"AttachedPolicies": [{"PolicyName": a.rsplit("/", 1)[1], "PolicyArn": a} for a in created]},
+        )
+        mock_iam.get_policy.return_value = {"Policy": {"DefaultVersionId": "v1"}}
+        mock_iam.get_policy_version.side_effect = lambda PolicyArn, VersionId: {
+            "PolicyVersion": {"Document": created[PolicyArn]}
+        }
+        assert read_ecr_policy(mock_iam, "Big") == build_ecr_policy(arns)
+
+    def test_save_leaves_room_for_other_inline_policies(self) -> None:
+        arns = self._many(60)
+        other = {"Statement": [{"Effect": "Allow", "Action": "s3:GetObject", "Resource": "arn:aws:s3:::" + "b" * 9000}]}
+        mock_iam = MagicMock()
+        mock_iam.get_role.return_value = {"Role": {"Arn": "arn:aws:iam::123456789012:role/Big"}}
+        _role_policies(mock_iam, inline=("s3-access", "DeadlineECRAccess"))
+        mock_iam.get_role_policy.return_value = {"PolicyDocument": other}
+        assert policy_size(build_ecr_policy(arns)) <= INLINE_POLICY_MAX_CHARS
+        save_ecr_policy(mock_iam, "Big", arns)
+        inline = json.loads(mock_iam.put_role_policy.call_args.kwargs["PolicyDocument"])
+        assert policy_size(inline) + policy_size(other) <= INLINE_POLICY_MAX_CHARS
+        assert mock_iam.attach_role_policy.called
+
+    def test_save_refuses_to_exceed_the_attachment_quota(self) -> None:
+        mock_iam = MagicMock()
+        others = tuple(f"arn:aws:iam::123456789012:policy/Team{n}" for n in range(MANAGED_POLICIES_PER_ROLE - 1))
+        _role_policies(mock_iam, attached=others)
+        with pytest.raises(ValueError, match="managed policies"):
+            save_ecr_policy(mock_iam, "Big", self._many(400))
+        mock_iam.create_policy.assert_not_called()
+        mock_iam.put_role_policy.assert_not_called()
+
+    def test_split_rejects_a_full_inline_quota(self) -> None:
+        with pytest.raises(ValueError, match="inline policy characters"):
+            split_ecr_policy(build_ecr_policy(self._many(5)), 100)
+
+
 class TestGetRepoArnsInPolicy:
     def test_extracts_arns(self) -> None:
         policy = {
@@ -200,3 +389,69 @@ class TestPersistence:
         with open(config_path) as f:
             data = json.load(f)
         assert data["last_farm_id"] == "farm-test"
+
+
+class TestPolicyDocumentCache:
+    def _iam_with_policy(self, arn: str, version: str = "v1") -> MagicMock:
+        mock_iam = MagicMock()
+        _role_policies(mock_iam, attached=(arn,))
+        mock_iam.get_policy.return_value = {"Policy": {"DefaultVersionId": version}}
+        mock_iam.get_policy_version.return_value = {
+            "PolicyVersion": {
+                "Document": {
+                    "Statement": [{"Effect": "Allow", "Action": ECR_CHECK_ACTIONS, "Resource": "*"}]
+                }
+            }
+        }
+        return mock_iam
+
+    def test_recheck_uses_cache(self) -> None:
+        clear_policy_cache()
+        mock_iam = self._iam_with_policy("arn:aws:iam::123:policy/WorkerPull")
+        assert check_role_ecr_access(mock_iam, "RoleA") is True
+        assert check_role_ecr_access(mock_iam, "RoleB") is True
+        assert mock_iam.get_policy.call_count == 1
+        assert mock_iam.get_policy_version.call_count == 1
+        assert [c.args[0] for c in mock_iam.get_paginator.call_args_list].count("list_attached_role_policies") == 2
+        stats = get_policy_cache_stats()
+        assert stats["hits"] == 1
+        assert stats["misses"] == 1
+
+    def test_ttl_expiry_refetches(self) -> None:
+        now = [0.0]
+        cache = PolicyDocumentCache(ttl_seconds=10, clock=lambda: now[0])
+        mock_iam = self._iam_with_policy("arn:aws:iam::123:policy/P")
+        cache.get_document(mock_iam, "arn:aws:iam::123:policy/P")
+        now[0] = 5.0
+        cache.get_document(mock_iam, "arn:aws:iam::123:policy/P")
+        assert mock_iam.get_policy.call_count == 1
+        now[0] = 11.0
+        cache.get_document(mock_iam, "arn:aws:iam::123:policy/P")
+        assert mock_iam.get_policy.call_count == 2
+        assert cache.stats() == {"hits": 1, "misses": 2, "size": 1}
+
+    def test_lru_eviction(self) -> None:
+        cache = PolicyDocumentCache(max_entries=2)
+        mock_iam = self._iam_with_policy("unused")
+        for name in ("A", "B", "A", "C"):
+            cache.get_document(mock_iam, f"arn:aws:iam::123:policy/{name}")
+        # "B" was least recently used when "C" arrived
+        cache.get_document(mock_iam, "arn:aws:iam::123:policy/A")
+        assert cache.stats()["hits"] == 2
+        cache.get_document(mock_iam, "arn:aws:iam::123:policy/B")
+        assert cache.stats()["misses"] == 4
+
+
+class TestClientRegistry:
+    def test_clients_are_shared_per_service_and_region(self) -> None:
+        reset_clients()
+        with patch("app.aws_clients.boto3.session.Session") as session_cls:
+            session = session_cls.return_value
+            session.client.side_effect = lambda service, region_name=None, config=None: MagicMock(name=f"{service}-{region_name}")
+            assert get_deadline_client("us-west-2") is get_deadline_client("us-west-2")
+            assert get_ecr_client("us-west-2") is not get_ecr_client("us-east-1")
+            assert get_iam_client() is get_iam_client()
+        session_cls.assert_called_once()
+        assert session.client.call_count == 4
+        assert session.client.call_args.kwargs["config"].max_pool_connections == CLIENT_MAX_POOL_CONNECTIONS
+        reset_clients()
@@ -0,0 +1,94 @@
+"""Tests for batch_policy module — mocked IAM calls."""
+
+from __future__ import annotations
+
+import json
+from unittest.mock import MagicMock
+
+import pytest
+from botocore.exceptions import ClientError
+
+from app.aws_clients import build_ecr_policy
+from app.batch_policy import apply_batch, with_backoff
+
+REPO_A = "arn:aws:ecr:us-west-2:123:repository/a"
+REPO_B = "arn:aws:ecr:us-west-2:123:repository/b"
+
+
+def _client_error(code: str) -> ClientError:
+    return ClientError({"Error": {"Code": code, "Message": code}}, "Op")
+
+
+def _mock_iam(policies: dict[str, set[str] | None]) -> MagicMock:
+    iam = MagicMock()
+
+    def get_role_policy(RoleName: str, PolicyName: str) -> dict:
+        repos = policies[RoleName]
+        if repos is None:
+            raise _client_error("NoSuchEntity")
+        return {"PolicyDocument": build_ecr_policy(repos)}
+
+    iam.get_role_policy.side_effect = get_role_policy
+    return iam
+
+
+def _by_role(results: list[dict]) -> dict[str, dict]:
+    return {r["roleName"]: r for r in results}
+
+
+class TestApplyBatch:
+    def test_only_changed_roles_are_written(self) -> None:
+        iam = _mock_iam({"HasA": {REPO_A}, "HasB": {REPO_B}, "NoPolicy": None})
+        results = _by_role(list(apply_batch(iam, ["HasA", "HasB", "NoPolicy"], add=[REPO_A], sleep=lambda s: None)))
+        assert results["HasA"]["status"] == "unchanged"
+        assert results["HasB"]["status"] == "updated"
+        assert results["NoPolicy"]["status"] == "updated"
+        written = {c.kwargs["RoleName"]: json.loads(c.kwargs["PolicyDocument"]) for c in iam.put_role_policy.call_args_list}
+        assert written == {"HasB": build_ecr_policy({REPO_A, REPO_B}), "NoPolicy": build_ecr_policy({REPO_A})}
+
+    def test_remove_and_duplicate_roles(self) -> None:
+        iam = _mock_iam({"R": {REPO_A, REPO_B}, "Empty": None})
+        results = list(apply_batch(iam, ["R", "R", "Empty", ""], remove=[REPO_A], sleep=lambda s: None))
+        by_role = _by_role(results)
+        assert len(results) == 2
+        assert by_role["R"]["removed"] == [REPO_A]
+        assert by_role["Empty"]["status"] == "unchanged"
+        iam.put_role_policy.assert_called_once()
+
+    def test_dry_run_does_not_write(self) -> None:
+        iam = _mock_iam({"R": set()})
+        results = list(apply_batch(iam, ["R"], add=[REPO_A], dry_run=True))
+        assert results[0]["status"] == "pending"
+        assert results[0]["added"] == [REPO_A]
+        iam.put_role_policy.assert_not_called()
+
+    def test_throttled_writes_are_retried(self) -> None:
+        iam = _mock_iam({"R": None})
+        iam.put_role_policy.side_effect = [_client_error("Throttling"), _client_error("Throttling"), {}]
+        sleeps: list[float] = []
+        results = list(apply_batch(iam, ["R"], add=[REPO_A], sleep=sleeps.append))
+        assert results[0]["status"] == "updated"
+        assert results[0]["attempts"] == 3
+        assert len(sleeps) == 2
+
+    def test_unreadable_role_is_not_overwritten(self) -> None:
+        iam = MagicMock()
+        iam.get_role_policy.side_effect = _client_error("AccessDenied")
+        results = list(apply_batch(iam, ["R"], add=[REPO_A], sleep=lambda s: None))
+        assert results[0]["status"] == "failed"
+        assert "AccessDenied" in results[0]["error"]
+        iam.put_role_policy.assert_not_called()
+
+
+class TestWithBackoff:
+    def test_gives_up_after_max_attempts(self) -> None:
+        call = MagicMock(side_effect=_client_error("Throttling"))
+        with pytest.raises(ClientError):
+            with_backoff(call, max_attempts=3, sleep=lambda s: None)
+        assert call.call_count == 3
+
+    def test_other_errors_are_not_retried(self) -> None:
+        call = MagicMock(side_effect=_client_error("MalformedPolicyDocument"))
+        with pytest.raises(ClientError):
+            with_backoff(call, sleep=lambda s: None)
+        assert call.call_count == 1
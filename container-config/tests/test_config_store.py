@@ -0,0 +1,52 @@
+"""Tests for config_store module."""
+
+from __future__ import annotations
+
+import json
+import time
+from pathlib import Path
+
+from app.config_store import ConfigStore
+
+
+class TestConfigStore:
+    def test_load_missing_file(self, tmp_path: Path) -> None:
+        store = ConfigStore.load(str(tmp_path / "container-config.json"))
+        assert store.data() == {}
+        assert store.get("last_farm_id") == ""
+
+    def test_flush_writes_atomically(self, tmp_path: Path) -> None:
+        path = tmp_path / "container-config.json"
+        store = ConfigStore.load(str(path), debounce=60)
+        store.update({"last_farm_id": "farm-abc"})
+        assert not path.exists()
+        store.flush()
+        assert json.loads(path.read_text()) == {"last_farm_id": "farm-abc"}
+        assert [p.name for p in tmp_path.iterdir()] == ["container-config.json"]
+
+    def test_burst_of_updates_is_one_write(self, tmp_path: Path) -> None:
+        path = tmp_path / "container-config.json"
+        store = ConfigStore.load(str(path), debounce=0.05, min_interval=0.2)
+        for i in range(50):
+            store.update({"last_queue_id": f"queue-{i}"})
+        time.sleep(0.3)
+        assert store.writes == 1
+        assert json.loads(path.read_text())["last_queue_id"] == "queue-49"
+
+    def test_writes_are_rate_limited(self, tmp_path: Path) -> None:
+        store = ConfigStore.load(str(tmp_path / "container-config.json"), debounce=0.01, min_interval=0.5)
+        store.update({"last_farm_id": "farm-1"})
+        time.sleep(0.1)
+        store.update({"last_farm_id": "farm-2"})
+        time.sleep(0.1)
+        assert store.writes == 1  # second write held back by min_interval
+        time.sleep(0.5)
+        assert store.writes == 2
+
+    def test_unchanged_values_do_not_write(self, tmp_path: Path) -> None:
+        path = tmp_path / "container-config.json"
+        path.write_text(json.dumps({"last_farm_id": "farm-abc"}))
+        store = ConfigStore.load(str(path), debounce=0.01)
+        store.update({"last_farm_id": "farm-abc"})
+        store.flush()
+        assert store.writes == 0
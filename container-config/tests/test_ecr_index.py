@@ -0,0 +1,74 @@
+"""Tests for ecr_index module — mocked boto3 calls."""
+
+from __future__ import annotations
+
+from datetime import datetime, timezone
+from unittest.mock import MagicMock
+
+from app.ecr_index import ECR_INDEX_TTL_SECONDS, IMAGE_METADATA_TTL_SECONDS, EcrIndex
+
+
+def _repo(name: str) -> dict[str, str]:
+    return {"repositoryName": name, "repositoryArn": f"arn:aws:ecr:us-west-2:123:repository/{name}"}
+
+
+def _mock_ecr(repo_names: list[str]) -> MagicMock:
+    images = {
+        "imageDetails": [
+            {"imageTags": ["v1"], "imagePushedAt": datetime(2024, 1, 1, tzinfo=timezone.utc), "imageSizeInBytes": 100},
+            {"imageTags": ["v2", "latest"], "imagePushedAt": datetime(2024, 2, 1, tzinfo=timezone.utc), "imageSizeInBytes": 300},
+        ]
+    }
+    ecr = MagicMock()
+    ecr.describe_images_calls = []
+
+    def paginator(name: str) -> MagicMock:
+        pager = MagicMock()
+        if name == "describe_repositories":
+            pager.paginate.side_effect = lambda: [{"repositories": [_repo(n) for n in repo_names]}]
+        else:
+            def describe(repositoryName: str) -> list[dict]:
+                ecr.describe_images_calls.append(repositoryName)
+                return [images]
+            pager.paginate.side_effect = describe
+        return pager
+
+    ecr.get_paginator.side_effect = paginator
+    return ecr
+
+
+class TestEcrIndex:
+    def test_refresh_enriches_with_image_metadata(self) -> None:
+        index = EcrIndex(_mock_ecr(["b-repo", "a-repo"]))
+        repos = index.refresh()
+        assert [r["repositoryName"] for r in repos] == ["a-repo", "b-repo"]
+        assert repos[0]["imageCount"] == 2
+        assert repos[0]["totalSizeBytes"] == 400
+        assert repos[0]["latestTags"] == ["v2", "latest"]
+        assert repos[0]["latestSizeBytes"] == 300
+
+    def test_fresh_index_is_served_from_cache(self) -> None:
+        now = [0.0]
+        ecr = _mock_ecr(["a-repo"])
+        index = EcrIndex(ecr, clock=lambda: now[0])
+        index.refresh()
+        now[0] = ECR_INDEX_TTL_SECONDS / 2
+        index.refresh()
+        assert ecr.get_paginator.call_count == 2  # one list + one describe_images
+
+    def test_incremental_refresh_only_describes_new_repos(self) -> None:
+        now = [0.0]
+        names = ["a-repo"]
+        ecr = _mock_ecr(names)
+        index = EcrIndex(ecr, clock=lambda: now[0])
+        index.refresh()
+        names.append("b-repo")
+        now[0] = ECR_INDEX_TTL_SECONDS + 1
+        repos = index.refresh()
+        assert len(repos) == 2
+        assert ecr.describe_images_calls == ["a-repo", "b-repo"]
+
+        now[0] = IMAGE_METADATA_TTL_SECONDS + 1
+        names.remove("a-repo")
+        repos = index.refresh(force=True)
+        assert [r["repositoryName"] for r in repos] == ["b-repo"]
@@ -0,0 +1,60 @@
+"""Tests for farm_audit module — mocked boto3 calls."""
+
+from __future__ import annotations
+
+from unittest.mock import MagicMock, patch
+
+from app.farm_audit import scan_farm
+
+
+def _mock_deadline() -> MagicMock:
+    pages = {
+        "list_queues": {
+            "queues": [
+                {"queueId": "queue-1", "displayName": "Q1"},
+                {"queueId": "queue-2", "displayName": "Q2"},
+            ]
+        },
+        "list_fleets": {
+            "fleets": [
+                {"fleetId": "fleet-1", "displayName": "F1"},
+                {"fleetId": "fleet-2", "displayName": "F2"},
+            ]
+        },
+    }
+    dc = MagicMock()
+    dc.get_paginator.side_effect = lambda name: MagicMock(paginate=MagicMock(return_value=[pages[name]]))
+    dc.get_queue.return_value = {"roleArn": "arn:aws:iam::123:role/SharedQueueRole"}
+    dc.get_fleet.side_effect = lambda farmId, fleetId: {
+        "roleArn": "arn:aws:iam::123:role/FleetRole",
+        "displayName": fleetId,
+        "hostConfiguration": {"scriptBody": "dnf install -y docker" if fleetId == "fleet-1" else ""},
+    }
+    return dc
+
+
+class TestScanFarm:
+    def test_yields_every_queue_and_fleet(self) -> None:
+        with patch("app.farm_audit.check_role_ecr_access", return_value=True):
+            results = list(scan_farm(_mock_deadline(), MagicMock(), "farm-abc"))
+        assert len(results) == 4
+        assert {r["id"] for r in results} == {"queue-1", "queue-2", "fleet-1", "fleet-2"}
+        fleets = {r["id"]: r for r in results if r["kind"] == "fleet"}
+        assert fleets["fleet-1"]["hasDocker"] is True
+        assert fleets["fleet-2"]["hasDocker"] is False
+        queues = [r for r in results if r["kind"] == "queue"]
+        assert all(q["hasDocker"] is None and q["hasEcr"] for q in queues)
+
+    def test_shared_roles_evaluated_once(self) -> None:
+        with patch("app.farm_audit.check_role_ecr_access", return_value=False) as check:
+            list(scan_farm(_mock_deadline(), MagicMock(), "farm-abc", max_workers=4))
+        checked = sorted(call.args[1] for call in check.call_args_list)
+        assert checked == ["FleetRole", "SharedQueueRole"]
+
+    def test_errors_are_reported_per_resource(self) -> None:
+        dc = _mock_deadline()
+        dc.get_queue.side_effect = RuntimeError("AccessDenied")
+        with patch("app.farm_audit.check_role_ecr_access", return_value=True):
+            results = list(scan_farm(dc, MagicMock(), "farm-abc"))
+        queue_errors = [r["error"] for r in results if r["kind"] == "queue"]
+        assert queue_errors == ["AccessDenied", "AccessDenied"]
@@ -0,0 +1,112 @@
+"""Tests for fleet_rollout module — mocked Deadline calls."""
+
+from __future__ import annotations
+
+from unittest.mock import MagicMock
+
+from botocore.exceptions import ClientError
+
+from app.fleet_rollout import rollout_host_config, script_sha256
+
+NEW = "#!/bin/bash\nset -e\necho new\n"
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+    def sleep(self, seconds: float) -> None:
+        self.now += seconds
+
+
+def _mock_dc(scripts: dict[str, str], settle_polls: int = 1, stored: str | None = None) -> MagicMock:
+    """A Deadline client whose fleets report UPDATE_IN_PROGRESS for ``settle_polls`` polls after a write."""
+    dc = MagicMock()
+    polls: dict[str, int] = {}
+
+    def get_fleet(farmId: str, fleetId: str) -> dict:
+        in_progress = polls.get(fleetId, 0) > 0
+        if in_progress:
+            polls[fleetId] -= 1
+        return {
+            "displayName": fleetId,
+            "status": "UPDATE_IN_PROGRESS" if in_progress else "ACTIVE",
+            "hostConfiguration": {"scriptBody": scripts[fleetId]},
+        }
+
+    def update_fleet(farmId: str, fleetId: str, hostConfiguration: dict) -> dict:
+        scripts[fleetId] = stored if stored is not None else hostConfiguration["scriptBody"]
+        polls[fleetId] = settle_polls
+        return {}
+
+    dc.get_fleet.side_effect = get_fleet
+    dc.update_fleet.side_effect = update_fleet
+    return dc
+
+
+def _final(events: list[dict]) -> dict[str, dict]:
+    return {e["fleetId"]: e for e in events if e["status"] != "updating"}
+
+
+class TestRolloutHostConfig:
+    def test_updates_and_verifies_changed_fleets(self) -> None:
+        clock = FakeClock()
+        dc = _mock_dc({"fleet-a": "#!/bin/bash\necho old\n", "fleet-b": NEW}, settle_polls=2)
+        fleets = [{"fleetId": "fleet-a", "displayName": "A"}, {"fleetId": "fleet-b", "displayName": "B"}]
+        events = list(rollout_host_config(dc, "farm-1", fleets, lambda current: NEW, sleep=clock.sleep, clock=clock))
+        final = _final(events)
+        assert final["fleet-a"]["status"] == "updated"
+        assert final["fleet-a"]["sha256"] == script_sha256(NEW)
+        assert final["fleet-b"]["status"] == "unchanged"
+        assert [e["status"] for e in events if e["fleetId"] == "fleet-a"] == ["updating", "updated"]
+        dc.update_fleet.assert_called_once()
+        assert dc.update_fleet.call_args.kwargs["hostConfiguration"]["scriptTimeoutSeconds"] == 600
+
+    def test_render_receives_current_script(self) -> None:
+        dc = _mock_dc({"fleet-a": "old"})
+        seen: list[str] = []
+        list(rollout_host_config(dc, "farm-1", [{"fleetId": "fleet-a"}], lambda c: seen.append(c) or NEW, dry_run=True))
+        assert seen == ["old"]
+        dc.update_fleet.assert_not_called()
+
+    def test_hash_mismatch_fails_after_timeout(self) -> None:
+        clock = FakeClock()
+        dc = _mock_dc({"fleet-a": "old"}, stored="something else")
+        events = list(
+            rollout_host_config(
+                dc, "farm-1", [{"fleetId": "fleet-a"}], lambda c: NEW, settle_timeout=30, sleep=clock.sleep, clock=clock
+            )
+        )
+        final = _final(events)["fleet-a"]
+        assert final["status"] == "failed"
+        assert "does not match" in final["error"]
+
+    def test_failed_update_reports_status_message(self) -> None:
+        dc = _mock_dc({"fleet-a": "old"})
+        dc.get_fleet.side_effect = [
+            {"status": "ACTIVE", "hostConfiguration": {"scriptBody": "old"}},
+            {"status": "UPDATE_FAILED", "statusMessage": "bad script", "hostConfiguration": {}},
+        ]
+        final = _final(list(rollout_host_config(dc, "farm-1", [{"fleetId": "fleet-a"}], lambda c: NEW)))
+        assert final["fleet-a"]["status"] == "failed"
+        assert final["fleet-a"]["error"] == "bad script"
+
+    def test_throttled_update_is_retried(self) -> None:
+        dc = _mock_dc({"fleet-a": "old"})
+        update = dc.update_fleet.side_effect
+        throttled = ClientError({"Error": {"Code": "ThrottlingException", "Message": "slow down"}}, "UpdateFleet")
+        calls: list[dict] = []
+
+        def update_fleet(**kwargs: dict) -> dict:
+            calls.append(kwargs)
+            if len(calls) == 1:
+                raise throttled
+            return update(**kwargs)
+
+        dc.update_fleet.side_effect = update_fleet
+        final = _final(list(rollout_host_config(dc, "farm-1", [{"fleetId": "fleet-a"}], lambda c: NEW, sleep=lambda s: None)))
+        assert final["fleet-a"]["status"] == "updated"
+        assert len(calls) == 2
@@ -4,7 +4,27 @@ from __future__ import annotations
 
 import pytest
 
-from app.host_config_builder import SWAP_SIZES, build_host_config, parse_host_config
+from app import host_config_builder
+from app.host_config_builder import (
+    PREPULL_MAX_TIMEOUT_SECONDS,
+    SWAP_SIZES,
+    TIMING_LOG_PREFIX,
+    Fragment,
+    build_host_config,
+    fragments,
+    docker_tuning_fragment,
+    has_fragment,
+    image_prepull_fragment,
+    nvme_fragment,
+    parse_fragments,
+    parse_host_config,
+    parse_script,
+    register,
+    render_host_config,
+    render_script,
+    resolve,
+    update_host_config,
+)
 
 
 class TestBuildHostConfig:
@@ -110,3 +130,189 @@ swapon /swapfile
         assert result["nvidia"] is True
         assert result["swap"] is True
         assert result["swap_size_gb"] == 32
+
+
+class TestFragmentRegistry:
+    def test_registry_covers_host_optimizations(self) -> None:
+        names = {f.name for f in fragments()}
+        assert {"docker", "sudo", "nvidia", "swap", "ecr-login", "image-prepull", "nvme", "fsx"} <= names
+        assert all(f.version >= 1 for f in fragments())
+
+    def test_requirements_are_pulled_in_and_ordered(self) -> None:
+        order = [f.name for f in resolve(["image-prepull", "nvidia"])]
+        assert set(order) == {"docker", "nvidia", "ecr-login", "image-prepull"}
+        assert order.index("docker") < order.index("nvidia")
+        assert order.index("ecr-login") < order.index("image-prepull")
+
+    def test_unknown_fragment(self) -> None:
+        with pytest.raises(ValueError):
+            resolve(["no-such-fragment"])
+
+    def test_circular_requirement(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        monkeypatch.setattr(host_config_builder, "_REGISTRY", dict(host_config_builder._REGISTRY))
+        register(Fragment("loop-a", 1, "A", render=lambda p: "", requires=("loop-b",)))
+        register(Fragment("loop-b", 1, "B", render=lambda p: "", requires=("loop-a",)))
+        with pytest.raises(ValueError):
+            resolve(["loop-a"])
+
+    def test_params_use_defaults_and_are_quoted(self) -> None:
+        script = render_host_config({"nvme": {}, "image-prepull": {"images": "repo/app:1 repo/$(evil)"}})
+        assert "mount --bind /mnt/nvme/scratch /scratch" in script
+        assert "'repo/$(evil)'" in script
+
+    def test_parse_fragments_roundtrip(self) -> None:
+        selections = {
+            "swap": {"size_gb": 64},
+            "fsx": {"dns_name": "fs-1.fsx.us-west-2.amazonaws.com", "mount_name": "abcd", "mount_point": "/mnt/fsx"},
+        }
+        found = parse_fragments(render_host_config(selections))
+        assert found["swap"]["size_gb"] == 64
+        assert found["fsx"] == selections["fsx"]
+
+
+class TestFragmentMarkers:
+    def test_markers_carry_name_version_and_params(self) -> None:
+        script = render_host_config({"swap": {"size_gb": 96}})
+        assert '# >>> fragment:swap v1 {"size_gb":96}' in script
+        assert "# <<< fragment:swap" in script
+        fragment_sections = [s for s in parse_script(script) if s.is_fragment]
+        assert [(s.name, s.version, s.params) for s in fragment_sections] == [
+            ("timing", 1, {}),
+            ("swap", 1, {"size_gb": 96}),
+        ]
+
+    def test_parse_and_render_roundtrip(self) -> None:
+        script = render_host_config({"nvidia": {}, "sudo": {}}) + "\n# my own tweak\necho hi\n"
+        assert render_script(parse_script(script)) == script
+
+    def test_update_preserves_user_sections(self) -> None:
+        selections = {"docker": {}, "swap": {"size_gb": 32}}
+        script = render_host_config(selections).replace(
+            "# <<< fragment:docker\n", "# <<< fragment:docker\nsystemctl restart my-agent\n"
+        )
+        assert update_host_config(script, selections) == script
+        updated = update_host_config(script, {"docker": {}, "swap": {"size_gb": 128}, "sudo": {}})
+        assert "systemctl restart my-agent" in updated
+        assert "fallocate -l 128G" in updated and "fallocate -l 32G" not in updated
+        assert set(parse_fragments(updated)) == {"docker", "swap", "sudo"}
+
+    def test_update_keeps_a_script_without_markers(self) -> None:
+        script = "#!/bin/bash\nset -e\nmount /dev/sdf /data\n"
+        assert update_host_config(script, {}) == script
+        updated = update_host_config(script, {"sudo": {}})
+        assert updated.startswith(script)
+        assert set(parse_fragments(updated)) == {"sudo"}
+
+    def test_markers_win_over_substrings(self) -> None:
+        script = render_host_config({"sudo": {}}) + "# we used to install docker here\necho 'no docker'\n"
+        assert has_fragment(script, "sudo")
+        assert not has_fragment(script, "docker")
+
+    def test_legacy_detection_ignores_comments(self) -> None:
+        script = "#!/bin/bash\n# TODO: dnf install -y docker\necho hello\n"
+        assert parse_fragments(script) == {}
+        assert has_fragment("#!/bin/bash\ndnf install -y docker\n", "docker")
+
+    def test_legacy_docker_needs_an_install_command(self) -> None:
+        script = "#!/bin/bash\ndnf install -y nvidia-container-toolkit\nnvidia-ctk runtime configure --runtime=docker\n"
+        assert not has_fragment(script, "docker")
+        assert has_fragment("#!/bin/bash\n  yum install -y docker git\n", "docker")
+
+    def test_unclosed_marker_is_plain_text(self) -> None:
+        script = "#!/bin/bash\n# >>> fragment:docker v1 {}\ndnf install -y podman\n"
+        sections = parse_script(script)
+        assert not any(s.is_fragment for s in sections)
+        assert render_script(sections) == script
+
+
+class TestImagePrepull:
+    IMAGE = "123456789012.dkr.ecr.us-west-2.amazonaws.com/comfyui@sha256:abc123"
+
+    def test_dedupes_and_skips_present_images(self) -> None:
+        script = image_prepull_fragment(f"{self.IMAGE}, {self.IMAGE}\nrepo/other:1")
+        assert f"for image in {self.IMAGE} repo/other:1; do" in script
+        assert 'docker image inspect "$1"' in script
+
+    def test_timeout_is_bounded(self) -> None:
+        assert "timeout 240 docker pull" in image_prepull_fragment(self.IMAGE, timeout_s=240)
+        assert f"timeout {PREPULL_MAX_TIMEOUT_SECONDS} docker pull" in image_prepull_fragment(self.IMAGE, timeout_s=3600)
+        assert PREPULL_MAX_TIMEOUT_SECONDS < 600
+
+    def test_background_and_wait_modes(self) -> None:
+        assert "prepull_all >>/var/log/deadline-prepull.log 2>&1 </dev/null &" in image_prepull_fragment(self.IMAGE)
+        waited = image_prepull_fragment(self.IMAGE, mode="wait")
+        assert waited.rstrip().endswith("prepull_all")
+
+    def test_requires_ecr_login(self) -> None:
+        found = parse_fragments(render_host_config({"image-prepull": {"images": self.IMAGE, "timeout_s": 120}}))
+        assert {"docker", "ecr-login", "image-prepull"} <= set(found)
+        assert found["image-prepull"]["timeout_s"] == 120
+
+
+class TestNvme:
+    def test_raid_format_and_bind_mounts(self) -> None:
+        script = nvme_fragment("/scratch")
+        assert "mdadm --create /dev/md0 --run --level=0" in script
+        assert 'mkfs.xfs -f -K "$nvme_vol"' in script
+        for target in ("/var/lib/docker", "/var/lib/containerd", "/scratch"):
+            assert target in script
+        assert "swapfile" not in script
+
+    def test_swap_on_nvme(self) -> None:
+        assert "fallocate -l 64G /mnt/nvme/swapfile" in nvme_fragment(swap_gb=64)
+
+    def test_runs_before_docker_is_installed(self) -> None:
+        order = [f.name for f in resolve(["docker", "nvme"])]
+        assert order == ["nvme", "docker"]
+
+    def test_params_from_older_versions_are_dropped(self) -> None:
+        script = "#!/bin/bash\n# >>> fragment:nvme v1 {\"mount_point\":\"/data\"}\n...\n# <<< fragment:nvme\n"
+        found = parse_fragments(script)
+        updated = update_host_config(script, found)
+        assert '# >>> fragment:nvme v2 {"scratch_dir":"/scratch","swap_gb":0}' in updated
+
+    def test_invalid_params_fall_back_to_defaults(self) -> None:
+        script = (
+            "#!/bin/bash\n"
+            '# >>> fragment:swap v1 {"size_gb":"abc"}\n...\n# <<< fragment:swap\n'
+            '# >>> fragment:nvme v2 {"scratch_dir":"/x\\nrm -rf /","swap_gb":"64"}\n...\n# <<< fragment:nvme\n'
+        )
+        found = parse_fragments(script)
+        assert found == {"swap": {"size_gb": 32}, "nvme": {"scratch_dir": "/scratch", "swap_gb": 64}}
+        updated = update_host_config(script, {"swap": {"size_gb": 1e400}, "image-prepull": {"mode": "$(id)"}})
+        assert "fallocate -l 32G /swapfile" in updated
+        assert parse_fragments(updated)["image-prepull"]["mode"] == "background"
+
+
+class TestDockerTuning:
+    def test_daemon_settings(self) -> None:
+        script = docker_tuning_fragment(max_downloads=16)
+        assert "DOCKER_MAX_DOWNLOADS=16" in script
+        assert 'cfg["storage-driver"] = "overlay2"' in script
+        assert "dnf install -y pigz" in script
+        assert script.rstrip().endswith("systemctl restart docker")
+
+    def test_containerd_store_falls_back_on_old_docker(self) -> None:
+        script = docker_tuning_fragment(image_store="containerd")
+        assert "docker_store=containerd" in script
+        assert '[ "${docker_major:-0}" -lt 24 ]' in script
+
+    def test_runs_after_nvidia_runtime_setup(self) -> None:
+        order = [f.name for f in resolve(["docker-tuning", "nvidia"])]
+        assert order == ["docker", "nvidia", "docker-tuning"]
+
+
+class TestBootTiming:
+    def test_every_fragment_is_timed(self) -> None:
+        script = render_host_config({"docker": {}, "swap": {"size_gb": 64}})
+        assert script.index("# >>> fragment:timing") < script.index("# >>> fragment:docker")
+        assert "# >>> fragment:docker v1 {}\n_hc_begin docker\n" in script
+        assert "_hc_end swap\n# <<< fragment:swap" in script
+        assert "trap _hc_summary EXIT" in script
+        assert TIMING_LOG_PREFIX.strip() in script
+
+    def test_timing_is_not_a_selection(self) -> None:
+        script = render_host_config({"sudo": {}})
+        assert parse_fragments(script) == {"sudo": {}}
+        assert update_host_config(script, parse_fragments(script)) == script
+        assert "_hc_" not in render_host_config({})
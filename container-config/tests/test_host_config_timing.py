@@ -0,0 +1,83 @@
+"""Tests for host_config_timing module."""
+
+from __future__ import annotations
+
+from unittest.mock import MagicMock
+
+from app.host_config_timing import (
+    TOTAL,
+    fetch_fleet_timings,
+    load_timing_files,
+    parse_timing_log,
+    percentile,
+    summarize_timings,
+)
+
+
+def _line(host: str, fragments: str, total: int, exit_code: int = 0, failed: str = "") -> str:
+    return (
+        f'HOSTCONFIG_TIMING {{"v":1,"host":"{host}","exit":{exit_code},"failed":"{failed}",'
+        f'"total_ms":{total},"fragments_ms":{{{fragments}}}}}'
+    )
+
+
+class TestParseTimingLog:
+    def test_finds_summaries_among_other_output(self) -> None:
+        log = "\n".join(
+            [
+                "hostconfig: begin docker at 2026-01-01T00:00:00.000Z",
+                "2026-01-01T00:01:00Z " + _line("a", '"docker":61000', 61500),
+                "HOSTCONFIG_TIMING {not json",
+                "done",
+            ]
+        )
+        runs = parse_timing_log(log)
+        assert len(runs) == 1
+        assert runs[0]["fragments_ms"] == {"docker": 61000}
+
+    def test_load_files(self, tmp_path) -> None:
+        (tmp_path / "a.log").write_text(_line("a", '"swap":100', 200) + "\n")
+        (tmp_path / "b.log").write_text(_line("b", '"swap":300', 400) + "\n")
+        runs = load_timing_files([str(tmp_path / "a.log"), str(tmp_path / "b.log")])
+        assert [r["host"] for r in runs] == ["a", "b"]
+
+
+class TestSummarizeTimings:
+    def test_percentile_nearest_rank(self) -> None:
+        values = list(range(1, 101))
+        assert percentile(values, 50) == 50
+        assert percentile(values, 95) == 95
+        assert percentile([7], 95) == 7
+        assert percentile([], 50) == 0
+
+    def test_slowest_first_and_total_last(self) -> None:
+        runs = parse_timing_log(
+            "\n".join(
+                [
+                    _line("a", '"docker":20000,"nvidia":90000', 111000),
+                    _line("b", '"docker":30000,"nvidia":100000', 131000),
+                    _line("c", '"docker":25000,"nvidia":598000', 600000, exit_code=143, failed="nvidia"),
+                ]
+            )
+        )
+        rows = summarize_timings(runs)
+        assert [r["fragment"] for r in rows] == ["nvidia", "docker", TOTAL]
+        nvidia = rows[0]
+        assert (nvidia["runs"], nvidia["p50_ms"], nvidia["p95_ms"], nvidia["failures"]) == (3, 100000, 598000, 1)
+        assert rows[-1]["failures"] == 1
+
+
+class TestFetchFleetTimings:
+    def test_filters_worker_log_group(self) -> None:
+        logs = MagicMock()
+        logs.get_paginator.return_value.paginate.return_value = [
+            {"events": [{"message": _line("a", '"docker":1000', 1200)}]},
+            {"events": [{"message": _line("b", '"docker":2000', 2200)}]},
+        ]
+        runs = fetch_fleet_timings(logs, "farm-1", "fleet-2", start_time_ms=5)
+        assert len(runs) == 2
+        logs.get_paginator.assert_called_once_with("filter_log_events")
+        kwargs = logs.get_paginator.return_value.paginate.call_args.kwargs
+        assert kwargs["logGroupName"] == "/aws/deadline/farm-1/fleet-2"
+        assert kwargs["filterPattern"] == '"HOSTCONFIG_TIMING"'
+        assert kwargs["startTime"] == 5
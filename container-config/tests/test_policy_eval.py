@@ -0,0 +1,122 @@
+"""Tests for policy_eval module."""
+
+from __future__ import annotations
+
+from unittest.mock import MagicMock
+
+from app.aws_clients import check_role_ecr_access, clear_policy_cache
+from app.policy_eval import ActionIndex, CompiledPolicy
+
+REPO = "arn:aws:ecr:us-west-2:123:repository/render"
+
+
+def _policy(*statements: dict) -> CompiledPolicy:
+    return CompiledPolicy.from_documents([{"Version": "2012-10-17", "Statement": list(statements)}])
+
+
+class TestActionIndex:
+    def test_exact_is_case_insensitive(self) -> None:
+        index = ActionIndex()
+        index.add("ecr:BatchGetImage", 0)
+        assert index.match("ECR:batchgetimage") == {0}
+
+    def test_prefix_globs(self) -> None:
+        index = ActionIndex()
+        index.add("ecr:Get*", 0)
+        index.add("ecr:*", 1)
+        index.add("*", 2)
+        assert index.match("ecr:GetDownloadUrlForLayer") == {0, 1, 2}
+        assert index.match("ecr:BatchGetImage") == {1, 2}
+        assert index.match("s3:GetObject") == {2}
+
+    def test_inner_wildcards(self) -> None:
+        index = ActionIndex()
+        index.add("ecr:*Image", 0)
+        index.add("ecr:PutImag?", 1)
+        assert index.match("ecr:BatchGetImage") == {0}
+        assert index.match("ecr:PutImage") == {0, 1}
+
+
+class TestCompiledPolicy:
+    def test_allow_with_glob(self) -> None:
+        policy = _policy({"Effect": "Allow", "Action": "ecr:Get*", "Resource": "*"})
+        assert policy.is_allowed("ecr:GetAuthorizationToken")
+        assert not policy.is_allowed("ecr:BatchGetImage")
+
+    def test_explicit_deny_wins(self) -> None:
+        policy = _policy(
+            {"Effect": "Allow", "Action": "ecr:*", "Resource": "*"},
+            {"Effect": "Deny", "Action": "ecr:BatchGetImage", "Resource": REPO},
+        )
+        assert not policy.is_allowed("ecr:BatchGetImage", REPO)
+        assert policy.is_allowed("ecr:BatchGetImage", "arn:aws:ecr:us-west-2:123:repository/other")
+
+    def test_resource_scoping(self) -> None:
+        policy = _policy({"Effect": "Allow", "Action": "ecr:BatchGetImage", "Resource": "arn:aws:ecr:*:123:repository/team-*"})
+        assert policy.is_allowed("ecr:BatchGetImage", "arn:aws:ecr:us-west-2:123:repository/team-a")
+        assert not policy.is_allowed("ecr:BatchGetImage", REPO)
+        assert policy.is_allowed_anywhere("ecr:BatchGetImage")
+
+    def test_not_action(self) -> None:
+        policy = _policy({"Effect": "Allow", "NotAction": "iam:*", "Resource": "*"})
+        assert policy.is_allowed("ecr:BatchGetImage")
+        assert not policy.is_allowed("iam:PassRole")
+
+    def test_not_resource_deny(self) -> None:
+        policy = _policy(
+            {"Effect": "Allow", "Action": "ecr:*", "Resource": "*"},
+            {"Effect": "Deny", "Action": "ecr:*", "NotResource": REPO},
+        )
+        assert policy.is_allowed("ecr:BatchGetImage", REPO)
+        assert not policy.is_allowed("ecr:BatchGetImage", "arn:aws:ecr:us-west-2:123:repository/other")
+
+    def test_conditions_with_context(self) -> None:
+        policy = _policy(
+            {
+                "Effect": "Allow",
+                "Action": "ecr:*",
+                "Resource": "*",
+                "Condition": {"StringEquals": {"aws:RequestedRegion": "us-west-2"}},
+            }
+        )
+        assert policy.is_allowed("ecr:BatchGetImage", context={"aws:RequestedRegion": "us-west-2"})
+        assert not policy.is_allowed("ecr:BatchGetImage", context={"aws:RequestedRegion": "eu-west-1"})
+        # Unknown without context: conditional Allow does not grant access
+        assert not policy.is_allowed("ecr:BatchGetImage")
+
+    def test_unknown_condition_deny_applies(self) -> None:
+        policy = _policy(
+            {"Effect": "Allow", "Action": "ecr:*", "Resource": "*"},
+            {
+                "Effect": "Deny",
+                "Action": "*",
+                "Resource": "*",
+                "Condition": {"StringNotEquals": {"aws:RequestedRegion": "us-east-1"}},
+            },
+        )
+        assert not policy.is_allowed("ecr:BatchGetImage")
+        assert policy.is_allowed("ecr:BatchGetImage", context={"aws:RequestedRegion": "us-east-1"})
+
+    def test_deny_on_covering_pattern_blocks_anywhere(self) -> None:
+        policy = _policy(
+            {"Effect": "Allow", "Action": "ecr:BatchGetImage", "Resource": REPO},
+            {"Effect": "Deny", "Action": "ecr:*", "Resource": "arn:aws:ecr:*:123:repository/*"},
+        )
+        assert not policy.is_allowed_anywhere("ecr:BatchGetImage")
+
+
+class TestCheckRoleEcrAccessDeny:
+    def test_inline_deny_overrides_managed_allow(self) -> None:
+        clear_policy_cache()
+        mock_iam = MagicMock()
+        pages = {
+            "list_attached_role_policies": {
+                "AttachedPolicies": [{"PolicyArn": "arn:aws:iam::aws:policy/AmazonEC2ContainerRegistryReadOnly"}]
+            },
+            "list_role_policies": {"PolicyNames": ["deny-ecr"]},
+        }
+        mock_iam.get_paginator.side_effect = lambda name: MagicMock(paginate=MagicMock(return_value=[pages[name]]))
+        mock_iam.get_role_policy.return_value = {
+            "PolicyDocument": {"Statement": [{"Effect": "Deny", "Action": "ecr:*", "Resource": "*"}]}
+        }
+        assert check_role_ecr_access(mock_iam, "MyRole") is False
@@ -0,0 +1,54 @@
+"""Tests for snapshot module."""
+
+from __future__ import annotations
+
+import json
+from pathlib import Path
+
+from app.snapshot import SNAPSHOT_VERSION, TopologySnapshot
+
+
+class TestTopologySnapshot:
+    def test_missing_file_is_empty(self, tmp_path: Path) -> None:
+        snap = TopologySnapshot.load(str(tmp_path / "snapshot.json"))
+        assert snap.farms() == []
+        assert snap.queues("farm-abc") == []
+        assert snap.queue_status("queue-1") is None
+
+    def test_roundtrip(self, tmp_path: Path) -> None:
+        path = str(tmp_path / "snapshot.json")
+        snap = TopologySnapshot.load(path)
+        snap.set_farms([{"farmId": "farm-abc", "displayName": "Farm"}])
+        snap.set_queues("farm-abc", [{"queueId": "queue-1", "displayName": "Q1"}])
+        snap.set_fleets("farm-abc", [{"fleetId": "fleet-1", "displayName": "F1"}])
+        snap.set_queue_status("queue-1", "arn:aws:iam::123:role/Q", True)
+        snap.set_fleet_status("fleet-1", "arn:aws:iam::123:role/F", False, True)
+        snap.save()
+
+        loaded = TopologySnapshot.load(path)
+        assert loaded.farms() == [{"farmId": "farm-abc", "displayName": "Farm"}]
+        assert loaded.queues("farm-abc")[0]["queueId"] == "queue-1"
+        assert loaded.fleets("farm-abc")[0]["fleetId"] == "fleet-1"
+        assert loaded.queue_status("queue-1") == {"roleArn": "arn:aws:iam::123:role/Q", "hasEcr": True}
+        assert loaded.fleet_status("fleet-1")["hasDocker"] is True
+
+    def test_unchanged_snapshot_is_not_rewritten(self, tmp_path: Path) -> None:
+        path = tmp_path / "snapshot.json"
+        snap = TopologySnapshot.load(str(path))
+        snap.set_farms([{"farmId": "farm-abc", "displayName": "Farm"}])
+        snap.save()
+        mtime = path.stat().st_mtime_ns
+        snap.set_farms([{"farmId": "farm-abc", "displayName": "Farm"}])
+        assert snap.dirty is False
+        snap.save()
+        assert path.stat().st_mtime_ns == mtime
+
+    def test_other_version_is_discarded(self, tmp_path: Path) -> None:
+        path = tmp_path / "snapshot.json"
+        path.write_text(json.dumps({"version": SNAPSHOT_VERSION + 1, "farms": [{"farmId": "farm-old"}]}))
+        assert TopologySnapshot.load(str(path)).farms() == []
+
+    def test_corrupt_file_is_discarded(self, tmp_path: Path) -> None:
+        path = tmp_path / "snapshot.json"
+        path.write_text("{not json")
+        assert TopologySnapshot.load(str(path)).farms() == []
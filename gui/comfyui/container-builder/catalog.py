@@ -0,0 +1,277 @@
+"""Searchable model catalog backed by a local SQLite index."""
+
+import json
+import re
+import sqlite3
+from dataclasses import fields
+from pathlib import Path, PurePosixPath
+from typing import Any, Iterable
+
+from models import AVAILABLE_MODELS, ModelInfo
+
+BUILTIN_SOURCE = "builtin"
+ALL_CATEGORIES = "All"
+
+_COLUMNS = [f.name for f in fields(ModelInfo)]
+_REQUIRED = ("name", "url", "filename", "destination")
+# Letters and digits only, matching how the FTS5 unicode61 tokenizer splits words.
+_TOKEN_RE = re.compile(r"[^\W_]+")
+_WORD_SEPARATORS = "_-./()[],:+"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS models (
+    id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL,
+    category TEXT NOT NULL,
+    url TEXT NOT NULL UNIQUE,
+    filename TEXT NOT NULL,
+    destination TEXT NOT NULL,
+    size_gb REAL NOT NULL DEFAULT 0,
+    description TEXT NOT NULL DEFAULT '',
+    sha256 TEXT NOT NULL DEFAULT '',
+    size_bytes INTEGER NOT NULL DEFAULT 0,
+    source TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS models_category_name ON models (category, name COLLATE NOCASE);
+CREATE INDEX IF NOT EXISTS models_name ON models (name COLLATE NOCASE);
+CREATE INDEX IF NOT EXISTS models_source ON models (source);
+"""
+
+# External-content FTS table kept in sync by triggers; prefix indexes make
+# "as you type" queries ("sdx", "contr") cheap.
+_FTS_SCHEMA = """
+CREATE VIRTUAL TABLE IF NOT EXISTS models_fts USING fts5 (
+    name, description, filename, category,
+    content='models', content_rowid='id', prefix='2 3'
+);
+CREATE TRIGGER IF NOT EXISTS models_ai AFTER INSERT ON models BEGIN
+    INSERT INTO models_fts (rowid, name, description, filename, category)
+    VALUES (new.id, new.name, new.description, new.filename, new.category);
+END;
+CREATE TRIGGER IF NOT EXISTS models_ad AFTER DELETE ON models BEGIN
+    INSERT INTO models_fts (models_fts, rowid, name, description, filename, category)
+    VALUES ('delete', old.id, old.name, old.description, old.filename, old.category);
+END;
+CREATE TRIGGER IF NOT EXISTS models_au AFTER UPDATE ON models BEGIN
+    INSERT INTO models_fts (models_fts, rowid, name, description, filename, category)
+    VALUES ('delete', old.id, old.name, old.description, old.filename, old.category);
+    INSERT INTO models_fts (rowid, name, description, filename, category)
+    VALUES (new.id, new.name, new.description, new.filename, new.category);
+END;
+"""
+
+
+def _words_expr(column: str) -> str:
+    """SQL for ``column`` with separators turned into spaces and a leading space.
+
+    ``LIKE '% token%'`` on it matches a word prefix, as FTS5 does.
+    """
+    expr = column
+    for sep in _WORD_SEPARATORS:
+        expr = f"replace({expr}, '{sep}', ' ')"
+    return f"(' ' || {expr})"
+
+
+def default_catalog_path() -> Path:
+    """Catalog database next to the settings file."""
+    return Path.home() / ".config" / "comfyui-container-builder" / "catalog.db"
+
+
+def _relative_path(entry: dict[str, Any], key: str) -> str:
+    """``entry[key]`` as a path that stays inside the directory it is joined to."""
+    value = str(entry[key]).rstrip("/")
+    path = PurePosixPath(value)
+    if not value or path.is_absolute() or "\\" in value or ".." in path.parts:
+        raise ValueError(f"{key} must be a relative path without '..': {entry[key]!r}")
+    return value
+
+
+def _model_from_dict(entry: dict[str, Any]) -> ModelInfo:
+    missing = [k for k in _REQUIRED if not entry.get(k)]
+    if missing:
+        raise ValueError(f"missing {', '.join(missing)}")
+    size_bytes = int(entry.get("size_bytes") or 0)
+    size_gb = float(entry.get("size_gb") or size_bytes / 1e9)
+    return ModelInfo(
+        name=str(entry["name"]),
+        category=str(entry.get("category") or "Uncategorized"),
+        url=str(entry["url"]),
+        filename=_relative_path(entry, "filename"),
+        destination=_relative_path(entry, "destination"),
+        size_gb=size_gb,
+        description=str(entry.get("description", "")),
+        sha256=str(entry.get("sha256", "")).lower(),
+        size_bytes=size_bytes,
+    )
+
+
+def load_manifest(path: Path) -> list[ModelInfo]:
+    """Read models from a JSON manifest.
+
+    The manifest is a list of model objects, or an object with a ``models``
+    list. Keys are the ``ModelInfo`` fields; ``size_gb`` may be omitted when
+    ``size_bytes`` is given.
+
+    Raises:
+        ValueError: If the file is not valid JSON or an entry is incomplete
+    """
+    with open(path) as f:
+        data = json.load(f)
+    entries = data.get("models", []) if isinstance(data, dict) else data
+    if not isinstance(entries, list):
+        raise ValueError(f"{path}: expected a list of models")
+    models = []
+    for i, entry in enumerate(entries):
+        try:
+            models.append(_model_from_dict(entry))
+        except (TypeError, ValueError, AttributeError) as e:
+            raise ValueError(f"{path}: model {i}: {e}") from e
+    return models
+
+
+class ModelCatalog:
+    """Model index that stays fast with thousands of entries.
+
+    Every model belongs to a source: ``builtin`` for ``AVAILABLE_MODELS`` and
+    the resolved path for an imported manifest. Re-importing a manifest
+    replaces its models. Searches match word prefixes in name, description,
+    filename and category through FTS5, or a LIKE scan where the SQLite
+    build has no FTS5. Results are ordered by name and paged, so callers
+    only materialize the rows they show.
+
+    A catalog is bound to the thread that opened it.
+    """
+
+    def __init__(self, path: Path | None = None) -> None:
+        self.path = path or default_catalog_path()
+        if str(self.path) != ":memory:":
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.db = sqlite3.connect(str(self.path))
+        self.db.row_factory = sqlite3.Row
+        self.db.executescript(_SCHEMA)
+        try:
+            self.db.executescript(_FTS_SCHEMA)
+            self.has_fts = True
+        except sqlite3.OperationalError:
+            self.has_fts = False
+        self.replace_source(BUILTIN_SOURCE, AVAILABLE_MODELS)
+
+    def close(self) -> None:
+        self.db.close()
+
+    def replace_source(self, source: str, models: Iterable[ModelInfo]) -> int:
+        """Make ``models`` the full set of models from ``source``; returns how many were given.
+
+        A URL already provided by a manifest is taken over by a later import,
+        but never by the built-in list. Checksums and exact sizes already
+        known for a URL are kept when the new entry does not carry them.
+        """
+        rows = [
+            {**{c: getattr(m, c) for c in _COLUMNS}, "source": source}
+            for m in {m.url: m for m in models}.values()
+        ]
+        columns = [*_COLUMNS, "source"]
+        updates = ", ".join(
+            f"{c} = excluded.{c}" for c in columns if c not in ("url", "sha256", "size_bytes", "size_gb")
+        )
+        with self.db:
+            self.db.executemany(
+                f"INSERT INTO models ({', '.join(columns)}) VALUES ({', '.join(':' + c for c in columns)}) "
+                f"ON CONFLICT (url) DO UPDATE SET {updates}, "
+                "sha256 = CASE WHEN excluded.sha256 != '' THEN excluded.sha256 ELSE sha256 END, "
+                "size_gb = CASE WHEN excluded.size_bytes > 0 OR size_bytes = 0 THEN excluded.size_gb ELSE size_gb END, "
+                "size_bytes = CASE WHEN excluded.size_bytes > 0 THEN excluded.size_bytes ELSE size_bytes END "
+                f"WHERE excluded.source != '{BUILTIN_SOURCE}' OR source = '{BUILTIN_SOURCE}'",
+                rows,
+            )
+            self.db.execute("CREATE TEMP TABLE IF NOT EXISTS imported (url TEXT PRIMARY KEY)")
+            self.db.execute("DELETE FROM imported")
+            self.db.executemany("INSERT INTO imported (url) VALUES (:url)", rows)
+            self.db.execute(
+                "DELETE FROM models WHERE source = ? AND url NOT IN (SELECT url FROM imported)", (source,)
+            )
+        return len(rows)
+
+    def import_manifest(self, path: Path) -> int:
+        """Import (or re-import) a JSON manifest; see ``load_manifest``."""
+        path = Path(path).expanduser().resolve()
+        count = self.replace_source(str(path), load_manifest(path))
+        # Bring back built-in models this manifest no longer overrides.
+        self.replace_source(BUILTIN_SOURCE, AVAILABLE_MODELS)
+        return count
+
+    def update_metadata(self, data: dict[str, dict[str, Any]]) -> None:
+        """Store checksums and exact sizes looked up by ``model_metadata``."""
+        rows = [
+            (entry.get("sha256", ""), entry.get("size_bytes", 0), url)
+            for url, entry in data.items()
+            if entry.get("sha256") or entry.get("size_bytes")
+        ]
+        with self.db:
+            self.db.executemany(
+                "UPDATE models SET "
+                "sha256 = CASE WHEN ?1 != '' THEN ?1 ELSE sha256 END, "
+                "size_bytes = CASE WHEN ?2 > 0 THEN ?2 ELSE size_bytes END, "
+                "size_gb = CASE WHEN ?2 > 0 THEN ?2 / 1e9 ELSE size_gb END "
+                "WHERE url = ?3",
+                rows,
+            )
+
+    def categories(self) -> list[str]:
+        """``All`` followed by every category, sorted."""
+        rows = self.db.execute("SELECT DISTINCT category FROM models ORDER BY category")
+        return [ALL_CATEGORIES] + [r[0] for r in rows]
+
+    def _where(self, category: str, query: str) -> tuple[str, str, list[Any]]:
+        """FROM clause, WHERE clause and parameters for a category and search text."""
+        tokens = _TOKEN_RE.findall(query.lower())
+        source = "models"
+        clauses: list[str] = []
+        params: list[Any] = []
+        if tokens and self.has_fts:
+            source = "models JOIN models_fts ON models_fts.rowid = models.id"
+            clauses.append("models_fts MATCH ?1")
+            params.append(" ".join(f'"{t}"*' for t in tokens))
+        else:
+            for token in tokens:
+                n = len(params) + 1
+                clauses.append(
+                    "(" + " OR ".join(
+                        f"{_words_expr(c)} LIKE ?{n}" for c in ("name", "description", "filename", "category")
+                    ) + ")"
+                )
+                # Tokens are letters and digits only, so nothing needs escaping.
+                params.append(f"% {token}%")
+        if category and category != ALL_CATEGORIES:
+            clauses.append(f"models.category = ?{len(params) + 1}")
+            params.append(category)
+        return source, " AND ".join(clauses) or "1", params
+
+    def count(self, category: str = ALL_CATEGORIES, query: str = "") -> int:
+        """Number of models matching ``category`` and ``query``."""
+        source, where, params = self._where(category, query)
+        return self.db.execute(f"SELECT COUNT(*) FROM {source} WHERE {where}", params).fetchone()[0]
+
+    def search(
+        self,
+        category: str = ALL_CATEGORIES,
+        query: str = "",
+        offset: int = 0,
+        limit: int = 200
+    ) -> list[ModelInfo]:
+        """One page of models matching ``category`` and ``query``, ordered by name.
+
+        Args:
+            category: Category to filter by, or ``All``
+            query: Search text; every word must match the start of a word
+            offset: Rows to skip
+            limit: Maximum rows to return
+        """
+        source, where, params = self._where(category, query)
+        n = len(params)
+        rows = self.db.execute(
+            f"SELECT {', '.join('models.' + c for c in _COLUMNS)} FROM {source} WHERE {where} "
+            f"ORDER BY models.name COLLATE NOCASE, models.id LIMIT ?{n + 1} OFFSET ?{n + 2}",
+            [*params, limit, offset],
+        )
+        return [ModelInfo(**dict(r)) for r in rows]
@@ -1,28 +1,168 @@
 """Docker image builder for ComfyUI containers."""
 
+import math
+import os
+import shutil
 import subprocess
+from dataclasses import dataclass, field
 from pathlib import Path
+from typing import Callable
 
 from models import ModelInfo
+from prefetch import cache_path
 from settings import Settings
 
+MODELS_DIR = "/opt/comfyui/models"
+MODEL_OWNER = "comfyui:comfyui"
+
+# Named build context holding one staged directory per model layer. Models
+# are downloaded on the host by ``prefetch`` and only copied into the image.
+MODEL_CONTEXT = "models"
+
+# Target size of one model layer. Layers of similar size pull in parallel
+# without one huge layer dominating; a model larger than this gets its own.
+LAYER_TARGET_GB = 8.0
+
+# Model directories by how often they change, from rarely to often. Layers
+# are emitted in this order so adding a LoRA only rebuilds the last layers.
+STABILITY_TIERS = [
+    ("base models", {"checkpoints", "unet", "diffusion_models", "diffusers", "clip", "text_encoders", "vae"}),
+    ("auxiliary models", {"controlnet", "clip_vision", "style_models", "gligen", "upscale_models", "vae_approx"}),
+    ("adapters", {"loras", "embeddings", "hypernetworks"}),
+]
+
+
+@dataclass
+class ModelLayer:
+    """Models that are downloaded together into one image layer."""
+    tier: str
+    models: list[ModelInfo] = field(default_factory=list)
+
+    @property
+    def size_gb(self) -> float:
+        return sum(m.size_gb for m in self.models)
+
+
+def model_tier(model: ModelInfo) -> int:
+    """Index of the stability tier for a model; unknown directories change most often."""
+    for index, (_, destinations) in enumerate(STABILITY_TIERS):
+        if model.destination in destinations:
+            return index
+    return len(STABILITY_TIERS) - 1
+
+
+def plan_layers(
+    selected_models: list[ModelInfo],
+    target_gb: float = LAYER_TARGET_GB
+) -> list[ModelLayer]:
+    """Group models into balanced layers, most stable tier first.
+    
+    Each tier is split into ``ceil(total / target_gb)`` layers and filled
+    largest model first into the currently smallest layer, which keeps the
+    layers of a tier close in size.
+    
+    Args:
+        selected_models: Models to include (duplicates are dropped)
+        target_gb: Approximate size of one layer
+        
+    Returns:
+        Layers in the order they should appear in the Dockerfile
+    """
+    unique: dict[tuple[str, str], ModelInfo] = {}
+    for model in selected_models:
+        unique.setdefault((model.destination, model.filename), model)
+    
+    tiers: list[list[ModelInfo]] = [[] for _ in STABILITY_TIERS]
+    for model in unique.values():
+        tiers[model_tier(model)].append(model)
+    
+    layers: list[ModelLayer] = []
+    for (tier_name, _), models in zip(STABILITY_TIERS, tiers):
+        if not models:
+            continue
+        total = sum(m.size_gb for m in models)
+        count = min(len(models), max(1, math.ceil(total / target_gb)))
+        bins = [ModelLayer(tier_name) for _ in range(count)]
+        for model in sorted(models, key=lambda m: (-m.size_gb, m.filename)):
+            min(bins, key=lambda b: b.size_gb).models.append(model)
+        for layer in bins:
+            layer.models.sort(key=lambda m: (m.destination, m.filename))
+        layers.extend(bins)
+    return layers
+
+
+def layer_dir_name(index: int) -> str:
+    """Directory of the 1-based layer ``index`` inside the model build context."""
+    return f"layer-{index:02d}"
+
+
+def _layer_lines(layer: ModelLayer, index: int, count: int) -> list[str]:
+    """Dockerfile lines that copy one staged layer into the models directory.
+    
+    ``--chown`` sets the owner as the files are copied, so ownership costs no
+    extra layer (a later ``chown -R`` would copy every byte again), and
+    ``--link`` keeps the layer reusable when earlier layers change.
+    """
+    lines = [f"# Layer {index}/{count}: {layer.tier} ({layer.size_gb:.1f} GB)"]
+    lines.extend(f"#   {m.name} ({m.size_gb:.1f} GB)" for m in layer.models)
+    lines.append(
+        f"COPY --link --chown={MODEL_OWNER} --from={MODEL_CONTEXT} {layer_dir_name(index)}/ {MODELS_DIR}/"
+    )
+    lines.append("")
+    return lines
+
+
+def stage_layers(
+    layers: list[ModelLayer],
+    cache_dir: Path,
+    staging_dir: Path
+) -> None:
+    """Lay out cached models as the model build context.
+    
+    Each layer becomes ``<staging_dir>/layer-NN/<destination>/<filename>``.
+    Files are hard links into the cache (copies if the cache is on another
+    file system), so staging a 40 GB selection takes no extra space or time.
+    
+    Args:
+        layers: The plan the Dockerfile was generated from, models already cached
+        cache_dir: Model cache root used by ``prefetch_models``
+        staging_dir: Directory passed as the ``models`` build context
+    """
+    shutil.rmtree(staging_dir, ignore_errors=True)
+    for index, layer in enumerate(layers, start=1):
+        for model in layer.models:
+            target = staging_dir / layer_dir_name(index) / model.destination / model.filename
+            target.parent.mkdir(parents=True, exist_ok=True)
+            source = cache_path(model, cache_dir)
+            try:
+                os.link(source, target)
+            except OSError:
+                shutil.copy2(source, target)
+
 
 def generate_dockerfile(
     base_image: str,
     selected_models: list[ModelInfo],
-    output_path: Path
+    output_path: Path,
+    layers: list[ModelLayer] | None = None
 ) -> str:
     """Generate a Dockerfile with selected models.
     
+    Models are copied from the ``models`` build context (see ``stage_layers``)
+    in the layers planned by ``plan_layers``.
+    
     Args:
         base_image: Base Docker image to use
         selected_models: List of models to include
         output_path: Path to write the Dockerfile
+        layers: Layer plan to use; planned from ``selected_models`` if omitted.
+            A build passes the plan it stages, so both always agree.
         
     Returns:
         The generated Dockerfile content
     """
     lines = [
+        "# syntax=docker/dockerfile:1",
         f"# ComfyUI with custom models",
         f"# Auto-generated by ComfyUI Container Builder",
         f"FROM {base_image}",
@@ -31,17 +171,12 @@ def generate_dockerfile(
         "",
     ]
     
-    # Group models by destination for cleaner output
-    for model in selected_models:
-        lines.append(f"# {model.name} ({model.size_gb:.1f} GB)")
-        lines.append(f"RUN wget -q --show-progress -O /opt/comfyui/models/{model.destination}/{model.filename} \\")
-        lines.append(f'    "{model.url}"')
-        lines.append("")
+    if layers is None:
+        layers = plan_layers(selected_models)
+    for index, layer in enumerate(layers, start=1):
+        lines.extend(_layer_lines(layer, index, len(layers)))
     
     lines.extend([
-        "# Set proper ownership",
-        "RUN chown -R comfyui:comfyui /opt/comfyui/models",
-        "",
         "USER comfyui",
         "",
         "# Enable TAESD previews by default",
@@ -60,7 +195,8 @@ def generate_dockerfile(
 def build_image(
     dockerfile_path: Path,
     image_tag: str,
-    on_output: callable | None = None
+    on_output: Callable[[str], None] | None = None,
+    build_contexts: dict[str, Path] | None = None
 ) -> tuple[bool, str]:
     """Build a Docker image.
     
@@ -68,17 +204,24 @@ def build_image(
         dockerfile_path: Path to the Dockerfile
         image_tag: Tag for the built image
         on_output: Callback for build output lines
+        build_contexts: Named build contexts, e.g. the staged ``models`` layers
         
     Returns:
         Tuple of (success, message)
     """
+    cmd = ["docker", "build", "-f", str(dockerfile_path), "-t", image_tag]
+    for name, path in (build_contexts or {}).items():
+        cmd.extend(["--build-context", f"{name}={path}"])
+    cmd.append(str(dockerfile_path.parent))
     try:
+        # COPY --link and named build contexts need BuildKit.
         process = subprocess.Popen(
-            ["docker", "build", "-f", str(dockerfile_path), "-t", image_tag, str(dockerfile_path.parent)],
+            cmd,
             stdout=subprocess.PIPE,
             stderr=subprocess.STDOUT,
             text=True,
-            bufsize=1
+            bufsize=1,
+            env={**os.environ, "DOCKER_BUILDKIT": "1"}
         )
         
         output_lines = []
@@ -104,7 +247,7 @@ def push_to_ecr(
     image_tag: str,
     ecr_registry: str,
     ecr_region: str,
-    on_output: callable | None = None
+    on_output: Callable[[str], None] | None = None
 ) -> tuple[bool, str]:
     """Push image to ECR.
     
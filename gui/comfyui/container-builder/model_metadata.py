@@ -0,0 +1,141 @@
+"""Checksum and size metadata for models, looked up on their download servers."""
+
+import json
+import os
+import re
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any
+
+from models import ModelInfo
+
+# Re-check a URL after this long; a file behind "resolve/main" can change.
+METADATA_MAX_AGE_SECONDS = 7 * 24 * 3600
+REFRESH_WORKERS = 8
+REQUEST_TIMEOUT_SECONDS = 30
+
+_SHA256_RE = re.compile(r'^(?:W/)?"?([0-9a-f]{64})"?$')
+_REDIRECT_CODES = {301, 302, 303, 307, 308}
+
+
+class _NoRedirect(urllib.request.HTTPRedirectHandler):
+    """Surface redirects as errors so the first response's headers can be read."""
+
+    def redirect_request(self, *args: Any, **kwargs: Any) -> None:
+        return None
+
+
+def _head(url: str, follow_redirects: bool) -> dict[str, str]:
+    request = urllib.request.Request(url, method="HEAD")
+    opener = urllib.request.build_opener() if follow_redirects else urllib.request.build_opener(_NoRedirect)
+    try:
+        with opener.open(request, timeout=REQUEST_TIMEOUT_SECONDS) as response:
+            return {k.lower(): v for k, v in response.headers.items()}
+    except urllib.error.HTTPError as e:
+        if e.code in _REDIRECT_CODES:
+            return {k.lower(): v for k, v in e.headers.items()}
+        raise
+
+
+def fetch_remote_metadata(url: str) -> dict[str, Any]:
+    """Look up a file's sha256 and size without downloading it.
+
+    Hugging Face answers a HEAD on a ``resolve`` URL for an LFS file with a
+    redirect carrying ``X-Linked-Etag`` (the file's sha256) and
+    ``X-Linked-Size``. Other servers only give the size of the final
+    response, and the digest stays unknown.
+
+    Args:
+        url: Download URL of the model
+
+    Returns:
+        Dict with ``sha256`` (may be empty) and ``size_bytes`` (0 if unknown)
+    """
+    headers = _head(url, follow_redirects=False)
+    match = _SHA256_RE.match(headers.get("x-linked-etag", "").strip())
+    if match and headers.get("x-linked-size", "").isdigit():
+        return {"sha256": match.group(1), "size_bytes": int(headers["x-linked-size"])}
+    headers = _head(url, follow_redirects=True)
+    match = _SHA256_RE.match(headers.get("etag", "").strip())
+    size = headers.get("content-length", "")
+    return {"sha256": match.group(1) if match else "", "size_bytes": int(size) if size.isdigit() else 0}
+
+
+def metadata_path(cache_dir: Path) -> Path:
+    """Metadata store next to the model cache."""
+    return cache_dir / "metadata.json"
+
+
+def load_metadata(path: Path) -> dict[str, dict[str, Any]]:
+    """Stored metadata by URL; empty if missing or unreadable."""
+    try:
+        with open(path) as f:
+            data = json.load(f)
+        return data if isinstance(data, dict) else {}
+    except (OSError, ValueError):
+        return {}
+
+
+def save_metadata(path: Path, data: dict[str, dict[str, Any]]) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(path.name + ".tmp")
+    with open(tmp, "w") as f:
+        json.dump(data, f, indent=2, sort_keys=True)
+    os.replace(tmp, path)
+
+
+def apply_metadata(models: list[ModelInfo], data: dict[str, dict[str, Any]]) -> None:
+    """Fill ``sha256``/``size_bytes`` (and an exact ``size_gb``) from stored metadata."""
+    for model in models:
+        entry = data.get(model.url)
+        if not entry:
+            continue
+        if entry.get("sha256"):
+            model.sha256 = entry["sha256"]
+        if entry.get("size_bytes"):
+            model.size_bytes = entry["size_bytes"]
+            model.size_gb = entry["size_bytes"] / 1e9
+
+
+def refresh_metadata(
+    models: list[ModelInfo],
+    path: Path,
+    max_age: float = METADATA_MAX_AGE_SECONDS
+) -> dict[str, dict[str, Any]]:
+    """Fetch metadata for models whose entry is missing or stale, and store it.
+
+    Lookups run concurrently; a URL that cannot be reached keeps its old
+    entry and is retried on the next refresh.
+
+    Args:
+        models: Models to look up
+        path: Metadata store (see ``metadata_path``)
+        max_age: Seconds after which an entry is looked up again
+
+    Returns:
+        The full, updated metadata by URL
+    """
+    data = load_metadata(path)
+    now = time.time()
+    urls = sorted({
+        m.url for m in models
+        if now - data.get(m.url, {}).get("checkedAt", 0) >= max_age
+    })
+    if not urls:
+        return data
+
+    def lookup(url: str) -> dict[str, Any] | None:
+        try:
+            return fetch_remote_metadata(url)
+        except (OSError, ValueError):
+            return None
+
+    with ThreadPoolExecutor(max_workers=REFRESH_WORKERS) as pool:
+        for url, meta in zip(urls, pool.map(lookup, urls)):
+            if meta is not None:
+                data[url] = {**meta, "checkedAt": now}
+    save_metadata(path, data)
+    return data
@@ -13,6 +13,8 @@ class ModelInfo:
     destination: str  # Relative path under /opt/comfyui/models/
     size_gb: float
     description: str
+    sha256: str = ""  # Hex digest of the file; empty until known
+    size_bytes: int = 0  # Exact size; 0 until known
 
 
 # Popular models organized by category
@@ -0,0 +1,373 @@
+"""Parallel, resumable model downloads into a local content-addressed cache."""
+
+import hashlib
+import http.client
+import json
+import os
+import re
+import threading
+import time
+import urllib.request
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from pathlib import Path
+from typing import Callable
+
+from models import ModelInfo
+
+# Total HTTP connections across all files, and at most this many per file.
+MAX_CONNECTIONS = 8
+CONNECTIONS_PER_FILE = 4
+# Files smaller than two chunks are fetched over a single connection.
+MIN_CHUNK_BYTES = 64 * 1024 * 1024
+READ_BLOCK_BYTES = 1024 * 1024
+# Chunk progress is written to the state file at least this often, so a
+# dropped connection or a restart resumes close to where it stopped.
+STATE_SAVE_BYTES = 32 * 1024 * 1024
+MAX_ATTEMPTS = 5
+RETRY_DELAY_SECONDS = 2.0
+REQUEST_TIMEOUT_SECONDS = 60
+PROGRESS_INTERVAL_SECONDS = 5.0
+
+_CONTENT_RANGE_RE = re.compile(r"bytes \d+-\d+/(\d+)")
+
+
+def default_cache_dir() -> Path:
+    """Default model cache location."""
+    return Path.home() / ".cache" / "comfyui-container-builder"
+
+
+def model_cache_key(model: ModelInfo) -> str:
+    """Cache directory name for a model: the sha256 of its URL."""
+    return hashlib.sha256(model.url.encode("utf-8")).hexdigest()
+
+
+def cache_path(model: ModelInfo, cache_dir: Path) -> Path:
+    """Where a verified download of ``model`` lives in the cache."""
+    return cache_dir / "models" / model_cache_key(model) / model.filename
+
+
+INDEX_FILE = "index.json"
+
+
+class _CacheIndex:
+    """Digest, size and mtime of every verified file in the cache.
+
+    A cached file whose size and mtime still match its entry is trusted
+    without reading it again.
+    """
+
+    def __init__(self, cache_dir: Path) -> None:
+        self.path = cache_dir / INDEX_FILE
+        self.lock = threading.Lock()
+        try:
+            self.entries: dict[str, dict] = json.loads(self.path.read_text())
+        except (OSError, ValueError):
+            self.entries = {}
+
+    def lookup(self, model: ModelInfo, path: Path) -> str | None:
+        """The recorded sha256 of ``path`` if the file is unchanged since it was verified."""
+        entry = self.entries.get(model_cache_key(model))
+        try:
+            stat = path.stat()
+        except OSError:
+            return None
+        if not entry or entry.get("size") != stat.st_size or entry.get("mtimeNs") != stat.st_mtime_ns:
+            return None
+        return entry.get("sha256")
+
+    def record(self, model: ModelInfo, path: Path, sha256: str) -> None:
+        stat = path.stat()
+        with self.lock:
+            self.entries[model_cache_key(model)] = {
+                "url": model.url,
+                "sha256": sha256,
+                "size": stat.st_size,
+                "mtimeNs": stat.st_mtime_ns,
+            }
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = self.path.with_name(self.path.name + ".tmp")
+            tmp.write_text(json.dumps(self.entries, indent=2, sort_keys=True))
+            os.replace(tmp, self.path)
+
+
+def _file_sha256(path: Path) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(READ_BLOCK_BYTES), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _probe(url: str) -> tuple[str, int, bool]:
+    """Resolve redirects and return ``(final_url, size, supports_ranges)``."""
+    request = urllib.request.Request(url, headers={"Range": "bytes=0-0"})
+    with urllib.request.urlopen(request, timeout=REQUEST_TIMEOUT_SECONDS) as response:
+        final_url = response.geturl()
+        if response.status == 206:
+            match = _CONTENT_RANGE_RE.match(response.headers.get("Content-Range", ""))
+            if match:
+                return final_url, int(match.group(1)), True
+        return final_url, int(response.headers.get("Content-Length") or 0), False
+
+
+class _Download:
+    """One file being fetched as byte-range chunks into ``<file>.part``.
+
+    ``<file>.part.json`` records the size and how much of each chunk is on
+    disk; it is what makes a download resumable across builds.
+
+    The sha256 covers a growing prefix of the file. Bytes that arrive at
+    the end of the prefix (the first chunk, or a whole single-connection
+    download) are hashed from the network buffer. Later chunks normally
+    finish ahead of the prefix and are read back from disk once it reaches
+    them, so with N connections up to (N-1)/N of the file is read a second
+    time. Progress in ``chunks`` only counts flushed bytes, so whatever the
+    read-back or the state file sees is really in ``<file>.part``.
+    """
+
+    def __init__(self, model: ModelInfo, target: Path, url: str, size: int, ranges: bool) -> None:
+        self.model = model
+        self.target = target
+        self.part = target.with_name(target.name + ".part")
+        self.state_path = target.with_name(target.name + ".part.json")
+        self.url = url
+        self.size = size
+        self.ranges = ranges
+        self.lock = threading.Lock()
+        self.chunks = self._load_chunks()
+        self.hash_lock = threading.Lock()
+        self.hasher = hashlib.sha256()
+        self.hashed = 0
+
+    def _plan_chunks(self) -> list[list[int]]:
+        if not self.ranges or self.size < 2 * MIN_CHUNK_BYTES:
+            return [[0, self.size, 0]]
+        count = min(CONNECTIONS_PER_FILE, self.size // MIN_CHUNK_BYTES)
+        step = -(-self.size // count)
+        return [[start, min(start + step, self.size), 0] for start in range(0, self.size, step)]
+
+    def _load_chunks(self) -> list[list[int]]:
+        try:
+            state = json.loads(self.state_path.read_text())
+            if state["size"] == self.size and self.ranges and self.part.stat().st_size == self.size:
+                return [list(c) for c in state["chunks"]]
+        except (OSError, ValueError, KeyError, TypeError):
+            pass
+        self.target.parent.mkdir(parents=True, exist_ok=True)
+        with open(self.part, "wb") as f:
+            f.truncate(self.size)
+        chunks = self._plan_chunks()
+        self._write_state(chunks)
+        return chunks
+
+    def _write_state(self, chunks: list[list[int]]) -> None:
+        tmp = self.state_path.with_name(self.state_path.name + ".tmp")
+        tmp.write_text(json.dumps({"url": self.model.url, "size": self.size, "chunks": chunks}))
+        os.replace(tmp, self.state_path)
+
+    def save_state(self) -> None:
+        with self.lock:
+            self._write_state(self.chunks)
+
+    @property
+    def done_bytes(self) -> int:
+        return sum(c[2] for c in self.chunks)
+
+    def fetch_chunk(self, index: int) -> None:
+        """Download one chunk, resuming and retrying until it is complete.
+
+        Only consecutive failures that make no progress count towards
+        ``MAX_ATTEMPTS``; a connection that keeps dropping mid-transfer but
+        moves the chunk forward each time is retried at the base delay.
+        """
+        chunk = self.chunks[index]
+        attempts = 0
+        failed_at = chunk[2]
+        while chunk[0] + chunk[2] < chunk[1]:
+            try:
+                self._stream_chunk(chunk)
+            except (OSError, http.client.HTTPException):
+                if chunk[2] > failed_at:
+                    attempts = 0
+                failed_at = chunk[2]
+                attempts += 1
+                self.save_state()
+                if attempts >= MAX_ATTEMPTS:
+                    raise
+                time.sleep(RETRY_DELAY_SECONDS * attempts)
+        self.save_state()
+        self._catch_up_hash()
+
+    def _hash_block(self, offset: int, block: bytes) -> None:
+        with self.hash_lock:
+            if offset == self.hashed:
+                self.hasher.update(block)
+                self.hashed += len(block)
+
+    def _catch_up_hash(self) -> None:
+        """Extend the hashed prefix over chunks that completed ahead of it."""
+        with self.hash_lock:
+            for start, end, done in sorted(self.chunks):
+                if self.hashed >= end:
+                    continue
+                if start > self.hashed or start + done < end:
+                    break
+                with open(self.part, "rb") as f:
+                    f.seek(self.hashed)
+                    while self.hashed < end:
+                        block = f.read(min(READ_BLOCK_BYTES, end - self.hashed))
+                        if not block:
+                            return
+                        self.hasher.update(block)
+                        self.hashed += len(block)
+
+    def _stream_chunk(self, chunk: list[int]) -> None:
+        start, end = chunk[0], chunk[1]
+        headers = {}
+        if self.ranges:
+            headers["Range"] = f"bytes={start + chunk[2]}-{end - 1}"
+        else:
+            chunk[2] = 0  # without range support a retry starts over
+        request = urllib.request.Request(self.url, headers=headers)
+        unsaved = 0
+        with urllib.request.urlopen(request, timeout=REQUEST_TIMEOUT_SECONDS) as response, open(self.part, "r+b") as f:
+            if self.ranges and response.status != 206:
+                raise ConnectionError(f"Server ignored the byte range for {self.model.filename}")
+            f.seek(start + chunk[2])
+            while chunk[0] + chunk[2] < end:
+                block = response.read(min(READ_BLOCK_BYTES, end - start - chunk[2]))
+                if not block:
+                    raise ConnectionError(f"Connection closed at byte {start + chunk[2]} of {self.model.filename}")
+                f.write(block)
+                # Flush before publishing progress: other threads read the
+                # .part file (hash catch-up) and save chunks to the state file.
+                f.flush()
+                self._hash_block(start + chunk[2], block)
+                chunk[2] += len(block)
+                unsaved += len(block)
+                if unsaved >= STATE_SAVE_BYTES:
+                    self.save_state()
+                    unsaved = 0
+
+    def finish(self) -> str:
+        """Check size and digest of the assembled file, move it into the cache and return its sha256.
+
+        A file that fails verification is deleted, so the next run starts over.
+        """
+        self._catch_up_hash()
+        actual = self.part.stat().st_size
+        expected_size = self.model.size_bytes or self.size
+        digest = self.hasher.hexdigest()
+        error = ""
+        if self.done_bytes != self.size or actual != expected_size or self.hashed != actual:
+            error = f"{self.model.filename}: expected {expected_size} bytes, got {actual}"
+        elif self.model.sha256 and digest != self.model.sha256:
+            error = f"{self.model.filename}: sha256 {digest} does not match {self.model.sha256}"
+        if error:
+            self.part.unlink(missing_ok=True)
+            self.state_path.unlink(missing_ok=True)
+            raise ValueError(error)
+        os.replace(self.part, self.target)
+        self.state_path.unlink(missing_ok=True)
+        return digest
+
+
+def prefetch_models(
+    models: list[ModelInfo],
+    cache_dir: Path,
+    on_output: Callable[[str], None] | None = None,
+    max_connections: int = MAX_CONNECTIONS
+) -> tuple[bool, str]:
+    """Download models into the cache that are not there yet.
+
+    Large files are split into byte ranges fetched over several connections,
+    and all files share one pool of connections, so a big selection is
+    limited by the network rather than by one TCP stream. Interrupted
+    downloads resume from the last saved position of every chunk.
+
+    Every download is checked against ``size_bytes`` and ``sha256`` when the
+    model has them. Cache hits are trusted through the cache index; a cached
+    file not in the index is hashed once and recorded.
+
+    Args:
+        models: Models to make available in the cache
+        cache_dir: Cache root (see ``default_cache_dir``)
+        on_output: Callback for progress lines
+        max_connections: Concurrent HTTP connections in total
+
+    Returns:
+        Tuple of (success, message)
+    """
+    def emit(line: str) -> None:
+        if on_output:
+            on_output(line)
+
+    unique = {model_cache_key(m): m for m in models}
+    index = _CacheIndex(cache_dir)
+    missing: list[ModelInfo] = []
+    for model in unique.values():
+        path = cache_path(model, cache_dir)
+        if not path.is_file():
+            missing.append(model)
+            continue
+        digest = index.lookup(model, path)
+        if digest is None:
+            # Cached before the index existed, or touched since: verify once.
+            emit(f"Verifying cached {model.filename}")
+            digest = _file_sha256(path)
+            index.record(model, path, digest)
+        if model.sha256 and digest != model.sha256:
+            emit(f"{model.filename} changed upstream or is corrupt; downloading again")
+            path.unlink()
+            missing.append(model)
+    if not missing:
+        return True, f"All {len(unique)} models already cached"
+
+    downloads: list[_Download] = []
+    for model in missing:
+        try:
+            url, size, ranges = _probe(model.url)
+        except OSError as e:
+            return False, f"Cannot reach {model.url}: {e}"
+        if size <= 0:
+            return False, f"Server did not report the size of {model.url}"
+        download = _Download(model, cache_path(model, cache_dir), url, size, ranges)
+        resumed = download.done_bytes
+        note = f", resuming at {resumed / 1e9:.1f} GB" if resumed else ""
+        emit(f"Fetching {model.filename} ({size / 1e9:.1f} GB, {len(download.chunks)} connection(s){note})")
+        downloads.append(download)
+
+    total = sum(d.size for d in downloads)
+    failed: list[str] = []
+    with ThreadPoolExecutor(max_workers=max_connections) as pool:
+        futures = {
+            pool.submit(d.fetch_chunk, i): d
+            for d in downloads
+            for i in range(len(d.chunks))
+        }
+        remaining = {id(d): len(d.chunks) for d in downloads}
+        pending = set(futures)
+        last_report = time.monotonic()
+        while pending:
+            done, pending = wait(pending, timeout=PROGRESS_INTERVAL_SECONDS, return_when=FIRST_COMPLETED)
+            for future in done:
+                download = futures[future]
+                if future.exception() is not None:
+                    failed.append(f"{download.model.filename}: {future.exception()}")
+                    continue
+                remaining[id(download)] -= 1
+                if remaining[id(download)] == 0:
+                    try:
+                        digest = download.finish()
+                        index.record(download.model, download.target, digest)
+                        emit(f"Cached {download.model.filename} (sha256 {digest[:12]}…)")
+                    except (OSError, ValueError) as e:
+                        failed.append(str(e))
+            if pending and time.monotonic() - last_report >= PROGRESS_INTERVAL_SECONDS:
+                fetched = sum(d.done_bytes for d in downloads)
+                emit(f"Downloaded {fetched / 1e9:.1f} of {total / 1e9:.1f} GB")
+                last_report = time.monotonic()
+
+    if failed:
+        return False, "Model download failed (rerun to resume):\n" + "\n".join(failed)
+    return True, f"Downloaded {len(downloads)} models ({total / 1e9:.1f} GB)"
@@ -14,6 +14,7 @@ class Settings:
     base_image: str = "comfyui-rocky:latest"
     default_tag: str = "latest"
     dockerfile_path: str = "../Dockerfile"
+    model_cache_dir: str = ""  # empty: prefetch.default_cache_dir()
     
     @classmethod
     def get_settings_path(cls) -> Path:
@@ -0,0 +1,130 @@
+"""Tests for catalog — SQLite model index, with and without FTS5."""
+
+from __future__ import annotations
+
+import json
+from pathlib import Path
+from typing import Iterator
+
+import pytest
+
+from catalog import ALL_CATEGORIES, ModelCatalog, load_manifest
+from models import AVAILABLE_MODELS
+
+BUILTIN = AVAILABLE_MODELS[0]
+
+
+def _entry(i: int, **overrides: object) -> dict:
+    entry = {
+        "name": f"Pixel Art LoRA {i:04d}",
+        "category": "LoRA - SDXL",
+        "url": f"https://example.com/loras/pixel_{i}.safetensors",
+        "filename": f"pixel_{i}.safetensors",
+        "destination": "loras",
+        "size_bytes": 100_000_000,
+        "description": "retro_style pixel art",
+    }
+    entry.update(overrides)
+    return entry
+
+
+def _write(path: Path, entries: list[dict]) -> Path:
+    path.write_text(json.dumps({"models": entries}))
+    return path
+
+
+@pytest.fixture(params=[True, False], ids=["fts", "like"])
+def catalog(request: pytest.FixtureRequest, tmp_path: Path) -> Iterator[ModelCatalog]:
+    cat = ModelCatalog(tmp_path / "catalog.db")
+    if not request.param:
+        cat.has_fts = False
+    elif not cat.has_fts:
+        pytest.skip("SQLite built without FTS5")
+    yield cat
+    cat.close()
+
+
+class TestSearch:
+    def test_builtin_models_seeded(self, catalog: ModelCatalog) -> None:
+        assert catalog.count() == len(AVAILABLE_MODELS)
+        categories = catalog.categories()
+        assert categories[0] == ALL_CATEGORIES
+        assert set(categories[1:]) == {m.category for m in AVAILABLE_MODELS}
+
+    def test_word_prefix_match(self, catalog: ModelCatalog) -> None:
+        names = {m.name for m in catalog.search(query="sdx")}
+        assert "SDXL Base 1.0" in names
+        assert catalog.count(query="dxl") == 0
+
+    def test_all_words_must_match(self, catalog: ModelCatalog, tmp_path: Path) -> None:
+        catalog.import_manifest(_write(tmp_path / "m.json", [_entry(1), _entry(2, description="watercolor")]))
+        assert catalog.count(query="pixel retro") == 1
+        assert catalog.count(query="style") == 1  # underscores separate words
+        assert catalog.count("LoRA - SDXL", "pixel") == 2
+        assert catalog.count("Upscalers", "pixel") == 0
+
+    def test_paging_is_complete_and_ordered(self, catalog: ModelCatalog, tmp_path: Path) -> None:
+        catalog.import_manifest(_write(tmp_path / "m.json", [_entry(i) for i in range(450)]))
+        total = catalog.count(query="pixel")
+        pages = [catalog.search(query="pixel", offset=offset, limit=200) for offset in range(0, total, 200)]
+        names = [m.name for page in pages for m in page]
+        assert total == 450
+        assert [len(page) for page in pages] == [200, 200, 50]
+        assert names == sorted(names, key=str.lower)
+        assert len(set(names)) == total
+
+
+class TestSources:
+    def test_manifest_overrides_builtin_until_reimported_without_it(
+        self, catalog: ModelCatalog, tmp_path: Path
+    ) -> None:
+        manifest = tmp_path / "m.json"
+        override = _entry(1, name="House SD 1.5", url=BUILTIN.url, category="House")
+        catalog.import_manifest(_write(manifest, [override, _entry(2)]))
+        assert catalog.count() == len(AVAILABLE_MODELS) + 1
+        assert [m.name for m in catalog.search("House")] == ["House SD 1.5"]
+
+        # Opening the catalog again reseeds the built-ins without taking the URL back.
+        reopened = ModelCatalog(catalog.path)
+        assert [m.name for m in reopened.search("House")] == ["House SD 1.5"]
+        reopened.close()
+
+        catalog.import_manifest(_write(manifest, [_entry(2)]))
+        assert catalog.count("House") == 0
+        assert [m.name for m in catalog.search(query=BUILTIN.name) if m.url == BUILTIN.url] == [BUILTIN.name]
+        assert catalog.count() == len(AVAILABLE_MODELS) + 1
+
+    def test_reimport_keeps_known_metadata(self, catalog: ModelCatalog, tmp_path: Path) -> None:
+        manifest = _write(tmp_path / "m.json", [_entry(1, size_bytes=0, size_gb=0.5)])
+        catalog.import_manifest(manifest)
+        url = _entry(1)["url"]
+        catalog.update_metadata({url: {"sha256": "ab" * 32, "size_bytes": 123_000_000}})
+        catalog.import_manifest(manifest)
+        (model,) = catalog.search(query="pixel")
+        assert (model.sha256, model.size_bytes, model.size_gb) == ("ab" * 32, 123_000_000, 0.123)
+
+
+class TestLoadManifest:
+    def test_plain_list_and_size_from_bytes(self, tmp_path: Path) -> None:
+        path = tmp_path / "m.json"
+        path.write_text(json.dumps([_entry(1)]))
+        (model,) = load_manifest(path)
+        assert model.size_gb == 0.1
+
+    def test_incomplete_entry(self, tmp_path: Path) -> None:
+        with pytest.raises(ValueError, match="model 1: missing url"):
+            load_manifest(_write(tmp_path / "m.json", [_entry(1), _entry(2, url="")]))
+
+    @pytest.mark.parametrize(
+        "overrides",
+        [
+            {"destination": "../../etc"},
+            {"destination": "/opt/comfyui/models/loras"},
+            {"destination": "loras/../../../root"},
+            {"filename": "../escape.safetensors"},
+            {"filename": "/tmp/x.safetensors"},
+        ],
+    )
+    def test_paths_must_stay_inside_the_models_dir(self, tmp_path: Path, overrides: dict) -> None:
+        with pytest.raises(ValueError, match="model 0: .*relative path"):
+            load_manifest(_write(tmp_path / "m.json", [_entry(1, **overrides)]))
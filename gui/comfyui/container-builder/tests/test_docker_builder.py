@@ -0,0 +1,86 @@
+"""Tests for docker_builder layer planning and staging."""
+
+from __future__ import annotations
+
+import dataclasses
+import re
+from pathlib import Path
+
+from docker_builder import generate_dockerfile, layer_dir_name, plan_layers, stage_layers
+from models import AVAILABLE_MODELS, ModelInfo
+from prefetch import cache_path
+
+
+def _model(filename: str, destination: str, size_gb: float) -> ModelInfo:
+    return ModelInfo(
+        name=filename,
+        category="Test",
+        url=f"https://example.com/{destination}/{filename}",
+        filename=filename,
+        destination=destination,
+        size_gb=size_gb,
+        description="",
+    )
+
+
+def _copied_dirs(dockerfile: str) -> list[str]:
+    return re.findall(r"^COPY .* (layer-\d+)/ ", dockerfile, re.M)
+
+
+def _cache(models: list[ModelInfo], cache_dir: Path) -> None:
+    for model in models:
+        path = cache_path(model, cache_dir)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_bytes(model.filename.encode())
+
+
+class TestPlanLayers:
+    def test_stable_tiers_first(self) -> None:
+        models = [
+            _model("a.safetensors", "loras", 0.2),
+            _model("b.pth", "controlnet", 1.4),
+            _model("c.safetensors", "checkpoints", 6.0),
+        ]
+        assert [layer.tier for layer in plan_layers(models)] == ["base models", "auxiliary models", "adapters"]
+
+    def test_balances_within_tier(self) -> None:
+        models = [_model(f"m{i}.safetensors", "checkpoints", size) for i, size in enumerate([7, 6, 5, 4, 2])]
+        layers = plan_layers(models, target_gb=8)
+        assert len(layers) == 3
+        assert sorted(round(layer.size_gb) for layer in layers) == [7, 8, 9]
+
+    def test_drops_duplicates(self) -> None:
+        model = _model("a.safetensors", "loras", 0.2)
+        layers = plan_layers([model, dataclasses.replace(model)])
+        assert [len(layer.models) for layer in layers] == [1]
+
+
+class TestStageLayers:
+    def test_staged_dirs_match_dockerfile(self, tmp_path: Path) -> None:
+        models = [m for m in AVAILABLE_MODELS if "Flux" in m.category]
+        _cache(models, tmp_path / "cache")
+        layers = plan_layers(models)
+        dockerfile = generate_dockerfile("base:latest", models, tmp_path / "Dockerfile", layers=layers)
+        stage_layers(layers, tmp_path / "cache", tmp_path / "staging")
+        staged = sorted(p.name for p in (tmp_path / "staging").iterdir())
+        assert _copied_dirs(dockerfile) == staged
+        for index, layer in enumerate(layers, start=1):
+            for model in layer.models:
+                assert (tmp_path / "staging" / layer_dir_name(index) / model.destination / model.filename).is_file()
+
+    def test_given_plan_wins_over_changed_sizes(self, tmp_path: Path) -> None:
+        # Exact sizes looked up mid-build must not change the Dockerfile's plan.
+        models = [dataclasses.replace(m) for m in AVAILABLE_MODELS if "Flux" in m.category]
+        layers = plan_layers(models)
+        for model in models:
+            model.size_gb *= 2
+        dockerfile = generate_dockerfile("base:latest", models, tmp_path / "Dockerfile", layers=layers)
+        assert len(_copied_dirs(dockerfile)) == len(layers)
+        assert len(plan_layers(models)) != len(layers)
+
+    def test_hard_links_into_cache(self, tmp_path: Path) -> None:
+        model = _model("a.safetensors", "loras", 0.2)
+        _cache([model], tmp_path / "cache")
+        stage_layers(plan_layers([model]), tmp_path / "cache", tmp_path / "staging")
+        staged = tmp_path / "staging" / "layer-01" / "loras" / "a.safetensors"
+        assert staged.stat().st_ino == cache_path(model, tmp_path / "cache").stat().st_ino
@@ -0,0 +1,223 @@
+"""Tests for prefetch — ranged, resumable downloads from a local HTTP server."""
+
+from __future__ import annotations
+
+import hashlib
+import http.server
+import json
+import os
+import re
+import threading
+from pathlib import Path
+from typing import Iterator
+
+import pytest
+
+import prefetch
+from models import ModelInfo
+from prefetch import cache_path, prefetch_models
+
+DATA = os.urandom(300 * 1024 + 123)
+DATA_SHA256 = hashlib.sha256(DATA).hexdigest()
+
+
+class _Server(http.server.ThreadingHTTPServer):
+    """Serves ``files`` with Range support; drops ``drops`` responses halfway."""
+
+    daemon_threads = True
+
+    def __init__(self) -> None:
+        super().__init__(("127.0.0.1", 0), _Handler)
+        self.files: dict[str, bytes] = {}
+        self.ranges = True
+        self.drops = 0
+        self.requested: list[str] = []
+        self.lock = threading.Lock()
+
+    def url(self, name: str) -> str:
+        return f"http://127.0.0.1:{self.server_address[1]}/{name}"
+
+
+class _Handler(http.server.BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    server: _Server
+
+    def log_message(self, *args: object) -> None:
+        pass
+
+    def do_GET(self) -> None:
+        data = self.server.files[self.path.strip("/")]
+        header = self.headers.get("Range") if self.server.ranges else None
+        if header:
+            start, end = (int(x) for x in re.match(r"bytes=(\d+)-(\d+)", header).groups())
+            body = data[start:end + 1]
+            self.send_response(206)
+            self.send_header("Content-Range", f"bytes {start}-{end}/{len(data)}")
+        else:
+            body = data
+            self.send_response(200)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        with self.server.lock:
+            self.server.requested.append(header or "")
+            drop = self.server.drops > 0 and len(body) > 1
+            if drop:
+                self.server.drops -= 1
+        if drop:
+            self.wfile.write(body[:len(body) // 2])
+            self.close_connection = True
+            return
+        self.wfile.write(body)
+
+
+@pytest.fixture
+def server() -> Iterator[_Server]:
+    srv = _Server()
+    srv.files["model.safetensors"] = DATA
+    thread = threading.Thread(target=srv.serve_forever, daemon=True)
+    thread.start()
+    yield srv
+    srv.shutdown()
+    srv.server_close()
+
+
+@pytest.fixture(autouse=True)
+def small_chunks(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(prefetch, "MIN_CHUNK_BYTES", 64 * 1024)
+    monkeypatch.setattr(prefetch, "READ_BLOCK_BYTES", 4096)
+    monkeypatch.setattr(prefetch, "STATE_SAVE_BYTES", 16 * 1024)
+    monkeypatch.setattr(prefetch, "RETRY_DELAY_SECONDS", 0)
+
+
+def _model(server: _Server, **kwargs: object) -> ModelInfo:
+    return ModelInfo(
+        name="Model",
+        category="Test",
+        url=server.url("model.safetensors"),
+        filename="model.safetensors",
+        destination="checkpoints",
+        size_gb=0.0,
+        description="",
+        **kwargs,
+    )
+
+
+class TestPrefetchModels:
+    def test_parallel_ranged_download(self, server: _Server, tmp_path: Path) -> None:
+        model = _model(server)
+        ok, message = prefetch_models([model], tmp_path)
+        assert ok, message
+        assert cache_path(model, tmp_path).read_bytes() == DATA
+        # One probe plus one request per chunk.
+        assert len(server.requested) == 1 + prefetch.CONNECTIONS_PER_FILE
+
+    def test_retries_dropped_connections(self, server: _Server, tmp_path: Path) -> None:
+        server.drops = 3
+        model = _model(server)
+        ok, message = prefetch_models([model], tmp_path)
+        assert ok, message
+        assert cache_path(model, tmp_path).read_bytes() == DATA
+
+    def test_retries_reset_while_the_chunk_advances(
+        self, server: _Server, tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        monkeypatch.setattr(prefetch, "MAX_ATTEMPTS", 2)
+        server.drops = 12
+        model = _model(server)
+        ok, message = prefetch_models([model], tmp_path)
+        assert ok, message
+        assert server.drops == 0
+        assert cache_path(model, tmp_path).read_bytes() == DATA
+
+    def test_resumes_interrupted_download(
+        self, server: _Server, tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        model = _model(server)
+        monkeypatch.setattr(prefetch, "MAX_ATTEMPTS", 1)
+        server.drops = 1000
+        ok, _ = prefetch_models([model], tmp_path)
+        assert not ok
+        target = cache_path(model, tmp_path)
+        state = json.loads(target.with_name(target.name + ".part.json").read_text())
+        assert any(done > 0 for _, _, done in state["chunks"])
+
+        server.drops = 0
+        server.requested.clear()
+        ok, message = prefetch_models([model], tmp_path)
+        assert ok, message
+        assert target.read_bytes() == DATA
+        starts = {f"bytes={start + done}-{end - 1}" for start, end, done in state["chunks"] if start + done < end}
+        assert set(server.requested[1:]) == starts
+
+    def test_server_without_ranges(self, server: _Server, tmp_path: Path) -> None:
+        server.ranges = False
+        server.drops = 1
+        model = _model(server)
+        ok, message = prefetch_models([model], tmp_path)
+        assert ok, message
+        assert cache_path(model, tmp_path).read_bytes() == DATA
+
+    def test_cache_hit_skips_download(self, server: _Server, tmp_path: Path) -> None:
+        model = _model(server)
+        prefetch_models([model], tmp_path)
+        server.requested.clear()
+        ok, message = prefetch_models([model], tmp_path)
+        assert ok and "already cached" in message
+        assert server.requested == []
+
+
+class TestVerification:
+    def test_chunks_finishing_out_of_order(self, server: _Server, tmp_path: Path) -> None:
+        model = _model(server, sha256=DATA_SHA256)
+        url, size, ranges = prefetch._probe(model.url)
+        download = prefetch._Download(model, cache_path(model, tmp_path), url, size, ranges)
+        assert len(download.chunks) > 1
+        # Later chunks complete first and are read back when the prefix reaches them.
+        for index in reversed(range(len(download.chunks))):
+            download.fetch_chunk(index)
+        assert download.finish() == DATA_SHA256
+
+    def test_resumed_download_has_correct_digest(
+        self, server: _Server, tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        model = _model(server, sha256=DATA_SHA256, size_bytes=len(DATA))
+        monkeypatch.setattr(prefetch, "MAX_ATTEMPTS", 1)
+        server.drops = 1000
+        assert not prefetch_models([model], tmp_path)[0]
+        server.drops = 0
+        ok, message = prefetch_models([model], tmp_path)
+        assert ok, message
+        index = json.loads((tmp_path / prefetch.INDEX_FILE).read_text())
+        assert index[prefetch.model_cache_key(model)]["sha256"] == DATA_SHA256
+
+    @pytest.mark.parametrize("kwargs", [{"sha256": "0" * 64}, {"size_bytes": len(DATA) + 1}])
+    def test_mismatch_deletes_download(self, server: _Server, tmp_path: Path, kwargs: dict) -> None:
+        model = _model(server, **kwargs)
+        ok, message = prefetch_models([model], tmp_path)
+        assert not ok
+        target = cache_path(model, tmp_path)
+        assert list(target.parent.iterdir()) == []
+
+    def test_cache_index_trusts_unchanged_files(self, server: _Server, tmp_path: Path) -> None:
+        model = _model(server, sha256=DATA_SHA256)
+        prefetch_models([model], tmp_path)
+        lines: list[str] = []
+        assert prefetch_models([model], tmp_path, on_output=lines.append)[0]
+        assert lines == []
+
+        (tmp_path / prefetch.INDEX_FILE).unlink()
+        assert prefetch_models([model], tmp_path, on_output=lines.append)[0]
+        assert lines == ["Verifying cached model.safetensors"]
+
+    def test_corrupt_cache_entry_is_downloaded_again(self, server: _Server, tmp_path: Path) -> None:
+        model = _model(server, sha256=DATA_SHA256)
+        prefetch_models([model], tmp_path)
+        target = cache_path(model, tmp_path)
+        mtime_ns = target.stat().st_mtime_ns
+        target.write_bytes(b"x" * len(DATA))
+        os.utime(target, ns=(mtime_ns + 10**9, mtime_ns + 10**9))
+        server.requested.clear()
+        ok, message = prefetch_models([model], tmp_path)
+        assert ok, message
+        assert target.read_bytes() == DATA
+        assert server.requested
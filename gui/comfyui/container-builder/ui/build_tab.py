@@ -1,17 +1,22 @@
 """Build tab for ComfyUI Container Builder."""
 
+import dataclasses
+import sqlite3
 from pathlib import Path
 from typing import TYPE_CHECKING
 
 from PyQt6.QtWidgets import (
     QWidget, QVBoxLayout, QHBoxLayout, QLabel, QComboBox,
-    QListWidget, QListWidgetItem, QPushButton, QLineEdit,
-    QTextEdit, QGroupBox, QProgressBar, QMessageBox, QSplitter
+    QListWidget, QListWidgetItem, QListView, QPushButton, QLineEdit,
+    QTextEdit, QGroupBox, QProgressBar, QMessageBox, QSplitter, QFileDialog
 )
-from PyQt6.QtCore import Qt, QThread, pyqtSignal
+from PyQt6.QtCore import Qt, QThread, QTimer, QAbstractListModel, QModelIndex, pyqtSignal
 
-from models import AVAILABLE_MODELS, ModelInfo, get_categories, get_models_by_category
-from docker_builder import generate_dockerfile, build_image, push_to_ecr
+from catalog import ALL_CATEGORIES, ModelCatalog
+from models import ModelInfo
+from docker_builder import MODEL_CONTEXT, generate_dockerfile, build_image, plan_layers, push_to_ecr, stage_layers
+from model_metadata import apply_metadata, load_metadata, metadata_path, refresh_metadata
+from prefetch import default_cache_dir, prefetch_models
 
 if TYPE_CHECKING:
     from settings import Settings
@@ -30,11 +35,7 @@ class BuildWorker(QThread):
     
     def run(self) -> None:
         if self.operation == "build":
-            success, message = build_image(
-                self.kwargs["dockerfile_path"],
-                self.kwargs["image_tag"],
-                on_output=lambda line: self.output.emit(line)
-            )
+            success, message = self._prefetch_and_build()
         elif self.operation == "push":
             success, message = push_to_ecr(
                 self.kwargs["image_tag"],
@@ -46,6 +47,103 @@ class BuildWorker(QThread):
             success, message = False, f"Unknown operation: {self.operation}"
         
         self.finished.emit(success, message)
+    
+    def _prefetch_and_build(self) -> tuple[bool, str]:
+        """Download missing models on the host, stage the layers, then build."""
+        models = self.kwargs["models"]
+        cache_dir = self.kwargs["cache_dir"]
+        staging_dir = cache_dir / "staging"
+        success, message = prefetch_models(models, cache_dir, on_output=lambda line: self.output.emit(line))
+        self.output.emit(message)
+        if not success:
+            return success, message
+        try:
+            stage_layers(self.kwargs["layers"], cache_dir, staging_dir)
+        except OSError as e:
+            return False, f"Staging models failed: {e}"
+        return build_image(
+            self.kwargs["dockerfile_path"],
+            self.kwargs["image_tag"],
+            on_output=lambda line: self.output.emit(line),
+            build_contexts={MODEL_CONTEXT: staging_dir}
+        )
+
+
+class MetadataWorker(QThread):
+    """Worker thread that looks up checksums and sizes of the model catalog."""
+    
+    finished = pyqtSignal(dict)
+    
+    def __init__(self, models: list[ModelInfo], path: Path) -> None:
+        super().__init__()
+        self.models = models
+        self.path = path
+    
+    def run(self) -> None:
+        self.finished.emit(refresh_metadata(self.models, self.path))
+
+
+class CatalogListModel(QAbstractListModel):
+    """List model that pages models in from the catalog as the view scrolls."""
+    
+    BATCH_SIZE = 200
+    
+    def __init__(self, catalog: ModelCatalog) -> None:
+        super().__init__()
+        self.catalog = catalog
+        self.category = ALL_CATEGORIES
+        self.query = ""
+        self.total = 0
+        self.models: list[ModelInfo] = []
+        self.reload()
+    
+    def set_filter(self, category: str, query: str) -> None:
+        """Show models matching a category and search text."""
+        self.category = category
+        self.query = query
+        self.reload()
+    
+    def reload(self) -> None:
+        """Drop loaded rows and start again from the first page."""
+        self.beginResetModel()
+        self.total = self.catalog.count(self.category, self.query)
+        self.models = self.catalog.search(self.category, self.query, 0, self.BATCH_SIZE)
+        self.endResetModel()
+    
+    def apply_metadata(self, data: dict) -> None:
+        """Update sizes of loaded rows without losing the scroll position."""
+        apply_metadata(self.models, data)
+        if self.models:
+            self.dataChanged.emit(self.index(0), self.index(len(self.models) - 1))
+    
+    def rowCount(self, parent: QModelIndex = QModelIndex()) -> int:
+        return 0 if parent.isValid() else len(self.models)
+    
+    def canFetchMore(self, parent: QModelIndex) -> bool:
+        return not parent.isValid() and len(self.models) < self.total
+    
+    def fetchMore(self, parent: QModelIndex) -> None:
+        if parent.isValid():
+            return
+        batch = self.catalog.search(self.category, self.query, len(self.models), self.BATCH_SIZE)
+        if not batch:
+            self.total = len(self.models)
+            return
+        self.beginInsertRows(QModelIndex(), len(self.models), len(self.models) + len(batch) - 1)
+        self.models.extend(batch)
+        self.endInsertRows()
+    
+    def data(self, index: QModelIndex, role: int = Qt.ItemDataRole.DisplayRole):
+        if not index.isValid():
+            return None
+        model = self.models[index.row()]
+        if role == Qt.ItemDataRole.DisplayRole:
+            return f"{model.name} ({model.size_gb:.1f} GB)"
+        if role == Qt.ItemDataRole.ToolTipRole:
+            return model.description
+        if role == Qt.ItemDataRole.UserRole:
+            return model
+        return None
 
 
 class BuildTab(QWidget):
@@ -56,6 +154,10 @@ class BuildTab(QWidget):
         self.settings = settings
         self.selected_models: list[ModelInfo] = []
         self.worker: BuildWorker | None = None
+        self.metadata_worker: MetadataWorker | None = None
+        self._metadata_stale = False
+        self.catalog = ModelCatalog()
+        self.catalog.update_metadata(load_metadata(metadata_path(self._cache_dir())))
         self._setup_ui()
     
     def _setup_ui(self) -> None:
@@ -80,18 +182,37 @@ class BuildTab(QWidget):
         filter_layout = QHBoxLayout()
         filter_layout.addWidget(QLabel("Category:"))
         self.category_combo = QComboBox()
-        self.category_combo.addItems(get_categories())
+        self.category_combo.addItems(self.catalog.categories())
         self.category_combo.currentTextChanged.connect(self._on_category_changed)
         filter_layout.addWidget(self.category_combo)
         filter_layout.addStretch()
+        self.import_btn = QPushButton("Import Manifest...")
+        self.import_btn.clicked.connect(self._import_manifest)
+        filter_layout.addWidget(self.import_btn)
         left_layout.addLayout(filter_layout)
         
-        # Available models list
-        left_layout.addWidget(QLabel("Available Models:"))
-        self.available_list = QListWidget()
-        self.available_list.setSelectionMode(QListWidget.SelectionMode.ExtendedSelection)
+        # Search, applied shortly after typing stops
+        self.search_input = QLineEdit()
+        self.search_input.setPlaceholderText("Search models...")
+        self.search_input.setClearButtonEnabled(True)
+        self.search_timer = QTimer(self)
+        self.search_timer.setSingleShot(True)
+        self.search_timer.setInterval(200)
+        self.search_timer.timeout.connect(self._populate_available_models)
+        self.search_input.textChanged.connect(self.search_timer.start)
+        left_layout.addWidget(self.search_input)
+        
+        # Available models list; rows are loaded from the catalog as it scrolls
+        self.available_label = QLabel("Available Models:")
+        left_layout.addWidget(self.available_label)
+        self.available_model = CatalogListModel(self.catalog)
+        self.available_view = QListView()
+        self.available_view.setUniformItemSizes(True)
+        self.available_view.setSelectionMode(QListView.SelectionMode.ExtendedSelection)
+        self.available_view.setModel(self.available_model)
+        self.available_view.doubleClicked.connect(self._add_models)
         self._populate_available_models()
-        left_layout.addWidget(self.available_list)
+        left_layout.addWidget(self.available_view)
         
         # Add/Remove buttons
         btn_layout = QHBoxLayout()
@@ -160,31 +281,73 @@ class BuildTab(QWidget):
         
         self._update_dockerfile_preview()
     
+    def _cache_dir(self) -> Path:
+        """Model cache directory from settings, or the default."""
+        if self.settings.model_cache_dir:
+            return Path(self.settings.model_cache_dir).expanduser()
+        return default_cache_dir()
+    
+    def _refresh_metadata(self) -> None:
+        """Look up missing or stale checksums of the selected models in the background."""
+        if self.metadata_worker and self.metadata_worker.isRunning():
+            self._metadata_stale = True
+            return
+        self._metadata_stale = False
+        self.metadata_worker = MetadataWorker(list(self.selected_models), metadata_path(self._cache_dir()))
+        self.metadata_worker.finished.connect(self._on_metadata_finished)
+        self.metadata_worker.start()
+    
+    def _on_metadata_finished(self, data: dict) -> None:
+        """Apply refreshed metadata; sizes in the lists become exact."""
+        self.catalog.update_metadata(data)
+        self.available_model.apply_metadata(data)
+        apply_metadata(self.selected_models, data)
+        self._update_selected_list()
+        self._update_dockerfile_preview()
+        if self._metadata_stale:
+            self._refresh_metadata()
+    
     def _populate_available_models(self) -> None:
-        """Populate the available models list."""
-        self.available_list.clear()
-        category = self.category_combo.currentText()
-        models = get_models_by_category(category)
-        
-        for model in models:
-            item = QListWidgetItem(f"{model.name} ({model.size_gb:.1f} GB)")
-            item.setData(Qt.ItemDataRole.UserRole, model)
-            item.setToolTip(model.description)
-            self.available_list.addItem(item)
+        """Filter the available models list by category and search text."""
+        self.available_model.set_filter(self.category_combo.currentText(), self.search_input.text())
+        self.available_label.setText(f"Available Models ({self.available_model.total}):")
     
     def _on_category_changed(self, category: str) -> None:
         """Handle category filter change."""
         self._populate_available_models()
     
+    def _import_manifest(self) -> None:
+        """Add the models of a JSON manifest to the catalog."""
+        path, _ = QFileDialog.getOpenFileName(self, "Import Model Manifest", "", "JSON Files (*.json)")
+        if not path:
+            return
+        try:
+            count = self.catalog.import_manifest(Path(path))
+        except (OSError, ValueError, sqlite3.Error) as e:
+            QMessageBox.critical(self, "Import Failed", str(e))
+            return
+        
+        category = self.category_combo.currentText()
+        self.category_combo.blockSignals(True)
+        self.category_combo.clear()
+        self.category_combo.addItems(self.catalog.categories())
+        self.category_combo.setCurrentText(category)
+        self.category_combo.blockSignals(False)
+        self._populate_available_models()
+        QMessageBox.information(self, "Import Complete", f"Imported {count} models from {Path(path).name}.")
+    
     def _add_models(self) -> None:
         """Add selected models to the build list."""
-        for item in self.available_list.selectedItems():
-            model = item.data(Qt.ItemDataRole.UserRole)
-            if model not in self.selected_models:
+        selected_urls = {m.url for m in self.selected_models}
+        for index in self.available_view.selectionModel().selectedIndexes():
+            model = index.data(Qt.ItemDataRole.UserRole)
+            if model.url not in selected_urls:
                 self.selected_models.append(model)
+                selected_urls.add(model.url)
         
         self._update_selected_list()
         self._update_dockerfile_preview()
+        self._refresh_metadata()
     
     def _remove_models(self) -> None:
         """Remove selected models from the build list."""
@@ -207,7 +370,8 @@ class BuildTab(QWidget):
             self.selected_list.addItem(item)
             total_size += model.size_gb
         
-        self.size_label.setText(f"Total size: {total_size:.1f} GB")
+        layers = len(plan_layers(self.selected_models))
+        self.size_label.setText(f"Total size: {total_size:.1f} GB in {layers} layer(s)")
     
     def _update_dockerfile_preview(self) -> None:
         """Update the Dockerfile preview."""
@@ -228,17 +392,26 @@ class BuildTab(QWidget):
             QMessageBox.warning(self, "No Models", "Please select at least one model.")
             return
         
+        # Snapshot the selection and plan the layers once: metadata arriving
+        # mid-build must not change what the Dockerfile and staging agree on.
+        models = [dataclasses.replace(m) for m in self.selected_models]
+        layers = plan_layers(models)
+        
         # Generate Dockerfile
         dockerfile_path = Path(__file__).parent.parent / "generated" / "Dockerfile"
         generate_dockerfile(
             self.settings.base_image,
-            self.selected_models,
-            dockerfile_path
+            models,
+            dockerfile_path,
+            layers=layers
         )
         
         self._start_operation("build", 
             dockerfile_path=dockerfile_path,
-            image_tag=self.tag_input.text()
+            image_tag=self.tag_input.text(),
+            models=models,
+            layers=layers,
+            cache_dir=self._cache_dir()
         )
     
     def _push_to_ecr(self) -> None:
@@ -8,6 +8,8 @@ from PyQt6.QtWidgets import (
 )
 from PyQt6.QtCore import pyqtSignal
 
+from prefetch import default_cache_dir
+
 if TYPE_CHECKING:
     from settings import Settings
 
@@ -66,6 +68,10 @@ class SettingsTab(QWidget):
         self.default_tag_input.setPlaceholderText("latest")
         docker_layout.addRow("Default Tag:", self.default_tag_input)
         
+        self.model_cache_input = QLineEdit()
+        self.model_cache_input.setPlaceholderText(str(default_cache_dir()))
+        docker_layout.addRow("Model Cache:", self.model_cache_input)
+        
         layout.addWidget(docker_group)
         
         # Spacer
@@ -89,6 +95,7 @@ class SettingsTab(QWidget):
         
         self.base_image_input.setText(self.settings.base_image)
         self.default_tag_input.setText(self.settings.default_tag)
+        self.model_cache_input.setText(self.settings.model_cache_dir)
     
     def _save_settings(self) -> None:
         """Save settings from UI."""
@@ -96,6 +103,7 @@ class SettingsTab(QWidget):
         self.settings.ecr_region = self.ecr_region_combo.currentText()
         self.settings.base_image = self.base_image_input.text().strip() or "comfyui-rocky:latest"
         self.settings.default_tag = self.default_tag_input.text().strip() or "latest"
+        self.settings.model_cache_dir = self.model_cache_input.text().strip()
         
         self.settings.save()
         self.settings_changed.emit()